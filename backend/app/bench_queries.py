@@ -0,0 +1,151 @@
+"""
+Micro-benchmark: per-call ORM overhead of the hot-path queries.
+
+For each query in queries.py, times the same lookup written as:
+- legacy:   the previous code (Query API / select() built per call)
+- select:   select() built per call (2.0 style)
+- lambda:   lambda_stmt() (SQLAlchemy's statement-construction cache)
+- prebuilt: the queries.py function (statement built once at import)
+plus `legacy, no cache` (compiled cache disabled) to show what SQL
+compilation itself costs.
+`speedup` is legacy / prebuilt.
+
+Runs on a private in-memory SQLite database, so the database round trip
+is negligible and the numbers are mostly Python-side overhead
+(statement construction, cache key, compilation, ORM loading).
+
+Usage:
+    python -m app.bench_queries [--jobs N] [--calls N]
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+# Only the models are needed; settings must load without a real database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "bench")
+
+from sqlalchemy import create_engine, lambda_stmt, select, tuple_  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from . import queries  # noqa: E402
+from .db import Base  # noqa: E402
+from .models import Job, Result, User  # noqa: E402
+
+
+def _populate(engine, jobs: int) -> None:
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        db.add(User(username="viewer", password_hash="x", role="viewer"))
+        db.add_all(
+            Job(
+                input_text=f"job {i}",
+                submitted_by="viewer",
+                status="DONE" if i % 2 else "QUEUED",
+                created_at=now - timedelta(seconds=i),
+            )
+            for i in range(jobs)
+        )
+        db.flush()
+        db.add_all(
+            Result(job_id=job_id, label="ok", confidence=0.9)
+            for job_id in db.scalars(select(Job.id).where(Job.status == "DONE"))
+        )
+        db.commit()
+
+
+def _cases(db: Session, job_id: int, cursor: tuple[datetime, int]):
+    # name -> {variant: call}; each call performs one complete lookup
+    return {
+        "user by username": {
+            "legacy": lambda: db.query(User).filter(User.username == "viewer").first(),
+            "select": lambda: db.scalars(
+                select(User).where(User.username == "viewer").limit(1)
+            ).first(),
+            "lambda": lambda: db.scalars(lambda_stmt(
+                lambda: select(User).where(User.username == "viewer").limit(1)
+            )).first(),
+            "prebuilt": lambda: queries.user_by_username(db, "viewer"),
+        },
+        "result by job": {
+            "legacy": lambda: db.query(Result).filter(Result.job_id == job_id).first(),
+            "select": lambda: db.scalars(
+                select(Result).where(Result.job_id == job_id).limit(1)
+            ).first(),
+            "lambda": lambda: db.scalars(lambda_stmt(
+                lambda: select(Result).where(Result.job_id == job_id).limit(1)
+            )).first(),
+            "prebuilt": lambda: queries.result_for_job(db, job_id),
+        },
+        "job status": {
+            "legacy": lambda: db.scalar(select(Job.status).where(Job.id == job_id)),
+            "prebuilt": lambda: queries.job_status(db, job_id),
+        },
+        "job page": {
+            "legacy": lambda: db.scalars(
+                select(Job)
+                .where(Job.status == "DONE")
+                .where(tuple_(Job.created_at, Job.id) < tuple_(*cursor))
+                .order_by(Job.created_at.desc(), Job.id.desc())
+                .limit(21)
+            ).all(),
+            "prebuilt": lambda: queries.job_page(db, 21, status="DONE", before=cursor),
+        },
+    }
+
+
+def _time(call, calls: int) -> float:
+    for _ in range(min(calls, 200)):
+        call()  # warm caches
+    started = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(jobs: int = 2000, calls: int = 5000) -> list[dict]:
+    """Returns one row per case: µs per call for each variant."""
+    cached = create_engine("sqlite://")
+    Base.metadata.create_all(cached)
+    _populate(cached, jobs)
+    # Same database file is not shared between in-memory engines:
+    # the uncached engine gets its own copy of the data
+    uncached = create_engine("sqlite://", query_cache_size=0)
+    Base.metadata.create_all(uncached)
+    _populate(uncached, jobs)
+
+    rows = []
+    with Session(cached) as db, Session(uncached) as db_nocache:
+        job_id = db.scalar(select(Job.id).where(Job.status == "DONE").limit(1))
+        oldest = db.scalars(select(Job).order_by(Job.created_at).limit(1)).one()
+        cursor = (oldest.created_at + timedelta(seconds=jobs // 2), 0)
+
+        nocache = _cases(db_nocache, job_id, cursor)
+        for name, variants in _cases(db, job_id, cursor).items():
+            row = {"query": name}
+            row["legacy, no cache"] = _time(nocache[name]["legacy"], calls // 5)
+            for variant, call in variants.items():
+                row[variant] = _time(call, calls)
+            rows.append(row)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bench_queries")
+    parser.add_argument("--jobs", type=int, default=2000, help="rows in jobs")
+    parser.add_argument("--calls", type=int, default=5000, help="timed calls per variant")
+    args = parser.parse_args()
+
+    columns = ["legacy, no cache", "legacy", "select", "lambda", "prebuilt"]
+    print(f"{'query':<18}" + "".join(f"{c:>18}" for c in columns) + f"{'speedup':>10}")
+    for row in run(args.jobs, args.calls):
+        cells = "".join(
+            f"{row[c]:>15.1f} us" if c in row else f"{'-':>18}" for c in columns
+        )
+        print(f"{row['query']:<18}{cells}{row['legacy'] / row['prebuilt']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
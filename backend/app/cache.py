@@ -0,0 +1,266 @@
+"""
+Response cache for aggregate (analytics) endpoints.
+
+Responsibilities:
+- Keep recently computed responses in an in-process LRU with a TTL
+- Optionally share them across API nodes through Redis
+  (settings.analytics_cache_backend() == "redis")
+- Expire entries when job status events arrive (every committed
+  transition reaches each node through events.bus)
+- Coalesce concurrent misses: one recomputation per key per process,
+  and per cluster when Redis is used (SET NX lock)
+- Serve `async def` endpoints (aget_or_compute) without blocking the
+  event loop: waiters await the leader, Redis I/O runs on the threadpool
+
+Staleness bounds:
+- No job activity: entries live for ANALYTICS_CACHE_TTL_S
+- Job activity: by default every event expires every entry, so the
+  next read reflects the transition. Under heavy load,
+  ANALYTICS_CACHE_MIN_AGE_S > 0 lets younger entries survive events:
+  each key is then recomputed at most about once per MIN_AGE instead of
+  once per transition (bounded staleness)
+
+QE/SIT relevance:
+- Dashboards polling analytics no longer cost one DB query per viewer
+- Hit / miss / coalesced counters are exposed at GET /admin/analytics-cache
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from .config import settings
+from .events import bus
+
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix for shared entries and recomputation locks
+REDIS_PREFIX = "analytics-cache"
+
+# Result of an async flight whose computation failed
+_FAILED = object()
+
+
+class ResponseCache:
+    """
+    Two-level cache of JSON-serializable values.
+
+    aget_or_compute(key, compute) returns a fresh cached value, or the
+    result of `await compute()`; concurrent callers for the same key
+    share one call to `compute()`.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        min_age_s: float,
+        max_entries: int,
+        wait_s: float,
+    ):
+        self.ttl_s = ttl_s
+        self.min_age_s = min_age_s
+        self.max_entries = max_entries
+        self.wait_s = wait_s
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._ainflight: dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._invalidated_at = 0.0
+        self._redis = None
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    # -------------------------------------------------
+    # Freshness
+    # -------------------------------------------------
+    def _fresh(self, computed_at: float, now: float) -> bool:
+        age = now - computed_at
+        if age >= self.ttl_s:
+            return False
+        return computed_at >= self._invalidated_at or age < self.min_age_s
+
+    def invalidate(self, events: Optional[list[dict]] = None) -> None:
+        """Mark every entry computed before now as stale (bus listener)."""
+        with self._lock:
+            self._invalidated_at = time.time()
+            self.stats["invalidations"] += 1
+
+    # -------------------------------------------------
+    # Storage
+    # -------------------------------------------------
+    @staticmethod
+    def backend() -> str:
+        return settings.analytics_cache_backend()
+
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    @staticmethod
+    def _redis_key(key: Hashable) -> str:
+        return f"{REDIS_PREFIX}:{json.dumps(key, default=str)}"
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._fresh(entry[0], now):
+                self._entries.move_to_end(key)
+                return True, entry[1]
+
+        if self.backend() == "redis":
+            try:
+                raw = self._redis_client().get(self._redis_key(key))
+            except Exception:
+                logger.exception("Analytics cache: Redis read failed")
+                raw = None
+            if raw:
+                computed_at, value = json.loads(raw)
+                if self._fresh(computed_at, now):
+                    self._store_local(key, computed_at, value)
+                    return True, value
+        return False, None
+
+    def _store_local(self, key: Hashable, computed_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (computed_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store(self, key: Hashable, computed_at: float, value: Any) -> None:
+        self._store_local(key, computed_at, value)
+        if self.backend() == "redis":
+            try:
+                self._redis_client().set(
+                    self._redis_key(key),
+                    json.dumps([computed_at, value]),
+                    px=int(self.ttl_s * 1000),
+                )
+            except Exception:
+                logger.exception("Analytics cache: Redis write failed")
+
+    # -------------------------------------------------
+    # Cluster-wide recomputation lock (Redis)
+    # -------------------------------------------------
+    def _try_lock(self, key: Hashable) -> tuple[bool, Optional[str]]:
+        """Take the cluster-wide recomputation lock: (acquired, key to release)."""
+        lock_key = f"{self._redis_key(key)}:lock"
+        try:
+            acquired = self._redis_client().set(
+                lock_key, "1", nx=True, px=int(self.wait_s * 1000)
+            )
+        except Exception:
+            logger.exception("Analytics cache: Redis lock failed")
+            return True, None
+        return bool(acquired), lock_key if acquired else None
+
+    def _unlock(self, lock_key: Optional[str]) -> None:
+        if lock_key:
+            try:
+                self._redis_client().delete(lock_key)
+            except Exception:
+                logger.exception("Analytics cache: Redis unlock failed")
+
+    # -------------------------------------------------
+    # Read-through with coalescing (async def endpoints)
+    # -------------------------------------------------
+    async def aget_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Cached value for `key`, or the result of `await compute()`.
+
+        Concurrent misses in this process await the leader's future
+        instead of parking threads; with Redis, one node computes per
+        key (SET NX lock) and the others poll for its result.
+        """
+        if self.backend() == "off":
+            return await compute()
+
+        redis = self.backend() == "redis"
+        hit, value = (
+            await run_in_threadpool(self._lookup, key) if redis else self._lookup(key)
+        )
+        if hit:
+            self._count("hits")
+            return value
+
+        flight = self._ainflight.get(key)
+        if flight is not None:
+            try:
+                value = await asyncio.wait_for(asyncio.shield(flight), self.wait_s)
+            except asyncio.TimeoutError:
+                value = _FAILED
+            if value is not _FAILED:
+                self._count("coalesced")
+                return value
+            return await compute()
+
+        flight = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        value = _FAILED
+        try:
+            self._count("misses")
+            value = await self._acompute_shared(key, compute, redis)
+            return value
+        finally:
+            self._ainflight.pop(key, None)
+            flight.set_result(value)
+
+    async def _acompute_shared(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]], redis: bool
+    ) -> Any:
+        lock_key = None
+        if redis:
+            acquired, lock_key = await run_in_threadpool(self._try_lock, key)
+            if not acquired:
+                deadline = time.monotonic() + self.wait_s
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    hit, value = await run_in_threadpool(self._lookup, key)
+                    if hit:
+                        self._count("coalesced")
+                        return value
+
+        computed_at = time.time()
+        try:
+            value = await compute()
+            if redis:
+                await run_in_threadpool(self._store, key, computed_at, value)
+            else:
+                self._store(key, computed_at, value)
+            return value
+        finally:
+            if lock_key:
+                await run_in_threadpool(self._unlock, lock_key)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend(),
+                "entries": len(self._entries),
+                **self.stats,
+            }
+
+
+analytics_cache = ResponseCache(
+    ttl_s=settings.ANALYTICS_CACHE_TTL_S,
+    min_age_s=settings.ANALYTICS_CACHE_MIN_AGE_S,
+    max_entries=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    wait_s=settings.ANALYTICS_CACHE_WAIT_S,
+)
+
+# Every committed job transition reaches each API node through the bus
+bus.add_listener(analytics_cache.invalidate)
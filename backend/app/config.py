@@ -12,7 +12,7 @@ QE relevance:
 - Makes test environments reproducible
 """
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -40,22 +40,171 @@ class Settings(BaseSettings):
     # -------------------------------------------------
     APP_ENV: str = "local"  # local | qa | prod
 
+    # Release identifier (e.g. git SHA or image tag) logged with the
+    # startup timings, so cold-start time can be compared per release
+    APP_RELEASE: str = "dev"
+
     # -------------------------------------------------
     # Database configuration
     # -------------------------------------------------
     DATABASE_URL: str  # required; app fails to start if missing
 
+    # Postgres (psycopg): run a statement as a server-side prepared
+    # statement from its Nth execution on a connection; hot statements
+    # then skip parsing and planning. 0 = prepare immediately,
+    # -1 = never (required behind PgBouncer in transaction mode)
+    DB_PREPARE_THRESHOLD: int = 2
+
+    # Serve the jobs / analytics / auth routes through an asyncio engine
+    # (psycopg async; SQLite needs aiosqlite) instead of the threadpool
+    DB_ASYNC: bool = False
+
+    # Optional read replicas (comma-separated URLs). Read-only endpoints
+    # are routed round-robin across healthy replicas; writes, and a user's
+    # reads right after their own writes, stay on DATABASE_URL.
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_RETRY_S: float = 5.0   # how long a failed replica is skipped
+    REPLICA_STICKY_S: float = 5.0  # primary-only reads after a user's write
+
+    # Connection pool (per engine: primary and each replica, per process).
+    # Checkouts wait up to DB_POOL_TIMEOUT_S once size + overflow are in use.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_S: float = 30.0
+    DB_POOL_RECYCLE_S: int = 1800     # reconnect connections older than this; -1 = never
+    # Liveness check on checkout: always | idle (only after
+    # DB_PRE_PING_IDLE_S unused) | off
+    DB_PRE_PING: Literal["always", "idle", "off"] = "idle"
+    DB_PRE_PING_IDLE_S: float = 30.0
+
     # -------------------------------------------------
     # Authentication / security
     # -------------------------------------------------
     JWT_SECRET: str            # required secret key
     JWT_EXPIRE_MIN: int = 120  # token lifetime in minutes
+    JWT_CACHE_MAX_ENTRIES: int = 10_000  # verified-token LRU; 0 = verify every request
+    REFRESH_EXPIRE_MIN: int = 7 * 24 * 60  # refresh token lifetime in minutes
+
+    # bcrypt runs on its own bounded executor, not the request threadpool.
+    # Logins beyond WORKERS running + QUEUE waiting get 503 immediately.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 32
 
     # -------------------------------------------------
     # Optional integrations
     # -------------------------------------------------
     REDIS_URL: Optional[str] = None  # worker / async processing
 
+    # -------------------------------------------------
+    # Job dispatch configuration
+    # -------------------------------------------------
+    # How POST /jobs hands work to the worker:
+    # - auto:       celery when REDIS_URL is set, otherwise background
+    # - inline:     run process_job inside the request (debugging only)
+    # - celery:     enqueue on worker/celery_app.celery (Redis broker)
+    # - background: in-memory broker + in-process worker threads (no Redis)
+    # - db:         no message; `python -m app.worker.runner` processes claim
+    #               QUEUED rows directly (SELECT ... FOR UPDATE SKIP LOCKED)
+    JOB_DISPATCH_MODE: Literal["auto", "inline", "celery", "background", "db"] = "auto"
+    JOB_DISPATCH_WORKERS: int = 4  # consumer threads for background mode
+    JOB_BATCH_MAX: int = 1000      # max payloads accepted by POST /jobs/batch
+
+    # -------------------------------------------------
+    # Worker micro-batching
+    # -------------------------------------------------
+    WORKER_BATCH_SIZE: int = 32           # max jobs per transaction / inference call
+    WORKER_BATCH_MAX_WAIT_S: float = 0.5  # max time to wait for a batch to fill
+    WORKER_POLL_INTERVAL_S: float = 0.2   # idle poll interval for the batch runner
+    WORKER_LEASE_S: int = 60              # job lease; expired leases are re-claimed
+    WORKER_ID: Optional[str] = None       # lease owner id (default: hostname:pid)
+    WORKER_MAX_ATTEMPTS: int = 3          # claims per job before it is FAILED
+
+    # -------------------------------------------------
+    # Inference backend + asyncio worker runtime
+    # -------------------------------------------------
+    INFERENCE_BACKEND: Literal["simulated", "http", "cpu"] = "simulated"
+    INFERENCE_LATENCY_S: float = 1.5      # simulated backend latency per call
+    INFERENCE_HTTP_URL: str = "http://127.0.0.1:9000/predict"
+    INFERENCE_TIMEOUT_S: float = 30.0     # http backend request timeout
+    INFERENCE_MODEL_VERSION: str = "1"    # part of result cache keys: bump on model change
+    INFERENCE_MAX_CONCURRENCY: int = 64   # model calls in flight per process
+    WORKER_ASYNC_CONCURRENCY: int = 256   # jobs claimed, not yet written, per async worker
+
+    # inline: model runs in the worker process
+    # process: model runs in a pool of child processes (CPU-bound models)
+    INFERENCE_EXECUTOR: Literal["inline", "process"] = "inline"
+    INFERENCE_PROCESSES: int = 0          # pool size; 0 = os.cpu_count()
+    INFERENCE_CHUNK_SIZE: int = 64        # inputs per child-process call
+
+    # -------------------------------------------------
+    # Result cache (content-hash memoization)
+    # -------------------------------------------------
+    # Repeated inputs reuse a stored prediction instead of calling the model.
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_TTL_S: int = 86400            # entry lifetime; 0 = never expires
+    RESULT_CACHE_MAX_ENTRIES: int = 100_000    # LRU cap on the result_cache table
+    RESULT_CACHE_EVICT_EVERY: int = 500        # run eviction every N stored entries
+    RESULT_CACHE_TOUCH_S: float = 5.0          # write hits / last_hit_at in batches this often
+
+    # -------------------------------------------------
+    # Job status events (SSE stream / pub-sub)
+    # -------------------------------------------------
+    # auto: redis when REDIS_URL is set (multi-process/multi-node),
+    #       otherwise in-process memory fan-out
+    EVENTS_BACKEND: Literal["auto", "memory", "redis"] = "auto"
+    EVENTS_QUEUE_SIZE: int = 1000     # buffered events per subscriber
+    EVENTS_HEARTBEAT_S: float = 15.0  # SSE keep-alive comment interval
+    LONGPOLL_MAX_TIMEOUT_S: float = 60.0  # cap for GET /jobs/{id}?timeout=
+
+    # -------------------------------------------------
+    # Analytics rollup counters
+    # -------------------------------------------------
+    # Counter rows per total (job_stats) and per time bucket (job_buckets).
+    # Each transaction updates one shard, picked at random; reads sum them.
+    # More shards = fewer concurrent writers waiting on the same row lock.
+    ROLLUP_SHARDS: int = 8
+
+    # -------------------------------------------------
+    # Analytics time series (pre-aggregated buckets)
+    # -------------------------------------------------
+    # Retention per resolution in seconds; 0 = keep forever.
+    TIMESERIES_RETENTION_1M_S: int = 2 * 86400
+    TIMESERIES_RETENTION_1H_S: int = 90 * 86400
+    TIMESERIES_RETENTION_1D_S: int = 0
+    TIMESERIES_PRUNE_INTERVAL_S: float = 3600.0  # celery beat schedule; 0 = not scheduled
+    TIMESERIES_MAX_POINTS: int = 5000  # max buckets per /analytics/timeseries call
+
+    # -------------------------------------------------
+    # Latency percentiles (DDSketch per lifecycle stage)
+    # -------------------------------------------------
+    LATENCY_SKETCH_ACCURACY: float = 0.01  # relative error of reported quantiles
+    LATENCY_FLUSH_S: float = 10.0          # merge in-memory sketches into the DB
+
+    # -------------------------------------------------
+    # Analytics response cache
+    # -------------------------------------------------
+    # auto: in-process LRU + shared Redis layer when REDIS_URL is set
+    # off:  every request recomputes
+    ANALYTICS_CACHE_BACKEND: Literal["auto", "memory", "redis", "off"] = "auto"
+    ANALYTICS_CACHE_TTL_S: float = 30.0       # max age of a cached response
+    ANALYTICS_CACHE_MIN_AGE_S: float = 0.0    # job events spare younger entries (0 = exact)
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 256    # in-process LRU size
+    ANALYTICS_CACHE_WAIT_S: float = 5.0       # max wait on a coalesced recomputation
+
+    # -------------------------------------------------
+    # Columnar snapshot export (Parquet, see export.py)
+    # -------------------------------------------------
+    EXPORT_DIR: str = "exports"       # snapshot root (jobs/finished_date=.../*.parquet)
+    EXPORT_CHUNK_ROWS: int = 50_000   # rows fetched and written per chunk
+    EXPORT_SETTLE_S: float = 60.0     # jobs finished more recently wait for the next run
+    EXPORT_INTERVAL_S: float = 0.0    # celery beat schedule; 0 = not scheduled
+
+    # -------------------------------------------------
+    # Pagination
+    # -------------------------------------------------
+    JOBS_PAGE_DEFAULT: int = 100  # GET /jobs default page size
+    JOBS_PAGE_MAX: int = 500      # GET /jobs max ?limit=
+
     # -------------------------------------------------
     # CORS configuration
     # -------------------------------------------------
@@ -80,6 +229,50 @@ class Settings(BaseSettings):
             if origin.strip()
         ]
 
+    def replica_urls(self) -> List[str]:
+        """DATABASE_REPLICA_URLS as a list (empty = no replicas)."""
+        return [
+            url.strip()
+            for url in self.DATABASE_REPLICA_URLS.split(",")
+            if url.strip()
+        ]
+
+    def dispatch_mode(self) -> str:
+        """
+        Resolve JOB_DISPATCH_MODE into a concrete dispatch mode.
+
+        "auto" picks Celery when a Redis broker is configured and falls
+        back to the in-process background broker otherwise.
+
+        QE relevance:
+        - CI/SIT without Redis still exercises the real async lifecycle
+        - Deployments with Redis enqueue to Celery without extra config
+        """
+        if self.JOB_DISPATCH_MODE == "auto":
+            return "celery" if self.REDIS_URL else "background"
+        return self.JOB_DISPATCH_MODE
+
+    def events_backend(self) -> str:
+        """
+        Resolve EVENTS_BACKEND into "memory" or "redis".
+
+        Workers running in other processes (celery, runners) can only reach
+        API subscribers through Redis, so "auto" prefers it when configured.
+        """
+        if self.EVENTS_BACKEND == "auto":
+            return "redis" if self.REDIS_URL else "memory"
+        return self.EVENTS_BACKEND
+
+    def analytics_cache_backend(self) -> str:
+        """
+        Resolve ANALYTICS_CACHE_BACKEND into "memory", "redis" or "off".
+
+        "redis" keeps the in-process LRU in front of the shared Redis copy.
+        """
+        if self.ANALYTICS_CACHE_BACKEND == "auto":
+            return "redis" if self.REDIS_URL else "memory"
+        return self.ANALYTICS_CACHE_BACKEND
+
 
 # Singleton settings instance used throughout the app
 settings = Settings()
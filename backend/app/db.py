@@ -2,9 +2,14 @@
 Database configuration and session management.
 
 Responsibilities:
-- Initialize SQLAlchemy engine
+- Initialize SQLAlchemy engines with configurable pooling (DB_POOL_*),
+  refusing databases without INSERT ... ON CONFLICT (upserts)
+- Instrument connection pools (checkouts, wait time, overflow, churn)
 - Provide a session factory for DB access
 - Expose a FastAPI dependency for safe session lifecycle handling
+- Optionally provide an async engine / session (DB_ASYNC) and helpers
+  that run session work without blocking the event loop (run_db)
+- Route read-only sessions to optional read replicas (ReplicaRouter)
 
 QE relevance:
 - Ensures each request uses an isolated DB session
@@ -12,22 +17,285 @@ QE relevance:
 - Enables reliable, repeatable system integration testing
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import itertools
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from fastapi.concurrency import run_in_threadpool
 
 from .config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Connection pool instrumentation
+# -------------------------------------------------
+# Upper bounds (seconds) of the checkout wait histogram
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0)
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's pool, fed by pool events.
+
+    - checkouts / wait_s: how often and how long requests waited for a
+      connection (long waits = pool starvation, not slow queries)
+    - timeouts: checkouts that gave up after DB_POOL_TIMEOUT_S
+    - overflow / peak_overflow: connections beyond DB_POOL_SIZE
+    - connects / closes / invalidations: connection churn
+    - ping_failures: stale connections caught by the pre-ping
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "closes": 0,
+            "invalidations": 0,
+            "ping_failures": 0,
+        }
+        self.peak_overflow = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def overflowed(self, overflow: int) -> None:
+        with self._lock:
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def waited(self, seconds: float) -> None:
+        idx = next(
+            (i for i, bound in enumerate(WAIT_BUCKETS) if seconds <= bound),
+            len(WAIT_BUCKETS),
+        )
+        with self._lock:
+            self.wait_total_s += seconds
+            self.wait_max_s = max(self.wait_max_s, seconds)
+            self.wait_buckets[idx] += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            out = {
+                **self.counts,
+                "wait_s": {
+                    "total": round(self.wait_total_s, 6),
+                    "max": round(self.wait_max_s, 6),
+                    "histogram": {
+                        **{f"le_{bound}": n for bound, n in zip(WAIT_BUCKETS, self.wait_buckets)},
+                        "gt_1.0": self.wait_buckets[-1],
+                    },
+                },
+                "peak_overflow": self.peak_overflow,
+            }
+        if isinstance(pool, QueuePool):
+            out.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+            )
+        return out
+
+
+class _TimedCheckout:
+    """Pool mixin that times how long each checkout waits for a connection."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        # _do_get is where QueuePool blocks when every connection is in use
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.count("timeouts")
+            raise
+        finally:
+            self.metrics.waited(time.perf_counter() - started)
+
+    def recreate(self):
+        # Pools are recreated on dispose/fork: keep the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options(url: str, is_async: bool = False) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}  # in-memory SQLite keeps its single-connection pool
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_S,
+        "pool_recycle": settings.DB_POOL_RECYCLE_S,
+    }
+
+
+def _instrument(target: Engine) -> PoolMetrics:
+    metrics = PoolMetrics()
+    target.pool.metrics = metrics
+    idle_ping = settings.DB_PRE_PING == "idle"
+
+    @event.listens_for(target, "connect")
+    def _on_connect(dbapi_conn, record):
+        metrics.count("connects")
+
+    @event.listens_for(target, "close")
+    def _on_close(dbapi_conn, record):
+        metrics.count("closes")
+
+    @event.listens_for(target, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception):
+        metrics.count("invalidations")
+
+    @event.listens_for(target, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(target, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        metrics.count("checkouts")
+        if isinstance(target.pool, QueuePool):
+            metrics.overflowed(target.pool.overflow())
+
+        if not idle_ping:
+            return
+        last_used = record.info.get("checked_in_at")
+        if last_used is None or time.monotonic() - last_used < settings.DB_PRE_PING_IDLE_S:
+            return
+        # Ping only connections that sat idle (where server-side timeouts
+        # and failovers bite); raising DisconnectionError makes the pool
+        # discard this connection and retry with a fresh one
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.close()
+            dbapi_conn.rollback()
+        except Exception:
+            metrics.count("ping_failures")
+            raise exc.DisconnectionError()
+
+    return metrics
+
+
+def _connect_args(url) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql" and parsed.get_driver_name() == "psycopg":
+        threshold = settings.DB_PREPARE_THRESHOLD
+        return {"prepare_threshold": threshold if threshold >= 0 else None}
+    return {}
+
+
+# Dialects whose insert() supports ON CONFLICT (see upsert_insert)
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _check_dialect(url) -> None:
+    """Fail at engine creation, not at the first job transition."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() not in UPSERT_DIALECTS:
+        raise ValueError(
+            f"Unsupported database {parsed.render_as_string(hide_password=True)}: "
+            f"rollups and caches need INSERT ... ON CONFLICT "
+            f"({', '.join(sorted(UPSERT_DIALECTS))})"
+        )
+
+
+def make_engine(url: str) -> Engine:
+    """
+    Create an engine with the configured pool and instrumentation.
+
+    DB_PRE_PING:
+    - always: round trip on every checkout (SQLAlchemy pool_pre_ping)
+    - idle:   only for connections idle longer than DB_PRE_PING_IDLE_S
+    - off:    never; dropped connections surface as errors
+
+    On Postgres (psycopg), statements are prepared server-side from
+    their DB_PREPARE_THRESHOLD-th execution on a connection.
+
+    Raises ValueError for databases other than Postgres and SQLite.
+    """
+    _check_dialect(url)
+    created = create_engine(
+        url,
+        pool_pre_ping=settings.DB_PRE_PING == "always",
+        connect_args=_connect_args(url),
+        **_pool_options(url),
+    )
+    _instrument(created)
+    return created
+
+
+def _async_url(url: str):
+    # Same database, asyncio driver: psycopg 3 serves both modes;
+    # SQLite needs aiosqlite
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite" and parsed.get_driver_name() == "pysqlite":
+        return parsed.set(drivername="sqlite+aiosqlite")
+    if backend == "postgresql" and parsed.get_driver_name() != "asyncpg":
+        return parsed.set(drivername="postgresql+psycopg")
+    return parsed
+
+
+def make_async_engine(url: str) -> AsyncEngine:
+    """make_engine for the asyncio driver of the same database URL."""
+    _check_dialect(url)
+    created = create_async_engine(
+        _async_url(url),
+        pool_pre_ping=settings.DB_PRE_PING == "always",
+        connect_args=_connect_args(_async_url(url)),
+        **_pool_options(url, is_async=True),
+    )
+    _instrument(created.sync_engine)
+    return created
+
+
+def pool_status(target: Engine | AsyncEngine) -> dict:
+    """Pool occupancy and PoolMetrics of an engine made by make_engine."""
+    if isinstance(target, AsyncEngine):
+        target = target.sync_engine
+    return target.pool.metrics.snapshot(target.pool)
+
+
 # -------------------------------------------------
 # SQLAlchemy engine
 # -------------------------------------------------
-# create_engine creates a pool of DB connections.
-# pool_pre_ping=True ensures connections are validated before use,
-# which prevents errors from stale or dropped connections.
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-)
+# make_engine creates a pool of DB connections, sized and validated
+# according to the DB_POOL_* / DB_PRE_PING settings.
+engine = make_engine(settings.DATABASE_URL)
 
 
 # -------------------------------------------------
@@ -48,6 +316,25 @@ SessionLocal = sessionmaker(
 )
 
 
+# -------------------------------------------------
+# Async engine + session factory (DB_ASYNC=true)
+# -------------------------------------------------
+# AsyncSessionLocal wraps the same Session class as SessionLocal, so the
+# session event hooks (rollup deltas, job events, latency samples) fire
+# for async sessions too. Sync sessions stay available for workers,
+# admin endpoints and startup.
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.DB_ASYNC:
+    async_engine = make_async_engine(settings.DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        sync_session_class=SessionLocal.class_,
+        autoflush=False,
+    )
+
+
 # -------------------------------------------------
 # Declarative base class
 # -------------------------------------------------
@@ -64,6 +351,149 @@ class Base(DeclarativeBase):
     pass
 
 
+# -------------------------------------------------
+# Read replicas
+# -------------------------------------------------
+class ReplicaRouter:
+    """
+    Picks the engine for read-only sessions.
+
+    - Round-robin over replicas that are not marked down
+    - A replica whose connection attempt fails is skipped for
+      REPLICA_RETRY_S, then tried again (lazy health check)
+    - Reads for a key (username) that wrote within REPLICA_STICKY_S go to
+      the primary, so users read their own writes despite replica lag
+    - Falls back to the primary when no replica is usable
+
+    Stickiness is tracked per API process; multi-node deployments should
+    keep a user on one node (or rely on the 404 fallbacks in the routes).
+    """
+
+    def __init__(self, primary: Engine, urls: list[str], retry_s: float, sticky_s: float):
+        self.primary = primary
+        self.replicas = [make_engine(url) for url in urls]
+        self.async_replicas = (
+            [make_async_engine(url) for url in urls] if settings.DB_ASYNC else []
+        )
+        self.retry_s = retry_s
+        self.sticky_s = sticky_s
+        self._down_until = {id(e): 0.0 for e in self.replicas}
+        self._turn = itertools.count()
+        self._writes: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def note_write(self, key: str) -> None:
+        """Pin `key`'s reads to the primary for REPLICA_STICKY_S."""
+        if not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._writes[key] = now
+            if len(self._writes) > 10_000:
+                self._writes = {
+                    k: t for k, t in self._writes.items() if now - t < self.sticky_s
+                }
+
+    def _sticky(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            wrote_at = self._writes.get(key)
+        return wrote_at is not None and time.monotonic() - wrote_at < self.sticky_s
+
+    def _candidates(self) -> list[int]:
+        """Indexes of usable replicas, starting at the next in turn."""
+        now = time.monotonic()
+        start = next(self._turn)
+        ordered = [(start + i) % len(self.replicas) for i in range(len(self.replicas))]
+        return [i for i in ordered if self._down_until[id(self.replicas[i])] <= now]
+
+    def mark_down(self, replica: Engine) -> None:
+        logger.warning("Read replica %s unavailable; skipping for %.0fs",
+                       replica.url.render_as_string(hide_password=True), self.retry_s)
+        self._down_until[id(replica)] = time.monotonic() + self.retry_s
+
+    def session(self, key: Optional[str] = None) -> Session:
+        """Open a session on a healthy replica, or on the primary."""
+        if self.replicas and not self._sticky(key):
+            for i in self._candidates():
+                db = SessionLocal(bind=self.replicas[i])
+                try:
+                    db.connection()  # check out now: fail over before any query
+                    return db
+                except OperationalError:
+                    db.close()
+                    self.mark_down(self.replicas[i])
+        return SessionLocal()
+
+    async def async_session(self, key: Optional[str] = None) -> AsyncSession:
+        """session() for DB_ASYNC: an AsyncSession on a replica or the primary."""
+        if self.async_replicas and not self._sticky(key):
+            for i in self._candidates():
+                db = AsyncSessionLocal(bind=self.async_replicas[i])
+                try:
+                    await db.connection()
+                    return db
+                except OperationalError:
+                    await db.close()
+                    self.mark_down(self.replicas[i])
+        return AsyncSessionLocal()
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": replica.url.render_as_string(hide_password=True),
+                "healthy": self._down_until[id(replica)] <= now,
+            }
+            for replica in self.replicas
+        ]
+
+
+replicas = ReplicaRouter(
+    engine,
+    settings.replica_urls(),
+    retry_s=settings.REPLICA_RETRY_S,
+    sticky_s=settings.REPLICA_STICKY_S,
+)
+
+
+def use_primary(db: Session) -> bool:
+    """
+    Re-point a routed session at the primary (read-your-own-write paths).
+
+    Ends the current transaction, if any; later queries use the primary.
+    Returns False when the session was already on the primary.
+
+    Also works on the sync side of an AsyncSession (inside run_db).
+    """
+    primary = async_engine.sync_engine if db.bind.dialect.is_async else engine
+    if db.bind is primary:
+        return False
+    db.rollback()
+    db.bind = primary
+    return True
+
+
+# -------------------------------------------------
+# Dialect-specific INSERT (upserts)
+# -------------------------------------------------
+def upsert_insert(db: Session):
+    """
+    Return the insert() construct of the session's dialect.
+
+    Postgres and SQLite both support INSERT ... ON CONFLICT, exposed as
+    .on_conflict_do_update() / .on_conflict_do_nothing() on these
+    constructs (used by the result cache and analytics buckets).
+    make_engine only accepts these dialects; the error below is for
+    engines created elsewhere.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_DIALECTS:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return UPSERT_DIALECTS[dialect]
+
+
 # -------------------------------------------------
 # FastAPI dependency for DB sessions
 # -------------------------------------------------
@@ -90,3 +520,47 @@ def get_db():
     finally:
         # Always close the session, even if an exception occurs
         db.close()
+
+
+async def get_async_db():
+    """
+    get_db for DB_ASYNC: yield an AsyncSession for the request.
+
+    The session's connection I/O runs on the event loop, so a request
+    waiting on the database does not occupy a threadpool slot.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency for `async def` routes: AsyncSession with DB_ASYNC, else a
+# sync Session (used through the threadpool by run_db)
+get_session = get_async_db if settings.DB_ASYNC else get_db
+
+
+async def run_db(db: Session | AsyncSession, fn, *args):
+    """
+    Run fn(session, *args) without blocking the event loop.
+
+    - AsyncSession: fn gets its sync facade (AsyncSession.run_sync); the
+      statements go through the asyncio driver
+    - Session: fn runs on the threadpool, as a sync route would
+
+    Lets one sync implementation of the session work serve both modes.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
+
+async def run_in_session(fn, *args):
+    """run_db in a short-lived session of the active mode."""
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+
+    def call():
+        with SessionLocal() as db:
+            return fn(db, *args)
+
+    return await run_in_threadpool(call)
@@ -6,6 +6,10 @@ Responsibilities:
 - Decode and validate tokens
 - Provide user context to endpoints
 - Enforce role-based access control (RBAC)
+- Provide read-only DB sessions routed to replicas (get_read_db)
+
+The auth dependencies are `async def`: token checks are CPU-only, so
+running them on the event loop saves a threadpool hop per request.
 
 QE relevance:
 - Central enforcement point for security behavior
@@ -13,11 +17,17 @@ QE relevance:
 - Ensures unauthorized requests fail early and predictably
 """
 
-from fastapi import Depends, HTTPException
+from typing import AsyncIterator, Iterator, Optional
+
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from .security import decode_token
+from .config import settings
+from .db import replicas
+from .security import token_cache
 
 
 # OAuth2PasswordBearer automatically:
@@ -28,8 +38,12 @@ from .security import decode_token
 # tokenUrl is used by Swagger UI to know where to obtain tokens.
 oauth2 = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Same scheme without the automatic 401, for endpoints that also accept
+# the token as a query parameter (browser EventSource cannot set headers).
+oauth2_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
 
-def get_current_user(token: str = Depends(oauth2)) -> dict:
+async def get_current_user(token: str = Depends(oauth2)) -> dict:
     """
     Dependency that validates the JWT token and returns user context.
 
@@ -46,9 +60,33 @@ def get_current_user(token: str = Depends(oauth2)) -> dict:
     - Central place to test invalid, expired, or tampered tokens
     """
 
+    return _user_from_token(token)
+
+
+async def get_stream_user(
+    header_token: Optional[str] = Depends(oauth2_optional),
+    access_token: Optional[str] = Query(None),
+) -> dict:
+    """
+    Like get_current_user, but also accepts `?access_token=` for streams.
+
+    Used by:
+    - GET /jobs/stream (EventSource clients cannot send Authorization)
+
+    The Authorization header wins when both are present.
+    """
+    token = header_token or access_token
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return _user_from_token(token)
+
+
+def _user_from_token(token: str) -> dict:
+    """Decode a JWT into user context or raise a uniform 401."""
     try:
-        # Decode token (verifies signature + exp claim)
-        payload = decode_token(token)
+        # Decode token (verifies signature + exp claim); tokens verified
+        # earlier are served from the cache until their exp
+        payload = token_cache.decode(token)
 
         # Extract required fields from token
         # KeyError will be raised if expected fields are missing
@@ -66,7 +104,7 @@ def get_current_user(token: str = Depends(oauth2)) -> dict:
         )
 
 
-def require_admin(user: dict = Depends(get_current_user)) -> dict:
+async def require_admin(user: dict = Depends(get_current_user)) -> dict:
     """
     Dependency that enforces admin-only access.
 
@@ -86,3 +124,35 @@ def require_admin(user: dict = Depends(get_current_user)) -> dict:
 
     # Return user context so endpoints can still access it if needed
     return user
+
+
+def _get_read_db(user: dict = Depends(get_current_user)) -> Iterator[Session]:
+    """
+    Dependency providing a session for read-only endpoints.
+
+    The session is bound to a read replica when DATABASE_REPLICA_URLS is
+    set (db.ReplicaRouter), otherwise to the primary. Users who wrote
+    within REPLICA_STICKY_S read from the primary, so a job they just
+    submitted is visible immediately.
+
+    Never write through this session; use db.get_session for that.
+    With DB_ASYNC the session is an AsyncSession (see get_read_db).
+    """
+    db = replicas.session(user["username"])
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def _get_async_read_db(
+    user: dict = Depends(get_current_user),
+) -> AsyncIterator[AsyncSession]:
+    db = await replicas.async_session(user["username"])
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+get_read_db = _get_async_read_db if settings.DB_ASYNC else _get_read_db
@@ -0,0 +1,265 @@
+"""
+Job status events: in-process pub/sub with an optional Redis bridge.
+
+Responsibilities:
+- Record job status transitions on a DB session and publish them only
+  after that session commits (no events for rolled-back work)
+- Fan events out to in-process subscribers (SSE streams)
+- Wake per-job waiters (long-polling GET /jobs/{id}) in O(1) per event
+- Notify synchronous listeners (e.g. analytics cache invalidation)
+- Bridge events across processes/nodes through Redis pub/sub when
+  settings.events_backend() == "redis"
+
+QE/SIT relevance:
+- Clients observe every committed transition without polling
+- Subscribers never see a status that is not yet visible in the DB
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+# Redis channel shared by every API node and worker
+CHANNEL = "job-events"
+
+# Session.info key holding transitions staged until commit
+_PENDING = "job_events"
+
+# Queued in place of a subscriber's backlog once it overflows: events were
+# lost, so the stream must end and the client resync
+OVERFLOWED = object()
+
+
+class EventBus:
+    """
+    Thread-safe publisher with asyncio subscribers.
+
+    - publish() may be called from any thread (API handlers, worker threads,
+      the Redis listener)
+    - subscribe() must be called from a running event loop; each subscriber
+      gets a bounded asyncio.Queue of event dicts
+    - A subscriber that falls EVENTS_QUEUE_SIZE events behind has its
+      backlog replaced by OVERFLOWED rather than slowing publishers down
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        self._queue_size = queue_size
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        # job_id -> [(future, loop, statuses)] for long-poll waiters
+        self._waiters: dict[int, list[tuple]] = {}
+        self._listeners: list = []
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    # -------------------------------------------------
+    # Subscribers
+    # -------------------------------------------------
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def add_listener(self, callback) -> None:
+        """
+        Call `callback(events)` for every delivered batch of events.
+
+        Runs synchronously on the delivering thread (publisher or Redis
+        listener), so callbacks must be cheap and must not raise.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    # -------------------------------------------------
+    # Per-job waiters (long-polling)
+    # -------------------------------------------------
+    def watch(self, job_id: int, statuses: set[str]) -> asyncio.Future:
+        """
+        Return a future resolved with the first event status for `job_id`
+        that is in `statuses`. Must be called from a running event loop;
+        always pair with unwatch().
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.setdefault(job_id, []).append((future, loop, statuses))
+        return future
+
+    def unwatch(self, job_id: int, future: asyncio.Future) -> None:
+        with self._lock:
+            waiters = [w for w in self._waiters.get(job_id, []) if w[0] is not future]
+            if waiters:
+                self._waiters[job_id] = waiters
+            else:
+                self._waiters.pop(job_id, None)
+
+    # -------------------------------------------------
+    # Publishing
+    # -------------------------------------------------
+    def publish(self, events: list[dict]) -> None:
+        """Deliver events locally, or to every node via Redis."""
+        if not events:
+            return
+        if settings.events_backend() == "redis":
+            try:
+                self._redis_client().publish(CHANNEL, json.dumps(events))
+                return
+            except Exception:
+                # Degrade to local delivery rather than losing the events
+                logger.exception("Redis publish failed; delivering locally")
+        self._fanout(events)
+
+    def _fanout(self, events: list[dict]) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+            targets = list(self._subscribers.items())
+            woken = [
+                (waiter, evt["status"])
+                for evt in events
+                for waiter in self._waiters.get(evt["job_id"], ())
+                if evt["status"] in waiter[2]
+            ]
+        for callback in listeners:
+            try:
+                callback(events)
+            except Exception:
+                logger.exception("Job event listener failed")
+        for (future, loop, _), status in woken:
+            try:
+                loop.call_soon_threadsafe(self._resolve, future, status)
+            except RuntimeError:
+                pass
+        for queue, loop in targets:
+            for evt in events:
+                try:
+                    loop.call_soon_threadsafe(self._offer, queue, evt)
+                except RuntimeError:
+                    # Subscriber loop already closed
+                    self.unsubscribe(queue)
+                    break
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, status: str) -> None:
+        if not future.done():
+            future.set_result(status)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, evt: dict) -> None:
+        try:
+            queue.put_nowait(evt)
+        except asyncio.QueueFull:
+            # The subscriber resyncs anyway: drop its backlog, not just evt
+            logger.info("Subscriber fell %d events behind; ending its stream", queue.qsize())
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(OVERFLOWED)
+
+    # -------------------------------------------------
+    # Redis bridge
+    # -------------------------------------------------
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    def start(self) -> None:
+        """Start the Redis listener (no-op for the memory backend)."""
+        if settings.events_backend() != "redis" or self._listener:
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="job-events-redis", daemon=True
+        )
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._listener:
+            self._listener.join(timeout=2)
+            self._listener = None
+
+    def _listen(self) -> None:
+        pubsub = self._redis_client().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CHANNEL)
+        try:
+            while not self._stopping.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    self._fanout(json.loads(message["data"]))
+        finally:
+            pubsub.close()
+
+
+bus = EventBus(queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+# -------------------------------------------------
+# Transaction-bound publishing
+# -------------------------------------------------
+def record_transition(db: Session, job_ids: Iterable[int], status: str) -> None:
+    """
+    Stage status events for jobs changed in `db`'s current transaction.
+
+    Events are published after the session commits and discarded on
+    rollback.
+    """
+    at = datetime.utcnow().isoformat()
+    db.info.setdefault(_PENDING, []).extend(
+        {"job_id": job_id, "status": status, "at": at} for job_id in job_ids
+    )
+
+
+def record_created(db: Session, jobs: Iterable) -> None:
+    """
+    Stage QUEUED events for jobs inserted in `db`'s current transaction.
+
+    Besides job_id / status / at, each event carries the job's list-row
+    fields (submitted_by, created_at), so subscribers can show a new job
+    without reloading GET /jobs.
+    """
+    at = datetime.utcnow().isoformat()
+    db.info.setdefault(_PENDING, []).extend(
+        {
+            "job_id": job.id,
+            "status": "QUEUED",
+            "at": at,
+            "submitted_by": job.submitted_by,
+            "created_at": job.created_at.isoformat(),
+        }
+        for job in jobs
+    )
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        bus.publish(pending)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
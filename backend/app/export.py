@@ -0,0 +1,311 @@
+"""
+Columnar snapshots of finished jobs for offline analytics.
+
+Layout (hive partitioning, one file per partition per run):
+    <EXPORT_DIR>/jobs/finished_date=YYYY-MM-DD/part-<run_id>.parquet
+    <EXPORT_DIR>/jobs/_watermark.json
+
+Responsibilities:
+- Stream DONE/FAILED jobs joined with their results out of the database
+  in EXPORT_CHUNK_ROWS chunks (server-side cursor where supported), so
+  memory stays bounded however large the tables are
+- Write each chunk as Parquet row groups, partitioned by finish date
+- Export incrementally: only jobs after the last (finished_at, id)
+  watermark, and only once they are EXPORT_SETTLE_S old, so transactions
+  still committing behind the watermark are not skipped
+- Query the files with DuckDB, without touching the database
+
+Only terminal jobs are exported: they no longer change, so a snapshot
+never needs rewriting. Reads go to a read replica when one is configured.
+
+Optional dependencies (requirements-export.txt): pyarrow for export,
+duckdb for queries. Concurrent runs into one directory are refused with
+ExportBusy on POSIX (flock); other platforms do not lock.
+
+Usage:
+    python -m app.export                          # incremental export
+    python -m app.export query "SELECT status, count(*) FROM jobs GROUP BY 1"
+
+QE/SIT relevance:
+- Heavy ad-hoc analysis runs on files instead of the OLTP tables
+- Each run reports rows/files written and the new watermark
+"""
+
+import argparse
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import replicas
+from .models import Job, Result
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, runs are not serialized
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+TABLE = "jobs"
+WATERMARK_FILE = "_watermark.json"
+TERMINAL_STATUSES = ("DONE", "FAILED")
+
+
+class ExportUnavailable(RuntimeError):
+    """An optional dependency (pyarrow / duckdb) is not installed."""
+
+
+class ExportBusy(RuntimeError):
+    """Another export is writing to the same directory."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportUnavailable(
+            "Snapshot export requires pyarrow (pip install -r requirements-export.txt)"
+        )
+    return pyarrow
+
+
+def _schema(pa):
+    # Column order matches the SELECT in _statement
+    return pa.schema([
+        ("job_id", pa.int64()),
+        ("submitted_by", pa.string()),
+        ("status", pa.string()),
+        ("input_text", pa.string()),
+        ("attempts", pa.int32()),
+        ("created_at", pa.timestamp("us")),
+        ("started_at", pa.timestamp("us")),
+        ("finished_at", pa.timestamp("us")),
+        ("label", pa.string()),
+        ("confidence", pa.float64()),
+        ("processed_at", pa.timestamp("us")),
+    ])
+
+
+def table_dir(directory: Optional[str] = None) -> Path:
+    return Path(directory or settings.EXPORT_DIR) / TABLE
+
+
+# -------------------------------------------------
+# Watermark
+# -------------------------------------------------
+def read_watermark(directory: Optional[str] = None) -> Optional[dict]:
+    """Last exported position {"finished_at", "job_id", ...} or None."""
+    path = table_dir(directory) / WATERMARK_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _write_watermark(root: Path, watermark: dict) -> None:
+    # Replace atomically: a crash leaves the previous watermark intact
+    tmp = root / f".{WATERMARK_FILE}.tmp"
+    tmp.write_text(json.dumps(watermark, indent=2))
+    os.replace(tmp, root / WATERMARK_FILE)
+
+
+@contextmanager
+def _exclusive(root: Path) -> Iterator[None]:
+    # POSIX only (flock); elsewhere concurrent runs into one EXPORT_DIR
+    # are not detected, so schedule a single exporter
+    if fcntl is None:
+        yield
+        return
+    with open(root / ".lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ExportBusy(f"An export into {root} is already running")
+        yield
+
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def _statement(watermark: Optional[dict], upper: datetime):
+    stmt = (
+        select(
+            Job.id,
+            Job.submitted_by,
+            Job.status,
+            Job.input_text,
+            Job.attempts,
+            Job.created_at,
+            Job.started_at,
+            Job.finished_at,
+            Result.label,
+            Result.confidence,
+            Result.processed_at,
+        )
+        .outerjoin(Result, Result.job_id == Job.id)
+        .where(Job.status.in_(TERMINAL_STATUSES))
+    )
+    settled = Job.finished_at <= upper
+    if watermark is None:
+        # First run: also take jobs finished before finished_at existed
+        stmt = stmt.where(or_(settled, Job.finished_at.is_(None)))
+    else:
+        after = tuple_(Job.finished_at, Job.id) > tuple_(
+            datetime.fromisoformat(watermark["finished_at"]), watermark["job_id"]
+        )
+        stmt = stmt.where(and_(settled, after))
+    # NULL finished_at sorts first on SQLite and is forced first on Postgres
+    return stmt.order_by(Job.finished_at.asc().nulls_first(), Job.id)
+
+
+def export_snapshot(
+    db: Optional[Session] = None,
+    directory: Optional[str] = None,
+    chunk_rows: Optional[int] = None,
+) -> dict:
+    """
+    Append jobs finished since the last watermark to the Parquet snapshot.
+
+    Files are written under temporary names and renamed only after the
+    whole run succeeded, then the watermark is advanced; a failed run
+    leaves no visible files and is simply repeated next time.
+
+    Returns {"run_id", "rows", "files", "watermark"}.
+    """
+    pa = _pyarrow()
+    schema = _schema(pa)
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    root = table_dir(directory)
+    root.mkdir(parents=True, exist_ok=True)
+
+    with _exclusive(root):
+        for stale in root.glob("*/.part-*.tmp"):
+            stale.unlink()
+
+        watermark = read_watermark(directory)
+        started = datetime.utcnow()
+        run_id = started.strftime("%Y%m%dT%H%M%S%fZ")
+        upper = started - timedelta(seconds=settings.EXPORT_SETTLE_S)
+
+        writers: dict[str, object] = {}
+        rows = 0
+        last = None
+        owns_session = db is None
+        db = db or replicas.session()
+        try:
+            result = db.execute(
+                _statement(watermark, upper).execution_options(yield_per=chunk_rows)
+            )
+            for chunk in result.partitions():
+                by_date: dict[str, list] = {}
+                for row in chunk:
+                    day = (row.finished_at or row.created_at).date().isoformat()
+                    by_date.setdefault(day, []).append(row)
+                for day, day_rows in by_date.items():
+                    writer = writers.get(day)
+                    if writer is None:
+                        part = root / f"finished_date={day}"
+                        part.mkdir(exist_ok=True)
+                        writer = writers[day] = pa.parquet.ParquetWriter(
+                            part / f".part-{run_id}.tmp", schema
+                        )
+                    columns = list(zip(*day_rows))
+                    writer.write_table(pa.Table.from_arrays(
+                        [pa.array(values, type=field.type)
+                         for values, field in zip(columns, schema)],
+                        schema=schema,
+                    ))
+                rows += len(chunk)
+                last = chunk[-1]
+        except Exception:
+            for writer in writers.values():
+                writer.close()
+            for stale in root.glob(f"*/.part-{run_id}.tmp"):
+                stale.unlink()
+            raise
+        finally:
+            if owns_session:
+                db.close()
+
+        files = []
+        for day, writer in sorted(writers.items()):
+            writer.close()
+            part = root / f"finished_date={day}"
+            final = part / f"part-{run_id}.parquet"
+            os.replace(part / f".part-{run_id}.tmp", final)
+            files.append(str(final))
+
+        if last is not None:
+            position = last.finished_at
+            if position is None:
+                # Only pre-finished_at jobs so far: resume from the start
+                position = datetime.min
+            watermark = {
+                "finished_at": position.isoformat(),
+                "job_id": last.id if last.finished_at else 0,
+                "run_id": run_id,
+                "exported_at": datetime.utcnow().isoformat(),
+            }
+            _write_watermark(root, watermark)
+
+    logger.info("Exported %d jobs into %d files (watermark %s)", rows, len(files), watermark)
+    return {"run_id": run_id, "rows": rows, "files": files, "watermark": watermark}
+
+
+# -------------------------------------------------
+# Query
+# -------------------------------------------------
+def connect(directory: Optional[str] = None):
+    """
+    DuckDB connection with a `jobs` view over the snapshot files
+    (finished_date is available as a partition column).
+    """
+    try:
+        import duckdb
+    except ImportError:
+        raise ExportUnavailable(
+            "Snapshot queries require duckdb (pip install -r requirements-export.txt)"
+        )
+    # DDL cannot take bind parameters: quote the glob as a SQL literal
+    pattern = (table_dir(directory) / "*" / "*.parquet").as_posix().replace("'", "''")
+    con = duckdb.connect()
+    con.execute(
+        f"CREATE VIEW {TABLE} AS "
+        f"SELECT * FROM read_parquet('{pattern}', hive_partitioning = true)"
+    )
+    return con
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.export")
+    parser.add_argument("--dir", help="snapshot directory (default: EXPORT_DIR)")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("run", help="incremental export (default)")
+    query = sub.add_parser("query", help="run SQL against the snapshot with DuckDB")
+    query.add_argument("sql")
+    args = parser.parse_args(argv)
+
+    if args.command == "query":
+        con = connect(args.dir)
+        cursor = con.execute(args.sql)
+        print("\t".join(column[0] for column in cursor.description))
+        for row in cursor.fetchall():
+            print("\t".join("" if value is None else str(value) for value in row))
+        return
+
+    report = export_snapshot(directory=args.dir)
+    print(json.dumps({k: v for k, v in report.items() if k != "files"}, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
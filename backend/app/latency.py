@@ -0,0 +1,284 @@
+"""
+Streaming latency percentiles per job lifecycle stage.
+
+Stages (from Job timestamps):
+- queue_wait: created_at -> started_at (waiting for a worker)
+- processing: started_at -> finished_at (claim to terminal status)
+- total:      created_at -> finished_at
+
+Responsibilities:
+- Provide a small mergeable quantile sketch (DDSketch: log-spaced
+  buckets with a fixed relative error, no external dependency)
+- Stage stage durations on a DB session when jobs finish and add them
+  to this process's sketches only after that session commits
+- Periodically merge the in-memory sketches into latency_sketches rows
+  from a background thread (LATENCY_FLUSH_S), so every worker process
+  contributes and no committing request waits for the merge
+- Answer p50/p90/p99 from the persisted + unflushed sketches
+
+QE/SIT relevance:
+- Queue wait and processing time are reported separately for capacity
+  planning, without scanning jobs at query time
+- Sketch memory is bounded by the range of durations, not their count
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import SessionLocal, upsert_insert
+from .models import LatencySketch
+
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("queue_wait", "processing", "total")
+
+# Session.info key holding durations staged until commit
+_PENDING = "job_latencies"
+
+
+class DDSketch:
+    """
+    Quantile sketch with relative accuracy `alpha`.
+
+    A value v > 0 is counted in bucket ceil(log_gamma(v)), where
+    gamma = (1 + alpha) / (1 - alpha); any quantile estimate is within
+    alpha * value of the exact one. Sketches with the same alpha merge
+    by adding bucket counts.
+    """
+
+    # Values at or below this are counted as zero (durations in seconds)
+    MIN_VALUE = 1e-6
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "alpha": self.alpha,
+            "bins": self.bins,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "DDSketch":
+        data = json.loads(raw)
+        sketch = cls(data["alpha"])
+        sketch.bins = {int(k): v for k, v in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class LatencyRecorder:
+    """
+    Per-process sketches of committed stage durations.
+
+    add() is called from any thread; flush() merges the unflushed
+    sketches into latency_sketches under a row lock and starts over.
+    The first add() in a process starts a daemon thread that flushes
+    every flush_s seconds (forked workers start their own); shutdown
+    paths call flush() for the remainder.
+    """
+
+    def __init__(self, alpha: float, flush_s: float):
+        self.alpha = alpha
+        self.flush_s = flush_s
+        self._lock = threading.Lock()
+        self._pending = self._empty()
+        self._flusher_pid: Optional[int] = None
+
+    def _empty(self) -> dict[str, DDSketch]:
+        return {stage: DDSketch(self.alpha) for stage in STAGES}
+
+    def add(self, samples: Iterable[dict[str, float]]) -> None:
+        with self._lock:
+            for sample in samples:
+                for stage, seconds in sample.items():
+                    self._pending[stage].add(seconds)
+            if self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(
+                    target=self._flush_loop, name="latency-flush", daemon=True
+                ).start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_s)
+            self.flush()
+
+    def unflushed(self) -> dict[str, DDSketch]:
+        with self._lock:
+            return {
+                stage: DDSketch.from_json(sketch.to_json())
+                for stage, sketch in self._pending.items()
+            }
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, self._empty()
+        pending = {stage: s for stage, s in pending.items() if s.count}
+        if not pending:
+            return
+        try:
+            with SessionLocal() as db:
+                _merge_into_db(db, pending)
+                db.commit()
+        except Exception:
+            # Keep the samples for the next flush rather than losing them
+            logger.exception("Latency sketch flush failed")
+            with self._lock:
+                for stage, sketch in pending.items():
+                    self._pending[stage].merge(sketch)
+
+
+recorder = LatencyRecorder(settings.LATENCY_SKETCH_ACCURACY, settings.LATENCY_FLUSH_S)
+
+
+def _merge_into_db(db: Session, sketches: dict[str, DDSketch]) -> None:
+    now = datetime.utcnow()
+    for stage in sorted(sketches):
+        empty = DDSketch(sketches[stage].alpha).to_json()
+        db.execute(
+            upsert_insert(db)(LatencySketch)
+            .values(stage=stage, sketch=empty, updated_at=now)
+            .on_conflict_do_nothing()
+        )
+        row = db.scalars(
+            select(LatencySketch)
+            .where(LatencySketch.stage == stage)
+            .with_for_update()
+        ).one()
+        merged = DDSketch.from_json(row.sketch)
+        if merged.alpha != sketches[stage].alpha:
+            # LATENCY_SKETCH_ACCURACY changed: restart the persisted sketch
+            logger.warning("Resetting %s latency sketch (accuracy changed)", stage)
+            merged = DDSketch(sketches[stage].alpha)
+        merged.merge(sketches[stage])
+        row.sketch = merged.to_json()
+        row.updated_at = now
+
+
+# -------------------------------------------------
+# Transaction-bound recording
+# -------------------------------------------------
+def stage_durations(
+    created_at: datetime,
+    started_at: Optional[datetime],
+    finished_at: datetime,
+) -> dict[str, float]:
+    """Seconds spent in each stage (jobs claimed before started_at existed
+    only contribute to "total")."""
+    durations = {"total": _seconds(created_at, finished_at)}
+    if started_at is not None:
+        durations["queue_wait"] = _seconds(created_at, started_at)
+        durations["processing"] = _seconds(started_at, finished_at)
+    return durations
+
+
+def _seconds(start: datetime, end: datetime) -> float:
+    # Timestamps come from different hosts' clocks (API vs worker, or the
+    # database's): skew can put `end` first, which counts as zero
+    return max(0.0, (end - start).total_seconds())
+
+
+def record_finished(db: Session, samples: Iterable[dict[str, float]]) -> None:
+    """Stage stage durations for jobs finished in `db`'s transaction."""
+    db.info.setdefault(_PENDING, []).extend(samples)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_after_commit(session: Session) -> None:
+    samples = session.info.pop(_PENDING, None)
+    if samples:
+        recorder.add(samples)  # in memory only; the flush thread persists
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+# -------------------------------------------------
+# Reporting
+# -------------------------------------------------
+def percentiles(db: Session) -> dict[str, dict]:
+    """count / mean / p50 / p90 / p99 / max (seconds) per stage."""
+    sketches = recorder.unflushed()
+    for row in db.scalars(select(LatencySketch)):
+        persisted = DDSketch.from_json(row.sketch)
+        if row.stage in sketches and persisted.alpha == recorder.alpha:
+            sketches[row.stage].merge(persisted)
+
+    return {
+        stage: {
+            "count": sketch.count,
+            "mean": sketch.sum / sketch.count if sketch.count else None,
+            "p50": sketch.quantile(0.50),
+            "p90": sketch.quantile(0.90),
+            "p99": sketch.quantile(0.99),
+            "max": sketch.max if sketch.count else None,
+        }
+        for stage, sketch in sketches.items()
+    }
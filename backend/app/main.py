@@ -4,21 +4,32 @@ for deprecated @app.on_event startup/shutdown handlers).
 
 Responsibilities:
 - Configure middleware (CORS)
-- Initialize application resources on startup (DB schema, seed data)
+- Verify the database schema version on startup (DDL and seeding are
+  explicit commands: `python -m app.migrate`, `python -m app.seed`)
+- Log per-phase startup timings
+- Keep SSE access tokens out of the access log
 - Optionally clean up resources on shutdown
 - Register API routers
 """
 
+import time
+
+# Taken before the application imports so the "imports" phase covers them
+_IMPORT_STARTED = time.perf_counter()
+
 import logging
-from contextlib import asynccontextmanager
+import re
+from contextlib import asynccontextmanager, contextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .db import Base, engine, SessionLocal
-from .seed import seed_users
+from .db import async_engine
+from . import latency, migrate
+from .events import bus
 from .routes import auth, jobs, analytics, admin
+from .worker import dispatch, result_cache
 
 
 # -------------------------------------------------
@@ -28,6 +39,41 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class RedactAccessToken(logging.Filter):
+    """
+    Mask `access_token=` query values in access log lines.
+
+    EventSource clients authenticate GET /jobs/stream with the JWT in
+    the query string, which uvicorn's access log would otherwise print.
+    """
+
+    _TOKEN = re.compile(r"(access_token=)[^&\s]+")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                self._TOKEN.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg
+                for arg in record.args
+            )
+        return True
+
+
+logging.getLogger("uvicorn.access").addFilter(RedactAccessToken())
+
+
+# -------------------------------------------------
+# Startup timing
+# -------------------------------------------------
+@contextmanager
+def _phase(timings: dict, name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+        logger.info("Startup phase %s: %.1f ms", name, timings[name])
+
+
 # -------------------------------------------------
 # Lifespan event handler (startup + shutdown)
 # -------------------------------------------------
@@ -39,11 +85,15 @@ async def lifespan(app: FastAPI):
     This replaces deprecated @app.on_event("startup") and ("shutdown").
 
     Startup responsibilities:
-    - Create database tables (demo-safe, idempotent)
-    - Seed baseline users for authentication testing
+    - Check the schema version (one primary-key query); refuse to start
+      against a database `python -m app.migrate` has not brought up to date
+    - Start the job-events Redis listener (multi-node deployments)
+    - Log how long each phase took, tagged with APP_RELEASE
 
     Shutdown responsibilities:
     - Log shutdown event
+    - Stop in-process background job workers and the events listener
+    - Persist unflushed latency samples
     - Close or release shared resources if applicable
 
     Why this matters for QE:
@@ -52,21 +102,26 @@ async def lifespan(app: FastAPI):
     - Centralized lifecycle control
     """
     logger.info("Lifespan startup: initializing application resources...")
-
-    # Initialize database schema
-    Base.metadata.create_all(bind=engine)
-
-    # Seed initial data (admin/viewer users)
-    db = SessionLocal()
-    try:
-        seed_users(db)
-        logger.info("Lifespan startup: database seeded successfully.")
-    except Exception as exc:
-        logger.exception("Startup failed during DB initialization: %s", exc)
-        raise
-    finally:
-         # Always close the session to avoid leaks.
-        db.close()
+    timings = {"imports": (time.perf_counter() - _IMPORT_STARTED) * 1000}
+    logger.info("Startup phase imports: %.1f ms", timings["imports"])
+
+    # No DDL and no seeding here: both are explicit commands, so booting
+    # another API process under load costs one query
+    with _phase(timings, "schema_check"):
+        try:
+            version = migrate.check()
+        except migrate.SchemaOutOfDate as exc:
+            logger.error("Startup failed: %s", exc)
+            raise
+
+    # Cross-node job events (no-op unless the Redis events backend is used)
+    with _phase(timings, "events"):
+        bus.start()
+
+    logger.info(
+        "Startup complete in %.1f ms (release %s, schema version %d)",
+        sum(timings.values()), settings.APP_RELEASE, version,
+    )
 
     # Yield control back to FastAPI (app starts accepting requests here)
     yield
@@ -74,6 +129,14 @@ async def lifespan(app: FastAPI):
     # Shutdown logic (optional but important for real systems)
     logger.info("Lifespan shutdown: application is shutting down.")
 
+    # Let in-process background workers finish in-flight jobs
+    dispatch.shutdown()
+    latency.recorder.flush()
+    result_cache.touches.flush()
+    bus.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 # -------------------------------------------------
 # FastAPI application instance
@@ -100,6 +163,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],  # needed for Authorization header (JWT)
+    expose_headers=["X-Next-Cursor"],  # GET /jobs keyset pagination
 )
 
 # -------------------------------------------------
@@ -0,0 +1,220 @@
+"""
+Schema migrations, run explicitly instead of at API startup.
+
+Responsibilities:
+- Apply the schema steps a database is missing (STEPS, oldest first)
+  and record the result in the schema_version row
+- Create the analytics rollup rows (rebuilt from the tables if missing)
+- Tell API startup, with one cheap query, whether the schema is current
+
+Version 1 creates every missing table from the models (create_all).
+create_all never alters an existing table, so each later change to an
+existing table is its own step that adds the missing columns / indexes
+(_add_columns, _add_index). Steps check what exists first, so they are
+no-ops on a database that version 1 just created, and a database built
+before schema_version existed is upgraded by running the command once.
+A schema change appends a step; SCHEMA_VERSION follows.
+
+Usage:
+    python -m app.migrate            # apply pending steps
+    python -m app.migrate --check    # exit 1 unless the schema is current
+
+QE/SIT relevance:
+- API pods boot without DDL or bcrypt; a stale schema fails fast with
+  an explicit message instead of erroring on the first request
+- Environments are prepared in a visible pipeline step (see CI)
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import exc, insert, inspect, literal, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+
+from . import rollup
+from .db import Base, SessionLocal, engine
+from .models import SchemaVersion
+
+
+logger = logging.getLogger(__name__)
+
+ROW_ID = 1
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database schema is older than this code expects."""
+
+
+def _add_columns(conn: Connection, table: str, names: list[str]) -> list[str]:
+    """ALTER TABLE ... ADD COLUMN for model columns missing in the database."""
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+    model = Base.metadata.tables[table]
+    added = []
+    for name in names:
+        if name in existing:
+            continue
+        column = model.c[name]
+        ddl = str(CreateColumn(column).compile(dialect=conn.dialect))
+        default = column.default
+        if not column.nullable and default is not None and default.is_scalar:
+            # NOT NULL needs a DEFAULT to fill the rows that already exist
+            value = literal(default.arg, column.type).compile(
+                dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+            )
+            ddl += f" DEFAULT {value}"
+        quoted = conn.dialect.identifier_preparer.quote_identifier(table)
+        conn.exec_driver_sql(f"ALTER TABLE {quoted} ADD COLUMN {ddl}")
+        added.append(name)
+    return added
+
+
+def _add_index(conn: Connection, table: str, name: str) -> bool:
+    """Create a model index missing in the database."""
+    if name in {index["name"] for index in inspect(conn).get_indexes(table)}:
+        return False
+    index = next(i for i in Base.metadata.tables[table].indexes if i.name == name)
+    index.create(conn)
+    return True
+
+
+def _baseline(conn: Connection) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def _job_leases(conn: Connection) -> None:
+    # DB-backed job queue: lease owner / expiry and claim count
+    # (attempts is NOT NULL: existing rows get the model default, 0)
+    _add_columns(conn, "jobs", ["lease_owner", "lease_expires_at", "attempts"])
+
+
+def _job_page_index(conn: Connection) -> None:
+    # Keyset pagination of GET /jobs (status, created_at, id)
+    _add_index(conn, "jobs", "ix_jobs_status_created_at_id")
+
+
+def _job_timestamps(conn: Connection) -> None:
+    # Lifecycle timing for the latency sketches
+    _add_columns(conn, "jobs", ["started_at", "finished_at"])
+
+
+def _shard_job_buckets(conn: Connection) -> None:
+    # Sharded time-series counters: `shard` joins the primary key. A
+    # primary key cannot be altered portably, so the table (bounded by
+    # retention) is copied out, recreated and refilled as shard 1.
+    if "shard" in {column["name"] for column in inspect(conn).get_columns("job_buckets")}:
+        return
+    table = Base.metadata.tables["job_buckets"]
+    rows = conn.execute(
+        select(*(column for column in table.c if column.name != "shard"))
+    ).mappings().all()
+    table.drop(conn)
+    table.create(conn)
+    if rows:
+        conn.execute(insert(table), [{**row, "shard": 1} for row in rows])
+
+
+# version -> step bringing the schema from version - 1 to version
+STEPS: dict[int, Callable[[Connection], None]] = {
+    1: _baseline,
+    2: _job_leases,
+    3: _job_page_index,
+    4: _job_timestamps,
+    5: _shard_job_buckets,
+}
+SCHEMA_VERSION = max(STEPS)
+
+
+def current_version(bind: Engine = engine) -> Optional[int]:
+    """Applied schema version; None if the database was never migrated."""
+    try:
+        with bind.connect() as conn:
+            return conn.scalar(
+                select(SchemaVersion.version).where(SchemaVersion.id == ROW_ID)
+            )
+    except (exc.OperationalError, exc.ProgrammingError):
+        return None  # no schema_version table yet
+
+
+def check(bind: Engine = engine) -> int:
+    """
+    Raise SchemaOutOfDate unless the schema is at least SCHEMA_VERSION.
+
+    A newer schema is accepted (with a warning): during a rolling deploy
+    the previous release keeps running after the migration.
+    """
+    version = current_version(bind)
+    if version is None or version < SCHEMA_VERSION:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version or 0}, this release "
+            f"needs {SCHEMA_VERSION}: run `python -m app.migrate`"
+        )
+    if version > SCHEMA_VERSION:
+        logger.warning(
+            "Database schema version %d is newer than this release (%d)",
+            version, SCHEMA_VERSION,
+        )
+    return version
+
+
+def _record(conn: Connection, version: int) -> None:
+    values = {"version": version, "applied_at": datetime.utcnow()}
+    updated = conn.execute(
+        update(SchemaVersion).where(SchemaVersion.id == ROW_ID).values(**values)
+    ).rowcount
+    if not updated:
+        conn.execute(insert(SchemaVersion).values(id=ROW_ID, **values))
+
+
+def migrate(bind: Engine = engine) -> dict:
+    """
+    Apply pending steps and ensure the rollup rows exist.
+
+    Each step and its version bump commit together, so an interrupted
+    run resumes at the first unapplied step.
+
+    Returns {"from": version, "to": version}.
+    """
+    start = current_version(bind) or 0
+    for version in range(start + 1, SCHEMA_VERSION + 1):
+        with bind.begin() as conn:
+            STEPS[version](conn)
+            _record(conn, version)
+        logger.info("Applied schema step %d", version)
+
+    with SessionLocal(bind=bind) as db:
+        rollup.ensure(db)
+
+    return {"from": start, "to": max(start, SCHEMA_VERSION)}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="only report; exit 1 unless the schema is current",
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        try:
+            version = check()
+        except SchemaOutOfDate as err:
+            print(err, file=sys.stderr)
+            sys.exit(1)
+        print(f"Schema is current (version {version})")
+        return
+
+    report = migrate()
+    if report["from"] == report["to"]:
+        print(f"Schema is current (version {report['to']})")
+    else:
+        print(f"Schema migrated from version {report['from']} to {report['to']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -2,7 +2,9 @@
 SQLAlchemy ORM models representing the database schema.
 
 Responsibilities:
-- Define persistent entities (User, Job, Result)
+- Define persistent entities (User, Job, Result, RefreshToken) and
+  derived tables (JobStats rollup, JobBucket time series, LatencySketch,
+  ResultCache) and the SchemaVersion marker
 - Enforce data integrity via constraints (unique keys, foreign keys)
 - Provide relationships for convenient ORM navigation
 
@@ -13,7 +15,8 @@ QE/SIT relevance:
 """
 
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Float
+from typing import Optional
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import Base
 
@@ -56,11 +59,25 @@ class Job(Base):
     - DONE: worker finished and wrote Result
     - FAILED: worker encountered an error (no Result or partial data)
 
+    Leases:
+    - lease_owner / lease_expires_at record which worker holds a
+      PROCESSING job (see worker/db_queue.py)
+    - attempts counts claims, so re-claims of expired leases are visible
+
+    Timing:
+    - created_at (queued) -> started_at (claimed) -> finished_at (terminal)
+      feed the per-stage latency sketches (see latency.py)
+
     QE relevance:
     - SIT validates status transitions and timestamps
     - Regression tests ensure API/worker keep lifecycle consistent
     """
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination for GET /jobs?status=...: equality on status,
+        # then (created_at, id) range + order served from the index.
+        Index("ix_jobs_status_created_at_id", "status", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -84,6 +101,24 @@ class Job(Base):
     # job payload / request input
     input_text: Mapped[str] = mapped_column(Text)
 
+    # DB-queue lease: which worker claimed the job and until when.
+    # Set on claim (QUEUED -> PROCESSING), cleared on DONE/FAILED.
+    # An expired lease on a PROCESSING job makes it claimable again.
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+
+    # Lifecycle timing (created_at is the queued time):
+    # started_at is set on each claim, finished_at on DONE/FAILED.
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Number of times a worker claimed the job. 1 on the first claim
+    # (QUEUED -> PROCESSING); > 1 when an expired lease was re-claimed.
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+
     # One-to-one relationship: a job produces a single result.
     # cascade="all,delete" means if job is deleted, delete its result too.
     result = relationship(
@@ -122,3 +157,166 @@ class Result(Base):
 
     # back reference to the Job (ORM navigation)
     job = relationship("Job", back_populates="result")
+
+
+class JobStats(Base):
+    """
+    Analytics rollup counters (see rollup.py).
+
+    One row per shard (id 1..ROLLUP_SHARDS): each transaction adds its
+    deltas to one shard, and the totals are the sum over all rows.
+
+    Fields:
+    - queued/processing/done/failed: current number of jobs per status
+    - confidence_sum/confidence_count: running totals over results
+    - updated_at: time of the last applied delta or rebuild
+
+    Maintained incrementally in the same transaction as every job status
+    transition; rollup.rebuild() recomputes it from jobs/results.
+
+    QE relevance:
+    - GET /analytics/summary sums ROLLUP_SHARDS rows regardless of history size
+    - The reconciliation rebuild reports any drift between the two
+    """
+    __tablename__ = "job_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    queued: Mapped[int] = mapped_column(Integer, default=0)
+    processing: Mapped[int] = mapped_column(Integer, default=0)
+    done: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+
+    confidence_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    confidence_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class JobBucket(Base):
+    """
+    Pre-aggregated job activity per time bucket (see rollup.py).
+
+    One row per (resolution, bucket_start, shard), resolution in
+    1m | 1h | 1d. Every resolution is maintained on write (the coarser
+    ones are the downsampled views); old fine-grained rows are pruned by
+    retention. Like job_stats, writers spread over ROLLUP_SHARDS rows per
+    bucket and reads sum them.
+
+    Fields:
+    - submitted/done/failed: jobs created / finished / failed in the bucket
+    - confidence_sum/confidence_count: totals over results written in it
+
+    QE relevance:
+    - GET /analytics/timeseries is a primary-key range read, independent
+      of the size of jobs/results
+    """
+    __tablename__ = "job_buckets"
+
+    resolution: Mapped[str] = mapped_column(String(4), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+
+    submitted: Mapped[int] = mapped_column(Integer, default=0)
+    done: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+
+    confidence_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    confidence_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class LatencySketch(Base):
+    """
+    Persisted DDSketch per lifecycle stage (see latency.py).
+
+    Fields:
+    - stage: queue_wait | processing | total
+    - sketch: JSON-serialized sketch (mergeable bucket counts)
+
+    Processes merge their in-memory sketches into these rows periodically;
+    GET /analytics/latency reads them instead of scanning jobs.
+    """
+    __tablename__ = "latency_sketches"
+
+    stage: Mapped[str] = mapped_column(String(30), primary_key=True)
+    sketch: Mapped[str] = mapped_column(Text)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class ResultCache(Base):
+    """
+    Content-addressed prediction cache (see worker/result_cache.py).
+
+    Fields:
+    - input_hash: sha256 of the model identity (backend, HTTP endpoint,
+      INFERENCE_MODEL_VERSION; see inference.model_identity) + normalized
+      input text
+    - label/confidence: the memoized prediction
+    - created_at: drives TTL expiry (RESULT_CACHE_TTL_S)
+    - last_hit_at/hits: drive LRU eviction (RESULT_CACHE_MAX_ENTRIES)
+
+    QE relevance:
+    - Duplicate inputs finish without a model call, with the same output
+    - Failed (crash) predictions are never cached
+    """
+    __tablename__ = "result_cache"
+
+    input_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    label: Mapped[str] = mapped_column(String(50))
+    confidence: Mapped[float] = mapped_column(Float)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_hit_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        index=True,
+    )
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class RefreshToken(Base):
+    """
+    Issued refresh tokens (see tokens.py); the secret itself is never stored.
+
+    Fields:
+    - id: public token id (first part of the opaque token)
+    - family_id: id of the login session; every rotation stays in it
+    - secret_hash: sha256 of the token's secret part
+    - expires_at: absolute expiry (REFRESH_EXPIRE_MIN after issue)
+    - used_at: set when the token was rotated; presenting it again is
+      treated as theft and revokes the family
+    - revoked_at: set on logout / reuse detection
+
+    Rows are pruned per user once expired, so the table stays at about
+    one live row per active session.
+
+    QE relevance:
+    - Rotation, reuse detection and logout are testable through the API
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    family_id: Mapped[str] = mapped_column(String(32), index=True)
+    username: Mapped[str] = mapped_column(String(100), index=True)
+    secret_hash: Mapped[str] = mapped_column(String(64))
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    used_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class SchemaVersion(Base):
+    """
+    Single row (id = 1) recording the schema version applied by
+    `python -m app.migrate`.
+
+    API startup reads it with one primary-key query instead of running
+    DDL, and refuses to start against an older schema.
+    """
+    __tablename__ = "schema_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,103 @@
+"""
+Pre-built statements for the hot request paths.
+
+SQLAlchemy caches compiled SQL per statement shape, but a statement
+written with select() or the legacy Query API is still constructed, and
+its cache key generated, on every call. The statements here are built
+once at import with bindparam() placeholders; a call only passes the
+parameter values, and the compiled form comes straight from the cache.
+
+Measured with `python -m app.bench_queries`: about half the per-call
+overhead of the Query API versions, or less. Lambda statements
+(lambda_stmt) showed no consistent gain over plain select() for these
+ORM queries on SQLAlchemy 2.x, so they are not used.
+
+Rules for adding statements:
+- Build the statement at module level with named bindparam()s; give
+  the bindparam an explicit type when it is not compared directly
+  with a column (e.g. inside tuple_())
+- Optional criteria get one pre-built variant per combination
+- Expose a small function taking the session and plain values
+
+Session.get (get_job, refresh-token lookups) already goes through the
+identity map and SQLAlchemy's cached primary-key load, so it stays.
+
+QE/SIT relevance:
+- Same SQL and results as before; only Python-side overhead changes
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Integer, bindparam, select, tuple_
+from sqlalchemy.orm import Session
+
+from .models import Job, Result, User
+
+
+_JOB_STATUS = select(Job.status).where(Job.id == bindparam("job_id"))
+
+_RESULT_FOR_JOB = select(Result).where(Result.job_id == bindparam("job_id")).limit(1)
+
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username")).limit(1)
+
+
+def _job_page_statement(by_status: bool, after_cursor: bool):
+    stmt = select(Job)
+    if by_status:
+        stmt = stmt.where(Job.status == bindparam("status"))
+    if after_cursor:
+        stmt = stmt.where(
+            tuple_(Job.created_at, Job.id)
+            < tuple_(
+                bindparam("created_at", type_=Job.created_at.type),
+                bindparam("cursor_id", type_=Job.id.type),
+            )
+        )
+    return stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(
+        bindparam("limit", type_=Integer)
+    )
+
+
+# (status filter?, cursor?) -> statement
+_JOB_PAGES = {
+    (by_status, after_cursor): _job_page_statement(by_status, after_cursor)
+    for by_status in (False, True)
+    for after_cursor in (False, True)
+}
+
+
+def job_status(db: Session, job_id: int) -> Optional[str]:
+    """Current status of one job (SSE snapshot, long-poll re-check)."""
+    return db.scalar(_JOB_STATUS, {"job_id": job_id})
+
+
+def result_for_job(db: Session, job_id: int) -> Optional[Result]:
+    """The Result row of a job (GET /jobs/{id}/result)."""
+    return db.scalars(_RESULT_FOR_JOB, {"job_id": job_id}).first()
+
+
+def user_by_username(db: Session, username: str) -> Optional[User]:
+    """Login and refresh lookups (unique index on users.username)."""
+    return db.scalars(_USER_BY_USERNAME, {"username": username}).first()
+
+
+def job_page(
+    db: Session,
+    limit: int,
+    status: Optional[str] = None,
+    before: Optional[tuple[datetime, int]] = None,
+) -> list[Job]:
+    """
+    One keyset page of GET /jobs, newest first.
+
+    - status: optional status filter
+    - before: (created_at, id) of the previous page's last row
+    """
+    params: dict = {"limit": limit}
+    if status:
+        params["status"] = status
+    if before:
+        params["created_at"], params["cursor_id"] = before
+    stmt = _JOB_PAGES[(bool(status), bool(before))]
+    return db.scalars(stmt, params).all()
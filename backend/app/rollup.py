@@ -0,0 +1,365 @@
+"""
+Incrementally maintained analytics rollups.
+
+- job_stats:   all-time totals (GET /analytics/summary)
+- job_buckets: submitted/done/failed + confidence per time bucket at
+               1m / 1h / 1d resolution (GET /analytics/timeseries)
+
+Both are sharded: every total / bucket has ROLLUP_SHARDS counter rows.
+A transaction adds its deltas to one shard, picked at random, so
+concurrent transitions rarely wait on the same row lock; reads sum the
+shards.
+
+Responsibilities:
+- Stage per-status count deltas and result confidence totals on a DB
+  session as jobs change state
+- Apply the staged deltas in the same transaction, just before it
+  commits (nothing is applied for rolled-back work): one UPDATE of a
+  job_stats shard and one multi-row upsert of the current buckets
+- Sum the shards on read (totals, series)
+- Rebuild job_stats from jobs/results (reconciliation) and report drift
+- Prune buckets older than their resolution's retention (scheduled on
+  its own every TIMESERIES_PRUNE_INTERVAL_S, see worker/celery_app.py)
+
+Usage (reconciliation + retention job):
+    python -m app.rollup
+
+QE/SIT relevance:
+- Analytics reads are O(shards) / O(buckets x shards) instead of
+  full-table aggregates
+- Deltas commit atomically with the transitions they describe, so the
+  rollup never disagrees with committed job rows
+"""
+
+import logging
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import SessionLocal, upsert_insert
+from .models import Job, JobBucket, JobStats, Result
+
+
+logger = logging.getLogger(__name__)
+
+# job_stats shard holding the totals after a rebuild (shard ids 1..N)
+ROW_ID = 1
+
+# Session.info keys holding deltas staged until commit
+_PENDING = "job_stats_delta"
+_PENDING_BUCKETS = "job_bucket_delta"
+
+# Job.status -> JobStats column
+STATUS_COLUMNS = {
+    "QUEUED": "queued",
+    "PROCESSING": "processing",
+    "DONE": "done",
+    "FAILED": "failed",
+}
+
+COLUMNS = (*STATUS_COLUMNS.values(), "confidence_sum", "confidence_count")
+
+# Bucket resolutions (each maintained on write) and their widths
+RESOLUTIONS = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Status reached -> JobBucket column (QUEUED only for new jobs)
+BUCKET_COLUMNS = {"QUEUED": "submitted", "DONE": "done", "FAILED": "failed"}
+
+BUCKET_FIELDS = ("submitted", "done", "failed", "confidence_sum", "confidence_count")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _delta(db: Session, key: str = _PENDING) -> Counter:
+    return db.info.setdefault(key, Counter())
+
+
+def count_transition(
+    db: Session,
+    n: int,
+    status: str,
+    previous: Optional[str] = None,
+) -> None:
+    """Stage `n` jobs moving from `previous` (None = new job) to `status`."""
+    if n <= 0:
+        return
+    delta = _delta(db)
+    delta[STATUS_COLUMNS[status]] += n
+    if previous is not None:
+        delta[STATUS_COLUMNS[previous]] -= n
+
+    # Time series: job submissions and terminal outcomes
+    if status in BUCKET_COLUMNS and (status != "QUEUED" or previous is None):
+        _delta(db, _PENDING_BUCKETS)[BUCKET_COLUMNS[status]] += n
+
+
+def count_results(db: Session, confidences: Iterable[float]) -> None:
+    """Stage confidence totals for Result rows written in this transaction."""
+    confidences = list(confidences)
+    if confidences:
+        for delta in (_delta(db), _delta(db, _PENDING_BUCKETS)):
+            delta["confidence_sum"] += sum(confidences)
+            delta["confidence_count"] += len(confidences)
+
+
+def totals(db: Session) -> dict:
+    """All-time totals: the job_stats shards summed (zeros before the first job)."""
+    row = db.execute(
+        select(*(func.coalesce(func.sum(getattr(JobStats, c)), 0) for c in COLUMNS))
+    ).one()
+    return dict(zip(COLUMNS, row))
+
+
+def _apply(db: Session, delta: Counter, shard: int) -> None:
+    values = {
+        column: getattr(JobStats, column) + amount
+        for column, amount in delta.items()
+        if amount
+    }
+    if not values:
+        return
+    values["updated_at"] = datetime.utcnow()
+    updated = db.execute(
+        update(JobStats).where(JobStats.id == shard).values(**values)
+    ).rowcount
+    if not updated:
+        # Shard row missing (first job, or ROLLUP_SHARDS raised): seed
+        # every shard from the tables (this transaction included)
+        rebuild(db)
+
+
+def bucket_start(at: datetime, resolution: str) -> datetime:
+    """Start of the `resolution` bucket containing `at` (naive UTC)."""
+    return at - (at - _EPOCH) % RESOLUTIONS[resolution]
+
+
+def _apply_buckets(db: Session, delta: Counter, shard: int) -> None:
+    now = datetime.utcnow()
+    counts = {column: delta.get(column, 0) for column in BUCKET_FIELDS}
+    stmt = upsert_insert(db)(JobBucket)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobBucket.resolution, JobBucket.bucket_start, JobBucket.shard],
+        set_={
+            column: getattr(JobBucket, column) + getattr(stmt.excluded, column)
+            for column in counts
+        },
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "resolution": resolution,
+                "bucket_start": bucket_start(now, resolution),
+                "shard": shard,
+                **counts,
+            }
+            for resolution in RESOLUTIONS
+        ],
+    )
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _apply_before_commit(session: Session) -> None:
+    # One shard for the whole transaction: stats row and bucket rows are
+    # always locked in the same order, whichever shard was picked
+    shard = random.randint(1, settings.ROLLUP_SHARDS)
+    delta = session.info.pop(_PENDING, None)
+    if delta:
+        _apply(session, delta, shard)
+    buckets = session.info.pop(_PENDING_BUCKETS, None)
+    if buckets:
+        _apply_buckets(session, buckets, shard)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+    session.info.pop(_PENDING_BUCKETS, None)
+
+
+# -------------------------------------------------
+# Reconciliation
+# -------------------------------------------------
+def compute(db: Session) -> dict:
+    """Recompute the rollup values from jobs/results (full scan)."""
+    values = {column: 0 for column in COLUMNS}
+    for status, count in db.execute(
+        select(Job.status, func.count(Job.id)).group_by(Job.status)
+    ):
+        if status in STATUS_COLUMNS:
+            values[STATUS_COLUMNS[status]] = count
+    conf_sum, conf_count = db.execute(
+        select(func.coalesce(func.sum(Result.confidence), 0.0), func.count(Result.id))
+    ).one()
+    values["confidence_sum"] = float(conf_sum)
+    values["confidence_count"] = conf_count
+    return values
+
+
+def rebuild(db: Session) -> dict:
+    """
+    Rewrite the rollup shards from scratch (caller commits).
+
+    The shard rows are written first, which locks them (row locks on
+    Postgres, write lock on SQLite): concurrent transitions wait for the
+    rebuild to commit and then apply their deltas on top of it. The
+    totals go to shard ROW_ID and the other shards are zeroed; missing
+    shards are created.
+
+    Returns:
+        dict: {"before", "after", "drift"} where drift = after - before
+              for every column that disagreed ("before" is None when no
+              shard existed yet).
+    """
+    now = datetime.utcnow()
+    rows = db.execute(
+        update(JobStats)
+        .values(updated_at=now)
+        .returning(JobStats.id, *(getattr(JobStats, column) for column in COLUMNS))
+    ).all()
+    before = (
+        {column: sum(getattr(row, column) for row in rows) for column in COLUMNS}
+        if rows
+        else None
+    )
+
+    after = compute(db)
+    zeros = {column: 0 for column in COLUMNS}
+    db.execute(update(JobStats).where(JobStats.id == ROW_ID).values(**after))
+    db.execute(update(JobStats).where(JobStats.id != ROW_ID).values(**zeros))
+    existing = {row.id for row in rows}
+    missing = [
+        shard for shard in range(1, settings.ROLLUP_SHARDS + 1) if shard not in existing
+    ]
+    if missing:
+        db.execute(
+            insert(JobStats),
+            [
+                {"id": shard, "updated_at": now, **(after if shard == ROW_ID else zeros)}
+                for shard in missing
+            ],
+        )
+    if before is None:
+        # First build: nothing to compare against
+        return {"before": None, "after": after, "drift": {}}
+
+    drift = {
+        column: after[column] - before[column]
+        for column in COLUMNS
+        # float tolerance: confidence_sum is accumulated in a different order
+        if abs(after[column] - before[column]) > 1e-9 * max(1.0, abs(after[column]))
+    }
+    if drift:
+        logger.warning("job_stats rollup drift corrected: %s", drift)
+    return {"before": before, "after": after, "drift": drift}
+
+
+# -------------------------------------------------
+# Time series
+# -------------------------------------------------
+def retention() -> dict[str, int]:
+    """Retention in seconds per resolution (0 = keep forever)."""
+    return {
+        "1m": settings.TIMESERIES_RETENTION_1M_S,
+        "1h": settings.TIMESERIES_RETENTION_1H_S,
+        "1d": settings.TIMESERIES_RETENTION_1D_S,
+    }
+
+
+def retained_since(resolution: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Oldest bucket start kept at `resolution` (None = kept forever)."""
+    seconds = retention()[resolution]
+    if seconds <= 0:
+        return None
+    return (now or datetime.utcnow()) - timedelta(seconds=seconds)
+
+
+def prune_buckets(db: Session) -> int:
+    """Delete buckets past their resolution's retention (caller commits)."""
+    now = datetime.utcnow()
+    removed = 0
+    for resolution in RESOLUTIONS:
+        cutoff = retained_since(resolution, now)
+        if cutoff is not None:
+            removed += db.execute(
+                delete(JobBucket).where(
+                    JobBucket.resolution == resolution,
+                    JobBucket.bucket_start < cutoff,
+                )
+            ).rowcount
+    return removed
+
+
+def series(db: Session, resolution: str, start: datetime, end: datetime) -> list[dict]:
+    """
+    Dense series of buckets covering [start, end) at `resolution`.
+
+    One primary-key range read, shards summed per bucket; buckets
+    without activity (or already pruned) are returned as zeros.
+    """
+    step = RESOLUTIONS[resolution]
+    first = bucket_start(start, resolution)
+    rows = {
+        row.bucket_start: row
+        for row in db.execute(
+            select(
+                JobBucket.bucket_start,
+                *(func.sum(getattr(JobBucket, f)).label(f) for f in BUCKET_FIELDS),
+            )
+            .where(
+                JobBucket.resolution == resolution,
+                JobBucket.bucket_start >= first,
+                JobBucket.bucket_start < end,
+            )
+            .group_by(JobBucket.bucket_start)
+        )
+    }
+
+    points = []
+    at = first
+    while at < end:
+        row = rows.get(at)
+        points.append({
+            "start": at,
+            "submitted": row.submitted if row else 0,
+            "done": row.done if row else 0,
+            "failed": row.failed if row else 0,
+            "avg_confidence": (
+                row.confidence_sum / row.confidence_count
+                if row and row.confidence_count
+                else None
+            ),
+        })
+        at += step
+    return points
+
+
+def ensure(db: Session) -> None:
+    """Create the rollup shards from the current tables if any is missing."""
+    shards = db.scalar(
+        select(func.count())
+        .select_from(JobStats)
+        .where(JobStats.id.between(1, settings.ROLLUP_SHARDS))
+    )
+    if shards < settings.ROLLUP_SHARDS:
+        rebuild(db)
+        db.commit()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as session:
+        report = rebuild(session)
+        pruned = prune_buckets(session)
+        session.commit()
+    logger.info("job_stats rebuilt: %s", report["after"])
+    logger.info("job_buckets pruned: %d", pruned)
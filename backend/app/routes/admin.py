@@ -12,8 +12,15 @@ QE relevance:
 - Supports CI/CD and monitoring workflows
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from .. import export, rollup
+from ..cache import analytics_cache
+from ..db import async_engine, engine, get_db, pool_status, replicas
 from ..deps import require_admin
+from ..security import password_hasher, token_cache
+from ..worker import result_cache
 
 # Router groups admin-only endpoints under /admin
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -35,3 +42,142 @@ def health(_: dict = Depends(require_admin)):
     # The underscore (_) indicates we intentionally do not use
     # the returned user object, only enforce admin access.
     return {"status": "ok"}
+
+
+@router.get("/result-cache")
+def result_cache_stats(db: Session = Depends(get_db), _: dict = Depends(require_admin)):
+    """
+    Admin-only result cache statistics.
+
+    Returns:
+    - entries / max_entries / ttl_s: table size and configured limits
+    - total_hits: lifetime hits recorded on cache rows (all workers)
+    - process: hit/miss/stored/evicted counters of this process
+      (non-zero here when jobs run in the API process, e.g. inline or
+      background dispatch)
+
+    QE/SIT notes:
+    - Lets SIT assert that duplicate inputs are served from the cache
+    """
+    return result_cache.summary(db)
+
+
+@router.post("/analytics/rebuild")
+def rebuild_analytics(db: Session = Depends(get_db), _: dict = Depends(require_admin)):
+    """
+    Admin-only reconciliation of the analytics rollup.
+
+    Recomputes the job_stats shards from jobs/results and returns
+    {"before", "after", "drift"}; drift lists every column that had
+    diverged (empty when the incremental rollup was exact).
+
+    QE/SIT notes:
+    - SIT asserts drift == {} to validate incremental maintenance
+    """
+    report = rollup.rebuild(db)
+    db.commit()
+    if report["drift"]:
+        analytics_cache.invalidate()
+    return report
+
+
+@router.get("/analytics-cache")
+def analytics_cache_stats(_: dict = Depends(require_admin)):
+    """
+    Admin-only analytics response cache statistics (this process).
+
+    Returns backend, entry count and hit / miss / coalesced /
+    invalidation counters.
+    """
+    return analytics_cache.snapshot()
+
+
+@router.get("/token-cache")
+def token_cache_stats(_: dict = Depends(require_admin)):
+    """
+    Admin-only verified-JWT cache statistics (this process).
+
+    Returns entry count, hit rate and hit / miss / expired / evicted
+    counters.
+    """
+    return token_cache.snapshot()
+
+
+@router.get("/password-hasher")
+def password_hasher_stats(_: dict = Depends(require_admin)):
+    """
+    Admin-only password hashing executor metrics (this process).
+
+    Returns pool size, running / queued calls, completed / rejected
+    counters and p50/p90/p99/max (seconds) of queue wait and bcrypt time.
+    """
+    return password_hasher.snapshot()
+
+
+@router.get("/db-pool")
+def db_pool_stats(_: dict = Depends(require_admin)):
+    """
+    Admin-only connection pool metrics (this process).
+
+    For the primary and each replica (plus their asyncio engines with
+    DB_ASYNC): size / checked_out / idle / overflow, checkout count and
+    wait histogram, timeouts, and connect / close / invalidation /
+    ping-failure counters.
+
+    QE/SIT notes:
+    - Long checkout waits or timeouts with short queries = pool
+      starvation (raise DB_POOL_SIZE / DB_MAX_OVERFLOW)
+    - Growing connects/closes = connection churn (check DB_POOL_RECYCLE_S)
+    """
+    stats = {
+        "primary": pool_status(engine),
+        "replicas": [
+            {"url": replica.url.render_as_string(hide_password=True), **pool_status(replica)}
+            for replica in replicas.replicas
+        ],
+    }
+    if async_engine is not None:
+        # DB_ASYNC: request traffic goes through the asyncio engines
+        stats["async_primary"] = pool_status(async_engine)
+        stats["async_replicas"] = [
+            {"url": replica.url.render_as_string(hide_password=True), **pool_status(replica)}
+            for replica in replicas.async_replicas
+        ]
+    return stats
+
+
+@router.get("/replicas")
+def replica_status(_: dict = Depends(require_admin)):
+    """
+    Admin-only read replica status (this process).
+
+    Returns each configured replica (password hidden) and whether it is
+    currently used for reads; an unhealthy replica is retried after
+    REPLICA_RETRY_S. An empty list means every read uses the primary.
+    """
+    return {
+        "replicas": replicas.status(),
+        "retry_s": replicas.retry_s,
+        "sticky_s": replicas.sticky_s,
+    }
+
+
+@router.post("/export")
+def export_snapshot(_: dict = Depends(require_admin)):
+    """
+    Admin-only incremental Parquet snapshot of finished jobs (export.py).
+
+    Runs synchronously and returns {"run_id", "rows", "files",
+    "watermark"}; schedule large or regular exports with
+    `python -m app.export` or export_snapshot_task instead.
+
+    Errors:
+    - 409 if another export is running into the same directory
+    - 503 if pyarrow is not installed
+    """
+    try:
+        return export.export_snapshot()
+    except export.ExportBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except export.ExportUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
@@ -6,28 +6,51 @@ Responsibilities:
 - Provide high-level metrics for dashboards and reporting
 - Support quality trend analysis and operational insights
 
+Handlers are `async def`; queries run through db.run_db and cache misses
+are coalesced on the event loop (ResponseCache.aget_or_compute).
+
 QE relevance:
 - Enables quality metrics tracking (pass/fail rates)
 - Supports defect trend monitoring
 - Provides KPIs for system integration validation
 """
 
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Integer, cast, func, select
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from ..db import get_db
+from .. import latency, rollup
+from ..cache import analytics_cache
+from ..config import settings
+from ..db import run_db
 from ..models import Job, Result
-from ..schemas import AnalyticsOut
-from ..deps import get_current_user
+from ..schemas import AnalyticsOut, BreakdownOut, LatencyOut, TimeseriesOut
+from ..deps import get_current_user, get_read_db
 
 
 # Router groups analytics-related endpoints under /analytics
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Range returned by /analytics/timeseries when ?from= is omitted
+DEFAULT_SPANS = {
+    "1m": timedelta(hours=1),
+    "1h": timedelta(days=1),
+    "1d": timedelta(days=30),
+}
+
+
+def _utc_naive(value: datetime) -> datetime:
+    # Buckets are stored as naive UTC, like every other timestamp here
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 @router.get("/summary", response_model=AnalyticsOut)
-def summary(
-    db: Session = Depends(get_db),
+async def summary(
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """
@@ -39,39 +62,242 @@ def summary(
     - failed_jobs: jobs that failed processing
     - avg_confidence: average confidence score across results
 
+    Served from the job_stats rollup shards (rollup.py), which the API and
+    workers maintain in the same transaction as each status transition,
+    so the cost does not grow with history. Responses are cached
+    (cache.analytics_cache) until the TTL or the next job event
+    (see ANALYTICS_CACHE_MIN_AGE_S for a bounded-staleness mode).
+
     QE/SIT notes:
     - Used to validate end-to-end processing health
     - Supports regression analysis across test runs
     - Can be compared across environments (QA vs prod)
     """
 
-    # Count all jobs (fallback to 0 if table is empty)
-    total = db.query(func.count(Job.id)).scalar() or 0
+    def compute(session: Session) -> dict:
+        # Sum of ROLLUP_SHARDS rows; all zeros before the first job is submitted
+        stats = rollup.totals(session)
+
+        total = sum(stats[column] for column in rollup.STATUS_COLUMNS.values())
 
-    # Count successfully completed jobs
-    done = (
-        db.query(func.count(Job.id))
-        .filter(Job.status == "DONE")
-        .scalar()
-        or 0
+        # Average confidence across all results.
+        # None if no results exist (handled by schema).
+        avg_conf = (
+            stats["confidence_sum"] / stats["confidence_count"]
+            if stats["confidence_count"]
+            else None
+        )
+
+        return AnalyticsOut(
+            total_jobs=total,
+            done_jobs=stats["done"],
+            failed_jobs=stats["failed"],
+            avg_confidence=avg_conf,
+        ).model_dump(mode="json")
+
+    return await analytics_cache.aget_or_compute(
+        ("summary",), lambda: run_db(db, compute)
     )
 
-    # Count failed jobs (defect indicator)
-    failed = (
-        db.query(func.count(Job.id))
-        .filter(Job.status == "FAILED")
-        .scalar()
-        or 0
+
+@router.get("/timeseries", response_model=TimeseriesOut)
+async def timeseries(
+    bucket: Literal["1m", "1h", "1d"] = "1h",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Return job activity per time bucket.
+
+    Query params:
+    - bucket: 1m | 1h | 1d
+    - from / to: ISO-8601 range (default: `to` = now, `from` = last hour,
+      day or 30 days depending on the bucket)
+
+    Served from pre-aggregated job_buckets rows (rollup.py); jobs and
+    results are never scanned. Buckets without activity come back as
+    zeros; a `from` older than the resolution's retention
+    (TIMESERIES_RETENTION_*) is rejected, since those buckets are pruned.
+
+    QE/SIT notes:
+    - Trend view for throughput and failure rate
+    - Invalid ranges return 422 instead of empty data
+    """
+
+    # Cache key from the request as given: a default ("up to now") range
+    # shares one entry instead of one per request timestamp
+    key = ("timeseries", bucket, start, end)
+
+    end = _utc_naive(end) if end else datetime.utcnow()
+    start = _utc_naive(start) if start else end - DEFAULT_SPANS[bucket]
+
+    if start >= end:
+        raise HTTPException(status_code=422, detail="'from' must be before 'to'")
+
+    if (end - start) / rollup.RESOLUTIONS[bucket] > settings.TIMESERIES_MAX_POINTS:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Range exceeds {settings.TIMESERIES_MAX_POINTS} buckets; "
+                "use a coarser bucket"
+            ),
+        )
+
+    kept_since = rollup.retained_since(bucket)
+    if kept_since is not None and start < kept_since:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"{bucket} buckets are kept since {kept_since.isoformat()} "
+                "(TIMESERIES_RETENTION); use a coarser bucket"
+            ),
+        )
+
+    return await analytics_cache.aget_or_compute(
+        key,
+        lambda: run_db(db, lambda session: TimeseriesOut(
+            bucket=bucket,
+            start=start,
+            end=end,
+            points=rollup.series(session, bucket, start, end),
+        ).model_dump(mode="json")),
     )
 
-    # Average confidence across all results.
-    # Returns None if no results exist (handled by schema).
-    avg_conf = db.query(func.avg(Result.confidence)).scalar()
 
-    return AnalyticsOut(
-        total_jobs=total,
-        done_jobs=done,
-        failed_jobs=failed,
-        avg_confidence=avg_conf,
+@router.get("/latency", response_model=LatencyOut)
+async def latency_percentiles(
+    db: Session = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Return p50/p90/p99 latency per job lifecycle stage.
+
+    Stages:
+    - queue_wait: submitted -> claimed by a worker
+    - processing: claimed -> DONE/FAILED
+    - total:      submitted -> DONE/FAILED
+
+    Merges the persisted per-stage sketches (latency_sketches) with this
+    process's unflushed samples; jobs are never scanned.
+
+    QE/SIT notes:
+    - Separates queueing from processing for capacity planning
+    """
+    return await analytics_cache.aget_or_compute(
+        ("latency",),
+        lambda: run_db(db, lambda session: LatencyOut(
+            **latency.percentiles(session)
+        ).model_dump(mode="json")),
+    )
+
+
+def _bin_index(db: Session, confidence, bins: int):
+    # floor(confidence * bins); SQLite's CAST truncates, Postgres' rounds.
+    # The epsilon keeps edge values (e.g. 0.29 * 100 = 28.999...) in their bin.
+    scaled = confidence * bins + 1e-9
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(scaled, Integer)
+    return cast(func.floor(scaled), Integer)
+
+
+def _breakdown(db: Session, group_by: str, bins: int) -> dict:
+    """
+    Per-group status counts, average confidence and confidence histograms
+    from ONE grouped aggregate query.
+
+    The statement groups by (group key, job status, histogram bin), so the
+    database streams over jobs/results once and returns at most
+    groups x statuses x bins small tuples; no ORM objects are built.
+    """
+    if group_by == "label":
+        # Labels only exist on results: inner join
+        key = Result.label
+        source = select(Job).join(Result, Result.job_id == Job.id)
+    else:
+        key = Job.submitted_by
+        source = select(Job).outerjoin(Result, Result.job_id == Job.id)
+
+    bin_index = _bin_index(db, Result.confidence, bins)
+    stmt = (
+        source.with_only_columns(
+            key.label("key"),
+            Job.status,
+            bin_index.label("bin"),
+            func.count(Job.id).label("jobs"),
+            func.sum(Result.confidence).label("confidence_sum"),
+            func.count(Result.confidence).label("confidence_count"),
+        )
+        # By label: repeating the bin expression would re-bind its
+        # parameters, which Postgres does not treat as the same expression
+        .group_by(key, Job.status, "bin")
     )
 
+    groups: dict[str, dict] = {}
+    overall = [0] * bins
+    for row in db.execute(stmt):
+        group = groups.setdefault(row.key, {
+            "key": row.key,
+            "total": 0,
+            "by_status": {},
+            "confidence_sum": 0.0,
+            "confidence_count": 0,
+            "histogram": [0] * bins,
+        })
+        group["total"] += row.jobs
+        group["by_status"][row.status] = group["by_status"].get(row.status, 0) + row.jobs
+        if row.confidence_count:
+            # confidence == 1.0 lands in bin `bins`: fold it into the top bin
+            idx = min(max(row.bin, 0), bins - 1)
+            group["confidence_sum"] += row.confidence_sum
+            group["confidence_count"] += row.confidence_count
+            group["histogram"][idx] += row.confidence_count
+            overall[idx] += row.confidence_count
+
+    out = []
+    for group in sorted(groups.values(), key=lambda g: (-g["total"], str(g["key"]))):
+        conf_sum = group.pop("confidence_sum")
+        conf_count = group.pop("confidence_count")
+        group["avg_confidence"] = conf_sum / conf_count if conf_count else None
+        out.append(group)
+
+    return {
+        "group_by": group_by,
+        "bins": bins,
+        "bin_edges": [round(i / bins, 6) for i in range(bins + 1)],
+        "histogram": overall,
+        "groups": out,
+    }
+
+
+@router.get("/breakdown", response_model=BreakdownOut)
+async def breakdown(
+    group_by: Literal["submitted_by", "label"] = "submitted_by",
+    bins: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Return per-group quality breakdowns and a confidence histogram.
+
+    Query params:
+    - group_by: submitted_by (all jobs) | label (jobs with a Result)
+    - bins: number of equal-width confidence bins over [0, 1]
+
+    Each group reports total jobs, counts per status, average confidence
+    and its own histogram; `histogram` aggregates every group.
+
+    Computed in one grouped SQL pass (no per-row ORM objects), then
+    cached like the other analytics responses.
+
+    QE/SIT notes:
+    - Quality review per submitter / predicted label
+    - Histogram counts add up to the number of results in scope
+    """
+    return await analytics_cache.aget_or_compute(
+        ("breakdown", group_by, bins),
+        lambda: run_db(db, lambda session: BreakdownOut(
+            **_breakdown(session, group_by, bins)
+        ).model_dump(mode="json")),
+    )
@@ -4,6 +4,9 @@ Authentication routes for the API.
 Responsibilities:
 - Validate user credentials (username/password)
 - Issue JWT access tokens for authenticated sessions
+- Refresh access tokens (rotating refresh tokens) and log out
+
+Handlers are `async def`; session work runs through db.run_db.
 
 QE relevance:
 - Enables security testing (auth required, invalid creds, lockouts, etc.)
@@ -11,24 +14,35 @@ QE relevance:
 - Provides a deterministic way for automation suites to obtain tokens
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from .. import queries, tokens
+from ..db import get_session, run_db
 from ..models import User
-from ..schemas import TokenOut
-from ..security import verify_password, create_access_token
+from ..schemas import RefreshIn, TokenOut
+from ..security import HasherBusy, create_access_token, password_hasher
 
 
 # Router groups endpoints under /auth and labels them in API docs.
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _find_user(db: Session, username: str) -> User | None:
+    return queries.user_by_username(db, username)
+
+
+def _start_session(db: Session, username: str) -> str:
+    refresh_token = tokens.issue(db, username)
+    db.commit()
+    return refresh_token
+
+
 @router.post("/login", response_model=TokenOut)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
 ):
     """
     Authenticate a user and return a JWT access token.
@@ -40,25 +54,107 @@ def login(
     Output:
     - access_token: JWT token used in Authorization header
     - token_type: "bearer" (standard for OAuth2/JWT APIs)
+    - refresh_token: exchange at POST /auth/refresh for new tokens
+
+    bcrypt runs on security.password_hasher, a bounded executor separate
+    from the threadpool serving the other endpoints. When its queue is
+    full the request fails fast with 503 + Retry-After.
 
     QE/SIT notes:
     - Primary entry point for obtaining tokens during automation
     - Supports negative/security testing (bad credentials, missing fields)
     - Token contains "role" claim used for authorization checks
+    - Login bursts beyond PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE
+      get 503 instead of slowing down job endpoints
     """
 
     # Query the user by username.
     # If user doesn't exist, return 401 to avoid revealing which usernames are valid.
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await run_db(db, _find_user, form_data.username)
 
     # Verify password using secure hash comparison.
     # Never compare raw passwords directly; always verify against a stored hash.
-    if not user or not verify_password(form_data.password, user.password_hash):
+    try:
+        valid = user is not None and await password_hasher.verify(
+            form_data.password, user.password_hash
+        )
+    except HasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Create JWT token with user identity + role.
     # The "role" claim supports role-based access control (admin endpoints).
     token = create_access_token(sub=user.username, role=user.role)
 
+    # Start a refresh-token family, so the client never needs the
+    # password (and this bcrypt check) again for this session
+    refresh_token = await run_db(db, _start_session, user.username)
+
     # Standard OAuth2-style response (used by Swagger + client libraries)
-    return {"access_token": token, "token_type": "bearer"}
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+def _refresh(db: Session, presented: str) -> dict:
+    try:
+        username, refresh_token = tokens.rotate(db, presented)
+    except tokens.RefreshTokenReused:
+        db.commit()  # keep the family revocation
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    except tokens.InvalidRefreshToken:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = _find_user(db, username)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    db.commit()
+    return {
+        "access_token": create_access_token(sub=user.username, role=user.role),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=TokenOut)
+async def refresh(data: RefreshIn, db: Session = Depends(get_session)):
+    """
+    Exchange a refresh token for a new access token + refresh token.
+
+    No password hashing: one indexed lookup and an update. The presented
+    refresh token is consumed (rotation); presenting it again revokes
+    every token of that login session.
+
+    The role is re-read from the users table, so role changes apply at
+    the next refresh.
+
+    QE/Security notes:
+    - 401 for unknown, expired, revoked or reused tokens (no detail on
+      which, like /auth/login)
+    """
+    return await run_db(db, _refresh, data.refresh_token)
+
+
+def _logout(db: Session, presented: str) -> None:
+    if tokens.revoke(db, presented):
+        db.commit()
+
+
+@router.post("/logout", status_code=204)
+async def logout(data: RefreshIn, db: Session = Depends(get_session)):
+    """
+    Revoke the refresh token's session (all of its rotations).
+
+    Access tokens already issued stay valid until they expire
+    (JWT_EXPIRE_MIN). Unknown tokens are ignored, so logout is idempotent.
+    """
+    await run_db(db, _logout, data.refresh_token)
+    return Response(status_code=204)
@@ -7,19 +7,35 @@ Responsibilities:
 - Trigger asynchronous processing (AI/worker simulation)
 - Expose job status and results for UI and automation
 
+Handlers are `async def`. Session work lives in plain sync helpers run
+through db.run_db: on the asyncio engine with DB_ASYNC, otherwise on
+the threadpool, so neither mode blocks the event loop.
+
 QE relevance:
 - Central entry point for SIT and regression testing
 - Exercises async workflows, DB integration, and security
 - Provides deterministic endpoints for automation
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import base64
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..config import settings
+from .. import queries
+from ..db import get_session, replicas, run_db, run_in_session, use_primary
+from ..events import OVERFLOWED, bus, record_created
 from ..models import Job, Result
+from ..rollup import count_transition
 from ..schemas import JobCreate, JobOut, ResultOut
-from ..deps import get_current_user
-from ..worker.tasks import process_job
+from ..deps import get_current_user, get_read_db, get_stream_user
+from ..worker.dispatch import dispatch_job, dispatch_jobs
 
 
 # Router definition:
@@ -28,10 +44,29 @@ from ..worker.tasks import process_job
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
+def _insert_job(db: Session, input_text: str, username: str) -> Job:
+    # Create a new Job ORM object
+    # submitted_by comes from the JWT-authenticated user
+    job = Job(
+        input_text=input_text,
+        submitted_by=username,
+        status="QUEUED",
+    )
+
+    # Persist job to the database
+    db.add(job)
+    db.flush()  # assigns job.id
+    record_created(db, [job])
+    count_transition(db, 1, "QUEUED")
+    db.commit()
+    db.refresh(job)  # ensures job.id is available
+    return job
+
+
 @router.post("", response_model=JobOut)
-def create_job(
+async def create_job(
     data: JobCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     user: dict = Depends(get_current_user),
 ):
     """
@@ -49,85 +84,327 @@ def create_job(
     - Allows regression tests to validate status transitions
     """
 
-    # Create a new Job ORM object
-    # submitted_by comes from the JWT-authenticated user
-    job = Job(
-        input_text=data.input_text,
-        submitted_by=user["username"],
-        status="QUEUED",
-    )
+    job = await run_db(db, _insert_job, data.input_text, user["username"])
+    replicas.note_write(user["username"])
 
-    # Persist job to the database
-    db.add(job)
+    # Hand off to the worker (Celery / in-memory broker / inline).
+    # Only "inline" mode blocks; every other mode returns QUEUED immediately.
+    await run_in_threadpool(dispatch_job, job.id)
+
+    return job
+
+
+def _insert_jobs(db: Session, rows: list[dict]) -> list[JobOut]:
+    # executemany + RETURNING is compiled by SQLAlchemy into batched
+    # multi-row INSERT ... VALUES (...), (...) RETURNING statements
+    # (Postgres and SQLite >= 3.35). sort_by_parameter_order keeps the
+    # returned rows aligned with the request payload order.
+    jobs = db.scalars(
+        insert(Job).returning(Job, sort_by_parameter_order=True),
+        rows,
+    ).all()
+
+    # Serialize before commit: commit expires ORM state, and re-reading
+    # each attribute afterwards would cost one SELECT per job.
+    out = [JobOut.model_validate(job) for job in jobs]
+    record_created(db, out)
+    count_transition(db, len(out), "QUEUED")
     db.commit()
-    db.refresh(job)  # ensures job.id is available
+    return out
 
-    # Trigger processing:
-    # For local development, we run inline to simplify debugging.
-    # In real deployments, this would be queued asynchronously
-    # using Celery/RQ: process_job.delay(job.id)
-    process_job(job.id)
 
-    return job
+@router.post("/batch", response_model=list[JobOut])
+async def create_jobs_batch(
+    data: list[JobCreate],
+    db: Session = Depends(get_session),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Create many jobs in one request and trigger grouped processing.
+
+    Flow:
+    1. Validate every payload (JobCreate schema)
+    2. Insert all jobs with a single multi-row INSERT ... RETURNING
+    3. Dispatch the new IDs to the worker as one grouped message
+    4. Return the created jobs in request order
+
+    QE/SIT notes:
+    - One DB round trip + one commit instead of one per job
+    - Empty and oversized batches are rejected with explicit errors
+    """
+
+    if not data:
+        raise HTTPException(status_code=422, detail="Batch must not be empty")
+
+    if len(data) > settings.JOB_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.JOB_BATCH_MAX} jobs",
+        )
+
+    rows = [
+        {
+            "input_text": item.input_text,
+            "submitted_by": user["username"],
+            "status": "QUEUED",
+        }
+        for item in data
+    ]
+
+    out = await run_db(db, _insert_jobs, rows)
+    replicas.note_write(user["username"])
+
+    await run_in_threadpool(dispatch_jobs, [job.id for job in out])
+
+    return out
+
+
+def encode_cursor(created_at: datetime, job_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a row."""
+    raw = json.dumps({"c": created_at.isoformat(), "i": job_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_cursor; raises 422 for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
 
 
 @router.get("", response_model=list[JobOut])
-def list_jobs(
+async def list_jobs(
+    response: Response,
     status: str | None = None,
-    db: Session = Depends(get_db),
+    after: str | None = None,
+    limit: int = Query(settings.JOBS_PAGE_DEFAULT, ge=1, le=settings.JOBS_PAGE_MAX),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """
-    List jobs with optional status filtering.
+    List jobs newest first, with optional status filter and keyset paging.
 
     Parameters:
     - status (optional): filter jobs by lifecycle state
+    - after (optional): opaque cursor from a previous page's X-Next-Cursor
+    - limit (optional): page size (default JOBS_PAGE_DEFAULT, max JOBS_PAGE_MAX)
+
+    The response body stays a plain list. When more rows exist, the cursor
+    for the next page is returned in the `X-Next-Cursor` header.
+
+    Keyset pagination on (created_at, id) with the composite
+    (status, created_at, id) index keeps every page O(page size),
+    however deep or filtered.
 
     QE/SIT notes:
-    - Used by UI polling and dashboards
+    - Used by UI dashboards
     - Enables validation of filtering logic
-    - Supports regression testing for data consistency
+    - Pages never overlap or skip rows, even while jobs are inserted
     """
 
-    # Base query: all jobs
-    q = db.query(Job)
+    # Optional status filter; resume strictly after the last row of the
+    # previous page. Newest first, one extra row to know if a next page
+    # exists. Pre-built statement (queries.py): no per-request SQL building.
+    rows = await run_db(
+        db,
+        queries.job_page,
+        limit + 1,
+        status,
+        decode_cursor(after) if after else None,
+    )
+
+    page = rows[:limit]
+    if len(rows) > limit:
+        last = page[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    return page
 
-    # Optional filter by job status
-    if status:
-        q = q.filter(Job.status == status)
-    
-   
-    # Order newest first and cap results to avoid large payloads
-    return q.order_by(Job.created_at.desc()).limit(100).all()
+
+async def _current_status(job_id: int) -> str | None:
+    # Fresh session (primary): the committed status right now
+    return await run_in_session(queries.job_status, job_id)
+
+
+def _sse(evt: dict) -> str:
+    return f"data: {json.dumps(evt)}\n\n"
+
+
+@router.get("/stream")
+async def stream_jobs(
+    job_id: int | None = None,
+    user: dict = Depends(get_stream_user),
+):
+    """
+    Server-Sent Events stream of job status transitions.
+
+    Parameters:
+    - job_id (optional): only stream events for this job. The first event
+      is a snapshot of the job's current status, so a client that
+      subscribes late still sees a terminal state.
+    - access_token (optional): JWT for EventSource clients that cannot
+      send an Authorization header
+
+    Each event is `data: {"job_id": ..., "status": ..., "at": ...}`;
+    QUEUED events also carry the new job's `submitted_by` / `created_at`.
+    A `: keep-alive` comment is sent every EVENTS_HEARTBEAT_S seconds.
+    A client more than EVENTS_QUEUE_SIZE events behind has missed some:
+    the stream ends, and EventSource reconnects and reloads (UI onOpen).
+
+    The token is only checked when the stream opens. A token passed as
+    `?access_token=` is part of the URL: the API's own access log
+    redacts it (see main.py), but proxies / load balancers in front of
+    it may still log it. Keep JWT_EXPIRE_MIN short where that matters;
+    the UI reconnects with a renewed token.
+
+    QE/SIT notes:
+    - Replaces UI/test polling of GET /jobs and GET /jobs/{id}
+    - Only committed transitions are published (see app/events.py)
+    """
+
+    # Subscribe before the snapshot so no transition falls in between.
+    # Until the stream takes over the queue, every exit unsubscribes
+    # (404, a failing status query, a cancelled request).
+    queue = bus.subscribe()
+    try:
+        snapshot = None
+        if job_id is not None:
+            status = await _current_status(job_id)
+            if status is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            snapshot = {
+                "job_id": job_id,
+                "status": status,
+                "at": datetime.utcnow().isoformat(),
+            }
+    except BaseException:
+        bus.unsubscribe(queue)
+        raise
+
+    async def events():
+        try:
+            if snapshot:
+                yield _sse(snapshot)
+            while True:
+                try:
+                    evt = await asyncio.wait_for(
+                        queue.get(), timeout=settings.EVENTS_HEARTBEAT_S
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if evt is OVERFLOWED:
+                    return
+                if job_id is None or evt["job_id"] == job_id:
+                    yield _sse(evt)
+        finally:
+            bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+JOB_STATUSES = {"QUEUED", "PROCESSING", "DONE", "FAILED"}
+TERMINAL_STATUSES = {"DONE", "FAILED"}
+
+
+def _read_job(db: Session, job_id: int, primary: bool) -> Job | None:
+    # Long-polls compare against events published by primary commits, so
+    # they read the primary; a replica miss may just be replication lag
+    if primary:
+        use_primary(db)
+    job = db.get(Job, job_id)
+    if job is None and use_primary(db):
+        job = db.get(Job, job_id)
+    return job
 
 
 @router.get("/{job_id}", response_model=JobOut)
-def get_job(
+async def get_job(
     job_id: int,
-    db: Session = Depends(get_db),
+    wait_for: str | None = None,
+    timeout: float = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """
-    Retrieve a single job by ID.
+    Retrieve a single job by ID, optionally long-polling for a status.
+
+    Parameters:
+    - wait_for (optional): comma-separated statuses, e.g. "DONE,FAILED"
+    - timeout (optional): max seconds to wait (capped at
+      LONGPOLL_MAX_TIMEOUT_S; 0 = return immediately)
+
+    With wait_for, the request is held open until the job reaches one of
+    the statuses (or any terminal status), or the timeout expires, and then
+    returns the job as it is at that moment. Waiting is event-driven
+    (app/events.py), not a server-side polling loop.
 
     QE/SIT notes:
-    - Used for polling job status
+    - One request per wait instead of a client polling loop
     - Validates correct 404 handling
     - Ensures authorization is enforced consistently
     """
 
-    job = db.get(Job, job_id)
+    targets: set[str] = set()
+    if wait_for:
+        targets = {s.strip().upper() for s in wait_for.split(",") if s.strip()}
+        if not targets <= JOB_STATUSES:
+            raise HTTPException(
+                status_code=422,
+                detail=f"wait_for must be a subset of {sorted(JOB_STATUSES)}",
+            )
+
+    job = await run_db(db, _read_job, job_id, bool(targets))
 
     # Explicit 404 if job does not exist
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
+    timeout = min(timeout, settings.LONGPOLL_MAX_TIMEOUT_S)
+    stop_at = targets | TERMINAL_STATUSES
+    if not targets or timeout <= 0 or job.status in stop_at:
+        return job
+
+    # End the read transaction so the pooled connection is not held
+    # (idle in transaction) for the whole wait
+    await run_db(db, Session.rollback)
+
+    # Register before re-reading so a transition in between is not missed
+    waiter = bus.watch(job_id, stop_at)
+    try:
+        if await _current_status(job_id) not in stop_at:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        bus.unwatch(job_id, waiter)
+
+    # Return the committed row as it is now
+    await run_db(db, Session.refresh, job)
     return job
 
+
+def _read_result(db: Session, job_id: int) -> Result | None:
+    # Query result table by job_id
+    res = queries.result_for_job(db, job_id)
+
+    # Missing on a replica: it may not have caught up yet, ask the primary
+    if not res and use_primary(db):
+        res = queries.result_for_job(db, job_id)
+    return res
+
+
 @router.get("/{job_id}/result", response_model=ResultOut)
-def get_result(
+async def get_result(
     job_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: dict = Depends(get_current_user),
 ):
     """
@@ -139,8 +416,7 @@ def get_result(
     - Used heavily in E2E automation
     """
 
-    # Query result table by job_id
-    res = db.query(Result).filter(Result.job_id == job_id).first()
+    res = await run_db(db, _read_result, job_id)
 
     # If processing is not complete, result may not exist yet
     if not res:
@@ -23,13 +23,27 @@ class TokenOut(BaseModel):
 
     Returned by:
     - POST /auth/login
+    - POST /auth/refresh
 
     QE/Security notes:
     - token_type is fixed to "bearer" for OAuth2 compatibility
     - access_token is consumed by UI and test automation
+    - refresh_token mints new access tokens without a password check;
+      each use returns a new one (rotation)
     """
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshIn(BaseModel):
+    """
+    Input schema for POST /auth/refresh and POST /auth/logout.
+
+    QE/Security notes:
+    - A refresh token is single-use; replaying it revokes the session
+    """
+    refresh_token: str
 
 
 class LoginIn(BaseModel):
@@ -58,7 +72,7 @@ class JobCreate(BaseModel):
     - Ensures input_text is always present
     - Prevents malformed job submissions
     """
-    input_texts: str
+    input_text: str
 
 
 class JobOut(BaseModel):
@@ -121,3 +135,85 @@ class AnalyticsOut(BaseModel):
     done_jobs: int
     failed_jobs: int
     avg_confidence: Optional[float] = None
+
+
+class TimeseriesPoint(BaseModel):
+    """
+    One time bucket of job activity.
+
+    - submitted/done/failed: jobs created / finished / failed in the bucket
+    - avg_confidence: mean confidence of results written in the bucket
+    """
+    start: datetime
+    submitted: int
+    done: int
+    failed: int
+    avg_confidence: Optional[float] = None
+
+
+class TimeseriesOut(BaseModel):
+    """
+    Output schema for bucketed analytics.
+
+    Used by:
+    - GET /analytics/timeseries
+
+    QE/SIT notes:
+    - Points are dense (empty buckets are zeros) and ordered by start
+    """
+    bucket: str
+    start: datetime
+    end: datetime
+    points: list[TimeseriesPoint]
+
+
+class StageLatency(BaseModel):
+    """Latency distribution of one lifecycle stage, in seconds."""
+    count: int
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+
+
+class LatencyOut(BaseModel):
+    """
+    Output schema for lifecycle latency percentiles.
+
+    Used by:
+    - GET /analytics/latency
+
+    QE/SIT notes:
+    - Quantiles come from DDSketches (relative error LATENCY_SKETCH_ACCURACY)
+    """
+    queue_wait: StageLatency
+    processing: StageLatency
+    total: StageLatency
+
+
+class BreakdownGroup(BaseModel):
+    """One group of GET /analytics/breakdown (a submitter or a label)."""
+    key: Optional[str] = None
+    total: int
+    by_status: dict[str, int]
+    avg_confidence: Optional[float] = None
+    histogram: list[int]
+
+
+class BreakdownOut(BaseModel):
+    """
+    Output schema for grouped analytics breakdowns.
+
+    Used by:
+    - GET /analytics/breakdown
+
+    QE/SIT notes:
+    - bin_edges has bins + 1 entries; bin i covers [edge i, edge i+1)
+      (the last bin also includes 1.0)
+    """
+    group_by: str
+    bins: int
+    bin_edges: list[float]
+    histogram: list[int]
+    groups: list[BreakdownGroup]
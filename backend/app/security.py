@@ -3,7 +3,9 @@ Security utilities for authentication and authorization.
 
 Responsibilities:
 - Securely hash and verify user passwords
+- Run bcrypt on a bounded executor with admission control (PasswordHasher)
 - Create and decode JWT access tokens
+- Cache verified tokens until they expire (TokenCache)
 - Centralize cryptographic configuration
 
 QE relevance:
@@ -12,11 +14,19 @@ QE relevance:
 - Ensures consistent token behavior across environments
 """
 
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
 from passlib.context import CryptContext
 from jose import jwt
-from datetime import datetime, timedelta, timezone
 
 from .config import settings
+from .latency import DDSketch
 
 
 # -------------------------------------------------
@@ -64,6 +74,109 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# -------------------------------------------------
+# Password hashing executor
+# -------------------------------------------------
+class HasherBusy(Exception):
+    """The password hashing executor and its queue are full."""
+
+
+class PasswordHasher:
+    """
+    Dedicated, size-limited executor for bcrypt.
+
+    - WORKERS threads run bcrypt (it releases the GIL), so a login burst
+      uses at most that many cores and never occupies the threadpool
+      that serves /jobs and the other sync endpoints
+    - At most WORKERS + QUEUE calls are admitted; beyond that, calls
+      fail fast with HasherBusy (mapped to 503 by /auth/login)
+    - Queue wait and hash time are tracked in DDSketches for
+      GET /admin/password-hasher
+
+    QE relevance:
+    - Login storms degrade only logins, visibly (503 + Retry-After)
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="password-hash",
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self.stats = {"completed": 0, "rejected": 0}
+        self._wait = DDSketch()
+        self._hash = DDSketch()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_size:
+                self.stats["rejected"] += 1
+                raise HasherBusy()
+            self._admitted += 1
+
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self.stats["completed"] += 1
+                    self._wait.add(started - submitted)
+                    self._hash.add(finished - started)
+
+        future = self._executor.submit(call)
+        # Release the slot when bcrypt is done, even if the request was
+        # cancelled meanwhile (the thread is busy until then anyway)
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def snapshot(self) -> dict:
+        def summary(sketch: DDSketch) -> dict:
+            return {
+                "p50": sketch.quantile(0.50),
+                "p90": sketch.quantile(0.90),
+                "p99": sketch.quantile(0.99),
+                "max": sketch.max if sketch.count else None,
+            }
+
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                **self.stats,
+                "wait_s": summary(self._wait),
+                "hash_s": summary(self._hash),
+            }
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE,
+)
+
+
 def create_access_token(sub: str, role: str) -> str:
     """
     Create a timezone-aware JWT access token.
@@ -126,3 +239,83 @@ def decode_token(token: str) -> dict:
         settings.JWT_SECRET,
         algorithms=[ALGO],
     )
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified tokens: sha256(token) -> (exp, claims).
+
+    Polling clients send the same token on every request; a hit skips
+    the HMAC verification and JSON parsing of decode_token.
+
+    Safety:
+    - Only tokens that passed decode_token are stored, keyed by a digest
+      of the exact token string, so a tampered token is always a miss
+      and goes through full verification
+    - Entries are served only while time.time() < exp, the same
+      expiry rule decode_token applies; expired entries are dropped
+
+    QE relevance:
+    - Hit / miss / expired / evicted counters at GET /admin/token-cache
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        self._next_sweep = 0.0
+
+    def decode(self, token: str) -> dict:
+        """decode_token with caching; raises jose.JWTError like it."""
+        if self.max_entries <= 0:
+            return decode_token(token)
+
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry[0]:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+
+        claims = decode_token(token)  # raises for expired / tampered tokens
+        exp = claims.get("exp")
+        if exp is None:
+            return claims  # no expiry to bound the entry: never cached
+
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            self._entries[key] = (float(exp), claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+        return claims
+
+    def _sweep(self, now: float) -> None:
+        # Drop expired entries (at most once a minute) so tokens nobody
+        # presents again do not sit in the LRU until pushed out
+        for key in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+            del self._entries[key]
+            self.stats["expired"] += 1
+        self._next_sweep = now + 60.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                **self.stats,
+            }
+
+
+token_cache = TokenCache(settings.JWT_CACHE_MAX_ENTRIES)
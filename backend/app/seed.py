@@ -7,15 +7,26 @@ Responsibilities:
 - Populate baseline data required for the application to function
 - Ensure predictable test users exist across environments
 
+Seeding is opt-in (API startup never seeds; bcrypt hashing would slow
+every cold start):
+    python -m app.seed
+
 QE relevance:
 - Enables repeatable authentication and authorization testing
 - Eliminates manual setup steps for SIT and regression automation
 """
 
+import logging
+
 from sqlalchemy.orm import Session
+from .db import SessionLocal
 from .models import User
 from .security import hash_password
 
+
+logger = logging.getLogger(__name__)
+
+
 def seed_users(db: Session) -> None:
     """
     Seed baseline users into the database.
@@ -36,8 +47,9 @@ def seed_users(db: Session) -> None:
 
     # Idempotency check:
     # If any users already exist, assume seeding has already occurred.
-    # This prevents duplicate users when the app restarts.
+    # This prevents duplicate users when the command is re-run.
     if db.query(User).count() > 0:
+        logger.info("Users already exist; nothing to seed")
         return
 
     # Create admin user with hashed password
@@ -60,4 +72,10 @@ def seed_users(db: Session) -> None:
 
     # Commit both inserts as a single transaction
     db.commit()
+    logger.info("Seeded users: admin, viewer")
+
 
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as session:
+        seed_users(session)
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+@pytest.mark.parametrize("group_by", ["submitted_by", "label"])
+def test_breakdown_groups_and_histogram(
+    api_base, viewer_headers, poll_job_status, group_by
+):
+    """
+    SIT test for GET /analytics/breakdown.
+
+    Covers:
+    - Groups are reported with per-status counts that add up to the total
+    - Histograms have `bins` entries and count every result in scope
+    """
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": f"breakdown {group_by}"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    assert poll_job_status(
+        job_id=r.json()["id"], api_base=api_base, headers=viewer_headers, max_attempts=15
+    ) == "DONE"
+
+    r = httpx.get(
+        f"{api_base}/analytics/breakdown",
+        params={"group_by": group_by, "bins": 10},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+
+    assert len(body["bin_edges"]) == 11 and len(body["histogram"]) == 10
+    assert body["groups"], body
+    for group in body["groups"]:
+        assert sum(group["by_status"].values()) == group["total"], group
+        assert len(group["histogram"]) == 10
+    assert sum(body["histogram"]) == sum(
+        g["by_status"].get("DONE", 0) for g in body["groups"]
+    ), body
+
+    if group_by == "submitted_by":
+        assert "viewer" in [g["key"] for g in body["groups"]]
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+@pytest.mark.parametrize(
+    "params",
+    [{"group_by": "status"}, {"bins": 0}, {"bins": 1000}],
+    ids=["bad-group", "zero-bins", "too-many-bins"],
+)
+def test_breakdown_rejects_invalid_params(api_base, viewer_headers, params):
+    r = httpx.get(
+        f"{api_base}/analytics/breakdown",
+        params=params,
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 422, r.text
@@ -0,0 +1,50 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_cached_summary_is_invalidated_by_job_events(
+    api_base,
+    viewer_headers,
+    admin_headers,
+):
+    """
+    SIT test for the analytics response cache.
+
+    Covers:
+    - A repeated summary request is served from the cache
+    - Submitting a job invalidates it (the next read includes the job)
+    """
+
+    def summary():
+        r = httpx.get(f"{api_base}/analytics/summary", headers=viewer_headers, timeout=10)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    def cache_stats():
+        r = httpx.get(f"{api_base}/admin/analytics-cache", headers=admin_headers, timeout=10)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    # Back-to-back reads hit, unless a job event from an earlier test
+    # lands in between; a few pairs rule that out
+    for _ in range(5):
+        first = summary()
+        before = cache_stats()
+        summary()
+        after = cache_stats()
+        if after["hits"] > before["hits"]:
+            break
+    assert after["hits"] > before["hits"], after
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": "cache invalidation"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+
+    assert summary()["total_jobs"] >= first["total_jobs"] + 1
+    assert cache_stats()["invalidations"] > after["invalidations"]
@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_latency_percentiles_per_stage(api_base, viewer_headers, poll_job_status):
+    """
+    SIT test for GET /analytics/latency.
+
+    Covers:
+    - A finished job is counted in every lifecycle stage
+    - Percentiles are ordered (p50 <= p90 <= p99 <= max)
+    """
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": "latency sample"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    assert poll_job_status(
+        job_id=r.json()["id"], api_base=api_base, headers=viewer_headers, max_attempts=15
+    ) in ("DONE", "FAILED")
+
+    r = httpx.get(f"{api_base}/analytics/latency", headers=viewer_headers, timeout=10)
+    assert r.status_code == 200, r.text
+
+    body = r.json()
+    for stage in ("queue_wait", "processing", "total"):
+        s = body[stage]
+        assert s["count"] >= 1, body
+        assert 0 <= s["p50"] <= s["p90"] <= s["p99"] <= s["max"], body
+    assert body["total"]["max"] >= body["processing"]["max"], body
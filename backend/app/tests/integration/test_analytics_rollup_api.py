@@ -0,0 +1,50 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_summary_rollup_matches_full_rebuild(
+    api_base,
+    viewer_headers,
+    admin_headers,
+    poll_job_status,
+):
+    """
+    SIT test for the incrementally maintained analytics rollup.
+
+    Covers:
+    - GET /analytics/summary reflects a newly finished job
+    - Rebuilding the rollup from jobs/results finds no drift
+    """
+
+    before = httpx.get(f"{api_base}/analytics/summary", headers=viewer_headers, timeout=10)
+    assert before.status_code == 200, before.text
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": "rollup please crash"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    assert poll_job_status(
+        job_id=r.json()["id"], api_base=api_base, headers=viewer_headers, max_attempts=15
+    ) == "FAILED"
+
+    after = httpx.get(f"{api_base}/analytics/summary", headers=viewer_headers, timeout=10)
+    assert after.json()["total_jobs"] >= before.json()["total_jobs"] + 1, after.json()
+    assert after.json()["failed_jobs"] >= before.json()["failed_jobs"] + 1, after.json()
+
+    rebuild = httpx.post(
+        f"{api_base}/admin/analytics/rebuild", headers=admin_headers, timeout=10
+    )
+    assert rebuild.status_code == 200, rebuild.text
+    assert rebuild.json()["drift"] == {}, rebuild.json()
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+def test_rollup_rebuild_requires_admin(api_base, viewer_headers):
+    r = httpx.post(f"{api_base}/admin/analytics/rebuild", headers=viewer_headers, timeout=10)
+    assert r.status_code == 403, r.text
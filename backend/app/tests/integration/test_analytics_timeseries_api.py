@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_timeseries_counts_finished_jobs(api_base, viewer_headers, poll_job_status):
+    """
+    SIT test for GET /analytics/timeseries.
+
+    Covers:
+    - A submitted + failed job shows up in the current 1m bucket
+    - Points are dense and ordered
+    """
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": "timeseries crash"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    assert poll_job_status(
+        job_id=r.json()["id"], api_base=api_base, headers=viewer_headers, max_attempts=15
+    ) == "FAILED"
+
+    now = datetime.utcnow()
+    r = httpx.get(
+        f"{api_base}/analytics/timeseries",
+        params={
+            "bucket": "1m",
+            "from": (now - timedelta(minutes=5)).isoformat(),
+            "to": (now + timedelta(minutes=1)).isoformat(),
+        },
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+
+    points = r.json()["points"]
+    assert len(points) in (6, 7), points
+    starts = [p["start"] for p in points]
+    assert starts == sorted(starts)
+    assert sum(p["submitted"] for p in points) >= 1, points
+    assert sum(p["failed"] for p in points) >= 1, points
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"bucket": "5m"},
+        {"bucket": "1m", "from": "2024-01-01T00:00:00", "to": "2024-03-01T00:00:00"},
+        {"bucket": "1h", "from": "2024-01-02T00:00:00", "to": "2024-01-01T00:00:00"},
+        # Past TIMESERIES_RETENTION_1M_S (2 days): pruned, not "no activity"
+        {
+            "bucket": "1m",
+            "from": (datetime.utcnow() - timedelta(days=3)).isoformat(),
+            "to": (datetime.utcnow() - timedelta(days=3) + timedelta(hours=1)).isoformat(),
+        },
+    ],
+    ids=["bad-bucket", "too-many-points", "inverted-range", "pruned-range"],
+)
+def test_timeseries_rejects_invalid_queries(api_base, viewer_headers, params):
+    r = httpx.get(
+        f"{api_base}/analytics/timeseries",
+        params=params,
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 422, r.text
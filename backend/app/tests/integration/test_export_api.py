@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_snapshot_export_is_admin_only_and_incremental(
+    api_base,
+    viewer_headers,
+    admin_headers,
+):
+    """
+    SIT test for the columnar snapshot export.
+
+    Covers:
+    - POST /admin/export is admin-only
+    - Each run reports rows written and a watermark that never moves back
+    """
+    r = httpx.post(f"{api_base}/admin/export", headers=viewer_headers, timeout=10)
+    assert r.status_code == 403
+
+    r = httpx.post(f"{api_base}/admin/export", headers=admin_headers, timeout=60)
+    if r.status_code == 503:
+        pytest.skip("pyarrow is not installed on the API server")
+    assert r.status_code == 200, r.text
+    first = r.json()
+    # Every file written holds at least one row
+    assert len(first["files"]) <= first["rows"]
+
+    r = httpx.post(f"{api_base}/admin/export", headers=admin_headers, timeout=60)
+    assert r.status_code == 200, r.text
+    second = r.json()
+
+    if first["watermark"]:
+        assert second["watermark"]["finished_at"] >= first["watermark"]["finished_at"]
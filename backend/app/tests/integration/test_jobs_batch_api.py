@@ -0,0 +1,79 @@
+import httpx
+import pytest
+
+from app.config import settings
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_batch_submission_creates_jobs_in_order(
+    api_base,
+    viewer_headers,
+    poll_job_status,
+):
+    """
+    SIT test for POST /jobs/batch.
+
+    Covers:
+    - One request creates every job, returned in payload order
+    - Each job is dispatched and reaches its own terminal state
+    """
+
+    payload = [
+        {"input_text": "batch one"},
+        {"input_text": "batch please crash"},
+        {"input_text": "batch three"},
+    ]
+
+    r = httpx.post(
+        f"{api_base}/jobs/batch",
+        json=payload,
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+
+    jobs = r.json()
+    assert len(jobs) == len(payload), jobs
+    ids = [j["id"] for j in jobs]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids), ids
+    assert all(j["submitted_by"] == "viewer" for j in jobs), jobs
+
+    statuses = [
+        poll_job_status(
+            job_id=job_id,
+            api_base=api_base,
+            headers=viewer_headers,
+            max_attempts=25,
+            sleep_s=1.0,
+        )
+        for job_id in ids
+    ]
+    assert statuses[1] == "FAILED"
+    assert statuses[0] in ("DONE", "FAILED")
+    assert statuses[2] in ("DONE", "FAILED")
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+@pytest.mark.parametrize(
+    "payload,expected_status",
+    [
+        ([], 422),
+        ([{"input_text": "x"}] * (settings.JOB_BATCH_MAX + 1), 413),
+        ([{"wrong": "x"}], 422),
+    ],
+    ids=["empty", "oversized", "malformed"],
+)
+def test_batch_submission_rejects_invalid(
+    api_base, viewer_headers, payload, expected_status
+):
+    """Empty, oversized and malformed batches are rejected without inserts."""
+
+    r = httpx.post(
+        f"{api_base}/jobs/batch",
+        json=payload,
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == expected_status, r.text
@@ -0,0 +1,72 @@
+import time
+
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+@pytest.mark.parametrize(
+    "input_text,expected_status",
+    [
+        ("long poll me", "DONE"),
+        ("long poll crash", "FAILED"),
+    ],
+    ids=["done", "failed"],
+)
+def test_long_poll_returns_terminal_status_in_one_request(
+    api_base, viewer_headers, input_text, expected_status
+):
+    """
+    GET /jobs/{id}?wait_for=DONE,FAILED blocks until the job finishes.
+
+    Covers:
+    - A single request observes the terminal state
+    - The response returns when the job ends, well before the timeout
+    """
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": input_text},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    job_id = r.json()["id"]
+
+    started = time.monotonic()
+    r = httpx.get(
+        f"{api_base}/jobs/{job_id}",
+        params={"wait_for": "DONE,FAILED", "timeout": 30},
+        headers=viewer_headers,
+        timeout=40,
+    )
+    elapsed = time.monotonic() - started
+
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == expected_status, r.json()
+    assert elapsed < 25, elapsed
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+@pytest.mark.parametrize(
+    "params,expected_status",
+    [
+        ({"wait_for": "FINISHED", "timeout": 1}, 422),
+        ({"wait_for": "DONE", "timeout": -1}, 422),
+    ],
+    ids=["unknown-status", "negative-timeout"],
+)
+def test_long_poll_rejects_invalid_params(
+    api_base, viewer_headers, params, expected_status
+):
+    """Invalid wait_for / timeout values are rejected before waiting."""
+
+    r = httpx.get(
+        f"{api_base}/jobs/1",
+        params=params,
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == expected_status, r.text
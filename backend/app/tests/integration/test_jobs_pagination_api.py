@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_keyset_pages_do_not_overlap(api_base, viewer_headers):
+    """
+    GET /jobs?limit=&after= walks history newest-first without overlap.
+
+    Covers:
+    - X-Next-Cursor is returned while more rows exist
+    - Following the cursor continues strictly after the previous page
+    - Status filter is applied on every page
+    """
+
+    r = httpx.post(
+        f"{api_base}/jobs/batch",
+        json=[{"input_text": f"page-{i}"} for i in range(5)],
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+
+    seen: list[int] = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 2}
+        if cursor:
+            params["after"] = cursor
+        r = httpx.get(
+            f"{api_base}/jobs", params=params, headers=viewer_headers, timeout=10
+        )
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page) == 2, page
+        seen.extend(j["id"] for j in page)
+        cursor = r.headers.get("X-Next-Cursor")
+        assert cursor, "expected a next-page cursor"
+
+    assert len(set(seen)) == len(seen), seen
+    assert seen == sorted(seen, reverse=True), seen
+
+    r = httpx.get(
+        f"{api_base}/jobs",
+        params={"status": "DONE", "limit": 3},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    assert all(j["status"] == "DONE" for j in r.json()), r.json()
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+@pytest.mark.parametrize(
+    "params",
+    [{"after": "not-a-cursor"}, {"limit": 0}, {"limit": 100000}],
+    ids=["bad-cursor", "zero-limit", "huge-limit"],
+)
+def test_list_jobs_rejects_invalid_paging(api_base, viewer_headers, params):
+    """Malformed cursors and out-of-range limits return 422."""
+
+    r = httpx.get(
+        f"{api_base}/jobs", params=params, headers=viewer_headers, timeout=10
+    )
+    assert r.status_code == 422, r.text
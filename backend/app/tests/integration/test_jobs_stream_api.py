@@ -0,0 +1,77 @@
+import json
+
+import httpx
+import pytest
+
+
+LIFECYCLE = ["QUEUED", "PROCESSING", "DONE"]
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_stream_pushes_transitions_in_order(api_base, viewer_token, viewer_headers):
+    """
+    SIT test for GET /jobs/stream (SSE).
+
+    Covers:
+    - Query-string token auth (EventSource clients)
+    - Snapshot event first, then pushed transitions up to DONE
+    - Transitions arrive in lifecycle order
+    """
+
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": "stream me"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    job_id = r.json()["id"]
+
+    seen = []
+    with httpx.stream(
+        "GET",
+        f"{api_base}/jobs/stream",
+        params={"job_id": job_id, "access_token": viewer_token},
+        timeout=httpx.Timeout(10, read=25),
+    ) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+
+        for line in resp.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            evt = json.loads(line[len("data:"):])
+            assert evt["job_id"] == job_id, evt
+            seen.append(evt["status"])
+            if evt["status"] in ("DONE", "FAILED"):
+                break
+
+    assert seen[-1] == "DONE", seen
+    positions = [LIFECYCLE.index(s) for s in seen]
+    assert positions == sorted(positions), seen
+
+
+@pytest.mark.security
+@pytest.mark.negative
+@pytest.mark.parametrize(
+    "params,use_header,expected_status",
+    [
+        ({}, False, 401),
+        ({"access_token": "not-a-jwt"}, False, 401),
+        ({"job_id": 999999999}, True, 404),
+    ],
+    ids=["no-token", "bad-token", "unknown-job"],
+)
+def test_stream_rejects_invalid(
+    api_base, viewer_headers, params, use_header, expected_status
+):
+    """Unauthenticated and unknown-job streams fail before streaming."""
+
+    r = httpx.get(
+        f"{api_base}/jobs/stream",
+        params=params,
+        headers=viewer_headers if use_header else {},
+        timeout=10,
+    )
+    assert r.status_code == expected_status, r.text
@@ -0,0 +1,71 @@
+import httpx
+import pytest
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_reads_see_own_writes_and_replica_status(
+    api_base,
+    viewer_headers,
+    admin_headers,
+):
+    """
+    SIT test for read-replica routing.
+
+    Covers:
+    - A job is readable (and listed) right after it was submitted,
+      whether or not DATABASE_REPLICA_URLS is configured
+    - GET /admin/replicas reports each replica's health (admin only)
+    """
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": "replica read-your-write"},
+        headers=viewer_headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    job_id = r.json()["id"]
+
+    r = httpx.get(f"{api_base}/jobs/{job_id}", headers=viewer_headers, timeout=10)
+    assert r.status_code == 200, r.text
+
+    r = httpx.get(f"{api_base}/jobs", params={"limit": 50}, headers=viewer_headers, timeout=10)
+    assert r.status_code == 200, r.text
+    assert job_id in {job["id"] for job in r.json()}
+
+    r = httpx.get(f"{api_base}/admin/replicas", headers=viewer_headers, timeout=10)
+    assert r.status_code == 403
+
+    r = httpx.get(f"{api_base}/admin/replicas", headers=admin_headers, timeout=10)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert isinstance(body["replicas"], list)
+    for replica in body["replicas"]:
+        assert set(replica) == {"url", "healthy"}
+        assert "://" in replica["url"]
+
+
+@pytest.mark.regression
+def test_db_pool_metrics(api_base, viewer_headers, admin_headers):
+    """
+    GET /admin/db-pool reports checkouts and wait times of the primary
+    pool (admin only); with DB_ASYNC, of the asyncio primary serving /jobs.
+    """
+
+    def pool():
+        r = httpx.get(f"{api_base}/admin/db-pool", headers=admin_headers, timeout=10)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        return body.get("async_primary", body["primary"])
+
+    r = httpx.get(f"{api_base}/admin/db-pool", headers=viewer_headers, timeout=10)
+    assert r.status_code == 403
+
+    before = pool()
+    r = httpx.get(f"{api_base}/jobs", params={"limit": 1}, headers=viewer_headers, timeout=10)
+    assert r.status_code == 200, r.text
+    after = pool()
+
+    assert after["checkouts"] > before["checkouts"]
+    assert after["connects"] >= 1
+    assert sum(after["wait_s"]["histogram"].values()) > 0
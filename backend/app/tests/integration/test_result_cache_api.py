@@ -0,0 +1,77 @@
+import uuid
+
+import httpx
+import pytest
+
+
+def _submit(api_base, headers, input_text):
+    r = httpx.post(
+        f"{api_base}/jobs",
+        json={"input_text": input_text},
+        headers=headers,
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _result(api_base, headers, job_id):
+    r = httpx.get(f"{api_base}/jobs/{job_id}/result", headers=headers, timeout=10)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.mark.regression
+@pytest.mark.sit
+def test_duplicate_input_is_served_from_result_cache(
+    api_base,
+    viewer_headers,
+    admin_headers,
+    poll_job_status,
+    eventually,
+):
+    """
+    SIT test for content-hash result memoization.
+
+    Covers:
+    - A repeated input (modulo whitespace) reaches DONE with the same result
+    - The hit is visible in GET /admin/result-cache (written in the
+      background within RESULT_CACHE_TOUCH_S)
+    """
+
+    text = f"memoize me {uuid.uuid4()}"
+
+    first = _submit(api_base, viewer_headers, text)
+    assert poll_job_status(
+        job_id=first, api_base=api_base, headers=viewer_headers, max_attempts=15
+    ) == "DONE"
+
+    before = httpx.get(
+        f"{api_base}/admin/result-cache", headers=admin_headers, timeout=10
+    )
+    assert before.status_code == 200, before.text
+
+    second = _submit(api_base, viewer_headers, f"  {text.replace(' ', '   ')} ")
+    assert poll_job_status(
+        job_id=second, api_base=api_base, headers=viewer_headers, max_attempts=15
+    ) == "DONE"
+
+    a = _result(api_base, viewer_headers, first)
+    b = _result(api_base, viewer_headers, second)
+    assert (a["label"], a["confidence"]) == (b["label"], b["confidence"])
+
+    after = eventually(
+        lambda: httpx.get(
+            f"{api_base}/admin/result-cache", headers=admin_headers, timeout=10
+        ).json(),
+        lambda body: body["total_hits"] > before.json()["total_hits"],
+        timeout_s=15,
+    )
+    assert after["total_hits"] == before.json()["total_hits"] + 1, after
+
+
+@pytest.mark.negative
+@pytest.mark.regression
+def test_result_cache_stats_require_admin(api_base, viewer_headers):
+    r = httpx.get(f"{api_base}/admin/result-cache", headers=viewer_headers, timeout=10)
+    assert r.status_code == 403, r.text
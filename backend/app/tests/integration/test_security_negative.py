@@ -36,3 +36,42 @@ def test_admin_health_rbac(
 
     # Validate RBAC behavior
     assert resp.status_code == expected_status, resp.text
+
+
+@pytest.mark.security
+@pytest.mark.regression
+@pytest.mark.sit
+def test_cached_token_still_rejects_tampering(api_base, viewer_token, admin_headers):
+    """
+    Security test for the verified-JWT cache.
+
+    - Repeating a valid token is served from the cache (hits increase)
+    - A token with a tampered signature is rejected (401) even while the
+      original token is cached
+    """
+
+    def cache_stats():
+        r = httpx.get(f"{api_base}/admin/token-cache", headers=admin_headers, timeout=10)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    viewer_headers = {"Authorization": f"Bearer {viewer_token}"}
+    for _ in range(2):
+        r = httpx.get(f"{api_base}/jobs", params={"limit": 1}, headers=viewer_headers, timeout=10)
+        assert r.status_code == 200, r.text
+
+    before = cache_stats()
+    r = httpx.get(f"{api_base}/jobs", params={"limit": 1}, headers=viewer_headers, timeout=10)
+    assert r.status_code == 200, r.text
+    assert cache_stats()["hits"] > before["hits"]
+
+    # Change one signature character (not the last: its low bits are padding)
+    c = viewer_token[-2]
+    tampered = viewer_token[:-2] + ("A" if c != "A" else "B") + viewer_token[-1]
+    r = httpx.get(
+        f"{api_base}/jobs",
+        params={"limit": 1},
+        headers={"Authorization": f"Bearer {tampered}"},
+        timeout=10,
+    )
+    assert r.status_code == 401
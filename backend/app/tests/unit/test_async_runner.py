@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import Job
+from app.worker import async_runner
+from app.worker.db_queue import claim_jobs
+from app.worker.inference import InferenceBackend
+from app.worker.result_cache import cache_key, store
+
+
+class FakeBackend(InferenceBackend):
+    name = "fake"
+
+    def __init__(self, latency_s: float = 0.0, error: Exception | None = None):
+        self.latency_s = latency_s
+        self.error = error
+        self.calls = 0
+
+    def _predict(self, input_texts):
+        raise NotImplementedError
+
+    async def _apredict(self, input_texts):
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        if self.error is not None:
+            raise self.error
+        return [("PASS", 0.9)] * len(input_texts)
+
+
+def _jobs(ids: list[int]) -> list[Job]:
+    with SessionLocal() as db:
+        return [db.get(Job, job_id) for job_id in ids]
+
+
+@pytest.fixture
+def use_backend(app_db, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "WORKER_POLL_INTERVAL_S", 0.05)
+
+    def use(backend: InferenceBackend) -> InferenceBackend:
+        monkeypatch.setattr(async_runner, "get_backend", lambda: backend)
+        return backend
+
+    return use
+
+
+def _run(**kwargs) -> int:
+    return asyncio.run(asyncio.wait_for(async_runner.run_async_worker(**kwargs), 30))
+
+
+@pytest.mark.regression
+def test_jobs_waiting_for_a_model_slot_keep_their_lease(
+    add_jobs, use_backend, monkeypatch
+) -> None:
+    """
+    With one model slot, the last job waits longer than WORKER_LEASE_S
+    before inference starts; renewal keeps other workers from taking it.
+    """
+    monkeypatch.setattr(settings, "WORKER_LEASE_S", 1)
+    monkeypatch.setattr(settings, "INFERENCE_MAX_CONCURRENCY", 1)
+    use_backend(FakeBackend(latency_s=0.6))
+    ids = add_jobs(3)
+    stolen = []
+
+    def try_to_steal() -> None:
+        with SessionLocal() as db:
+            stolen.extend(claim_jobs(db, "other-worker", limit=10))
+            db.commit()
+
+    async def scenario() -> None:
+        worker = asyncio.create_task(async_runner.run_async_worker(max_jobs=3))
+        await asyncio.sleep(1.4)  # third job: claimed ~1.4 s ago, not started
+        await asyncio.to_thread(try_to_steal)
+        await asyncio.wait_for(worker, 30)
+
+    asyncio.run(scenario())
+
+    assert stolen == []
+    assert [(job.status, job.attempts) for job in _jobs(ids)] == [("DONE", 1)] * 3
+
+
+@pytest.mark.negative
+def test_inference_errors_are_retried_then_failed(add_jobs, use_backend, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "WORKER_MAX_ATTEMPTS", 2)
+    backend = use_backend(FakeBackend(error=ConnectionError("model server reset")))
+    (job_id,) = add_jobs(1)
+
+    assert _run(max_jobs=2) == 2
+
+    (job,) = _jobs([job_id])
+    assert (job.status, job.attempts, job.lease_owner) == ("FAILED", 2, None)
+    assert backend.calls == 2
+
+
+@pytest.mark.negative
+def test_writer_failure_stops_the_worker(use_backend, monkeypatch) -> None:
+    """A dead result writer surfaces as an error instead of a silent stall."""
+    use_backend(FakeBackend())
+
+    async def broken_writer(done, owner, leased, slot_freed) -> None:
+        raise ValueError("writer bug")
+
+    monkeypatch.setattr(async_runner, "_write_loop", broken_writer)
+
+    with pytest.raises(ValueError, match="writer bug"):
+        _run()
+
+
+@pytest.mark.negative
+def test_failed_write_leaves_jobs_for_retry(add_jobs, use_backend, monkeypatch) -> None:
+    """A failed batch write is logged; the writer keeps serving later batches."""
+    use_backend(FakeBackend())
+    ids = add_jobs(2)
+    writes = []
+    real_write = async_runner._write
+
+    def flaky_write(owner, finished) -> None:
+        writes.append(len(finished))
+        if len(writes) == 1:
+            raise RuntimeError("database went away")
+        real_write(owner, finished)
+
+    monkeypatch.setattr(async_runner, "_write", flaky_write)
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 1)
+
+    assert _run(max_jobs=2) == 2
+
+    statuses = sorted(job.status for job in _jobs(ids))
+    assert statuses == ["DONE", "PROCESSING"]  # PROCESSING until its lease expires
+    assert writes == [1, 1]
+
+
+@pytest.mark.regression
+def test_cache_hits_count_against_the_concurrency_limit(
+    add_jobs, use_backend, monkeypatch
+) -> None:
+    """
+    With every input cached no model call holds a slot; claimed jobs still
+    do until written back, so a slow writer throttles claims.
+    """
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "WORKER_ASYNC_CONCURRENCY", 4)
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 2)
+    backend = use_backend(FakeBackend())
+    with SessionLocal() as db:
+        store(db, {cache_key("same input", backend.model_id): ("PASS", 0.9)})
+        db.commit()
+    add_jobs(*["same input"] * 20)
+
+    seen, peak = {}, []
+    real_write_loop, real_claim, real_write = (
+        async_runner._write_loop, async_runner._claim, async_runner._write,
+    )
+
+    def spy_write_loop(done, owner, leased, slot_freed):
+        seen["leased"] = leased
+        return real_write_loop(done, owner, leased, slot_freed)
+
+    def spy_claim(owner, limit, model):
+        rows, keys, cached = real_claim(owner, limit, model)
+        peak.append(len(seen["leased"]) + len(rows))
+        return rows, keys, cached
+
+    def slow_write(owner, finished) -> None:
+        time.sleep(0.05)
+        real_write(owner, finished)
+
+    monkeypatch.setattr(async_runner, "_write_loop", spy_write_loop)
+    monkeypatch.setattr(async_runner, "_claim", spy_claim)
+    monkeypatch.setattr(async_runner, "_write", slow_write)
+
+    assert _run(max_jobs=20) == 20
+
+    assert max(peak) <= 4
+    assert backend.calls == 0
+    with SessionLocal() as db:
+        assert set(db.scalars(select(Job.status))) == {"DONE"}
@@ -55,3 +55,87 @@ def test_login_parametrized(
     else:
         # Invalid login should return an error payload
         assert "detail" in body, body
+
+
+@pytest.mark.security
+@pytest.mark.regression
+def test_refresh_token_rotation_reuse_and_logout(api_base: str) -> None:
+    """
+    Refresh-token lifecycle.
+
+    - /auth/refresh returns a working access token and a new refresh token
+    - Replaying a consumed refresh token is rejected and revokes the
+      session, so the token issued by the rotation stops working too
+    - /auth/logout revokes a session
+    """
+
+    def login() -> dict:
+        r = httpx.post(
+            f"{api_base}/auth/login",
+            data={"username": "viewer", "password": "viewer123"},
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=10,
+        )
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    def refresh(token: str) -> httpx.Response:
+        return httpx.post(f"{api_base}/auth/refresh", json={"refresh_token": token}, timeout=10)
+
+    first = login()["refresh_token"]
+
+    r = refresh(first)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["token_type"] == "bearer"
+    second = body["refresh_token"]
+    assert second != first
+
+    r = httpx.get(
+        f"{api_base}/jobs",
+        params={"limit": 1},
+        headers={"Authorization": f"Bearer {body['access_token']}"},
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+
+    # Replay: rejected, and the whole session is revoked
+    assert refresh(first).status_code == 401
+    assert refresh(second).status_code == 401
+
+    assert refresh("not-a-token").status_code == 401
+
+    # Logout revokes a fresh session; logging out twice is harmless
+    other = login()["refresh_token"]
+    for _ in range(2):
+        r = httpx.post(f"{api_base}/auth/logout", json={"refresh_token": other}, timeout=10)
+        assert r.status_code == 204, r.text
+    assert refresh(other).status_code == 401
+
+
+@pytest.mark.regression
+def test_password_hasher_metrics(api_base: str, admin_headers: dict) -> None:
+    """
+    Logins are verified on the bounded password hashing executor and
+    reported at GET /admin/password-hasher.
+    """
+
+    def stats() -> dict:
+        r = httpx.get(f"{api_base}/admin/password-hasher", headers=admin_headers, timeout=10)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    before = stats()
+    r = httpx.post(
+        f"{api_base}/auth/login",
+        data={"username": "viewer", "password": "viewer123"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+
+    after = stats()
+    # Other logins (parallel runs, token fixtures) may complete meanwhile
+    assert after["completed"] >= before["completed"] + 1
+    assert after["hash_s"]["max"] > 0
+    assert after["workers"] >= 1
@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import Job
+from app.worker.db_queue import claim_jobs, renew_leases
+
+
+def _claim(owner: str, limit: int = 10, **kwargs) -> list:
+    with SessionLocal() as db:
+        rows = claim_jobs(db, owner, limit=limit, **kwargs)
+        db.commit()
+        return rows
+
+
+def _expire(job_ids: list[int]) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids))
+            .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+
+
+def _job(job_id: int) -> Job:
+    with SessionLocal() as db:
+        return db.get(Job, job_id)
+
+
+@pytest.mark.negative
+def test_reclaim_beyond_max_attempts_fails_the_job(add_jobs, monkeypatch) -> None:
+    """A job whose workers keep dying is FAILED instead of retried forever."""
+    monkeypatch.setattr(settings, "WORKER_MAX_ATTEMPTS", 2)
+    (job_id,) = add_jobs(1)
+
+    for attempt in (1, 2):
+        assert [row.attempts for row in _claim(f"worker-{attempt}")] == [attempt]
+        _expire([job_id])  # worker crashed holding the lease
+
+    assert _claim("worker-3") == []
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.lease_owner) == ("FAILED", 3, None)
+
+
+@pytest.mark.regression
+def test_renew_leases_extends_only_the_owners_jobs(add_jobs) -> None:
+    mine, theirs = add_jobs(2)
+    _claim("me", job_ids=[mine], lease_s=5)
+    _claim("them", job_ids=[theirs], lease_s=5)
+    before = _job(mine).lease_expires_at
+
+    with SessionLocal() as db:
+        assert renew_leases(db, "me", [mine, theirs], lease_s=600) == 1
+        db.commit()
+
+    assert _job(mine).lease_expires_at > before + timedelta(seconds=500)
+    assert _job(theirs).lease_expires_at < before + timedelta(seconds=60)
+
+
+@pytest.mark.regression
+def test_concurrent_claimers_never_take_the_same_job(add_jobs) -> None:
+    """
+    Several workers draining one queue at once: every job is claimed
+    exactly once (SKIP LOCKED on Postgres, the write lock on SQLite).
+    """
+    ids = add_jobs(60)
+    claims: dict[str, list[int]] = {}
+    start = threading.Barrier(4)
+
+    def drain(owner: str) -> None:
+        claims[owner] = []
+        start.wait()
+        while rows := _claim(owner, limit=4):
+            claims[owner].extend(row.id for row in rows)
+
+    threads = [threading.Thread(target=drain, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    claimed = [job_id for owned in claims.values() for job_id in owned]
+    assert sorted(claimed) == ids  # all claimed, none twice
+    for owner, owned in claims.items():
+        assert {_job(job_id).lease_owner for job_id in owned} <= {owner}
+
+
+@pytest.mark.regression
+def test_expired_lease_is_reclaimed_by_another_worker(add_jobs) -> None:
+    (job_id,) = add_jobs(1)
+    assert [row.id for row in _claim("crashed-worker")] == [job_id]
+
+    # Lease still valid: nobody else can take the job
+    assert _claim("other-worker") == []
+
+    _expire([job_id])
+    (row,) = _claim("other-worker")
+    assert (row.id, row.attempts) == (job_id, 2)
+    job = _job(job_id)
+    assert (job.status, job.lease_owner) == ("PROCESSING", "other-worker")
+    assert job.lease_expires_at > datetime.utcnow()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.worker import inference
+from app.worker.inference import HttpBackend, InferenceError
+
+
+def _model_server(n_predictions=None):
+    """MockTransport answering like worker/inference_stub.py."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = json.loads(request.content)["inputs"]
+        n = len(inputs) if n_predictions is None else n_predictions
+        return httpx.Response(
+            200, json={"predictions": [{"label": "PASS", "confidence": 0.8}] * n}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def http_backend(monkeypatch):
+    def make(n_predictions=None) -> HttpBackend:
+        transport = _model_server(n_predictions)
+        client, aclient = httpx.Client, httpx.AsyncClient
+        monkeypatch.setattr(
+            inference.httpx, "Client", lambda **kw: client(transport=transport, **kw)
+        )
+        monkeypatch.setattr(
+            inference.httpx, "AsyncClient", lambda **kw: aclient(transport=transport, **kw)
+        )
+        return HttpBackend("http://model.test/predict", timeout_s=5)
+
+    return make
+
+
+@pytest.mark.regression
+def test_crash_inputs_keep_their_positions(http_backend) -> None:
+    backend = http_backend()
+    assert backend.predict_batch(["a", "crash me", "b"]) == [
+        ("PASS", 0.8), None, ("PASS", 0.8),
+    ]
+
+
+@pytest.mark.negative
+@pytest.mark.parametrize("n_predictions", [1, 3], ids=["too-few", "too-many"])
+def test_prediction_count_mismatch_raises_inference_error(
+    http_backend, n_predictions: int
+) -> None:
+    backend = http_backend(n_predictions)
+    with pytest.raises(InferenceError, match=f"{n_predictions} predictions for 2 inputs"):
+        backend.predict_batch(["a", "crash", "b"])
+    with pytest.raises(InferenceError):
+        asyncio.run(backend.apredict_batch(["a", "b"]))
+
+
+@pytest.mark.regression
+def test_http_async_client_per_event_loop(http_backend) -> None:
+    backend = http_backend()
+    seen = []
+
+    async def two_calls() -> None:
+        await backend.apredict_batch(["a"])
+        await backend.apredict_batch(["b"])
+        seen.append(backend._aclients[asyncio.get_running_loop()])
+        await backend.aclose()
+        assert asyncio.get_running_loop() not in backend._aclients
+
+    asyncio.run(two_calls())
+    asyncio.run(two_calls())
+
+    assert len(seen) == 2 and seen[0] is not seen[1]
+    assert all(client.is_closed for client in seen)
+
+
+@pytest.mark.regression
+def test_close_backend_releases_the_process_wide_backend(monkeypatch) -> None:
+    closed = []
+    monkeypatch.setattr(inference.SimulatedBackend, "close", lambda self: closed.append(self))
+    inference.get_backend.cache_clear()
+
+    backend = inference.get_backend()
+    inference.close_backend()
+    inference.close_backend()  # nothing left to close
+
+    assert closed == [backend]
+    assert inference.get_backend() is not backend
+    inference.get_backend.cache_clear()
+
+
+@pytest.fixture
+def cpu_pool(monkeypatch):
+    """Two-process pool running the cpu model (children read the env)."""
+    monkeypatch.setenv("INFERENCE_BACKEND", "cpu")
+    monkeypatch.setattr(inference.settings, "INFERENCE_BACKEND", "cpu")
+    pool = inference.ProcessPoolBackend(processes=2, chunk_size=3)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.regression
+def test_process_pool_matches_inline_model(cpu_pool) -> None:
+    """Chunks fan out to the children and come back in input order."""
+    texts = [f"input number {i}" for i in range(7)] + ["please crash"] + ["tail"]
+    expected = inference.CpuBackend().predict_batch(texts)
+
+    assert cpu_pool.predict_batch(texts) == expected
+    assert asyncio.run(cpu_pool.apredict_batch(texts)) == expected
+    assert expected[7] is None
+    assert cpu_pool.model_id == inference.CpuBackend().model_id
+
+
+@pytest.mark.regression
+def test_process_pool_close_stops_the_children(cpu_pool) -> None:
+    cpu_pool.predict_batch(["warm up"])
+    children = list(cpu_pool.pool._processes.values())
+    assert children
+
+    cpu_pool.close()
+
+    assert cpu_pool._pool is None
+    assert not any(child.is_alive() for child in children)
+    assert cpu_pool.predict_batch(["restarts on demand"])[0] is not None
+
+
+@pytest.mark.regression
+def test_process_executor_setting_wraps_the_model(monkeypatch) -> None:
+    monkeypatch.setattr(inference.settings, "INFERENCE_EXECUTOR", "process")
+    monkeypatch.setattr(inference.settings, "INFERENCE_PROCESSES", 3)
+    inference.get_backend.cache_clear()
+
+    backend = inference.get_backend()
+    try:
+        assert isinstance(backend, inference.ProcessPoolBackend)
+        assert backend.processes == 3
+        assert backend.chunk_size == inference.settings.INFERENCE_CHUNK_SIZE
+    finally:
+        inference.close_backend()
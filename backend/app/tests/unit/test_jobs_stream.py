@@ -0,0 +1,100 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi import HTTPException
+
+from app.db import SessionLocal
+from app.events import EventBus, bus
+from app.main import RedactAccessToken
+from app.routes import jobs
+
+
+VIEWER = {"username": "viewer", "role": "viewer"}
+
+
+def _open_stream(**kwargs):
+    async def _open():
+        return await jobs.stream_jobs(user=VIEWER, **kwargs)
+
+    return asyncio.run(_open())
+
+
+@pytest.mark.negative
+def test_stream_unknown_job_does_not_leak_subscription(monkeypatch) -> None:
+    async def missing(job_id):
+        return None
+
+    monkeypatch.setattr(jobs, "_current_status", missing)
+    before = bus.subscriber_count()
+
+    with pytest.raises(HTTPException) as err:
+        _open_stream(job_id=999)
+
+    assert err.value.status_code == 404
+    assert bus.subscriber_count() == before
+
+
+@pytest.mark.negative
+def test_stream_status_query_error_does_not_leak_subscription(monkeypatch) -> None:
+    async def broken(job_id):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(jobs, "_current_status", broken)
+    before = bus.subscriber_count()
+
+    with pytest.raises(ConnectionError):
+        _open_stream(job_id=1)
+
+    assert bus.subscriber_count() == before
+
+
+@pytest.mark.regression
+def test_queued_events_carry_the_new_row(app_db, monkeypatch) -> None:
+    """The Jobs page adds new rows from the event instead of reloading."""
+    published = []
+    monkeypatch.setattr(bus, "publish", published.extend)
+
+    with SessionLocal() as db:
+        job = jobs._insert_job(db, "hello", "viewer")
+
+    assert published == [{
+        "job_id": job.id,
+        "status": "QUEUED",
+        "at": published[0]["at"],
+        "submitted_by": "viewer",
+        "created_at": job.created_at.isoformat(),
+    }]
+
+
+@pytest.mark.security
+def test_access_log_redacts_stream_tokens() -> None:
+    record = logging.LogRecord(
+        "uvicorn.access", logging.INFO, __file__, 1,
+        '%s - "%s %s HTTP/%s" %d',
+        ("127.0.0.1:5000", "GET", "/jobs/stream?access_token=eyJ.abc.def&job_id=4", "1.1", 200),
+        None,
+    )
+
+    assert RedactAccessToken().filter(record)
+    assert record.getMessage() == (
+        '127.0.0.1:5000 - "GET /jobs/stream?access_token=[redacted]&job_id=4 HTTP/1.1" 200'
+    )
+
+
+@pytest.mark.negative
+def test_stream_ends_when_subscriber_falls_behind(monkeypatch) -> None:
+    """Dropped events would leave stale statuses: end the stream to resync."""
+    small = EventBus(queue_size=3)
+    monkeypatch.setattr(jobs, "bus", small)
+
+    async def scenario() -> list[str]:
+        response = await jobs.stream_jobs(user=VIEWER)
+        small.publish([{"job_id": i, "status": "DONE", "at": "-"} for i in range(5)])
+        await asyncio.sleep(0)  # let the loop run the queued offers
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert chunks == []  # the backlog is dropped, the client reloads instead
+    assert small.subscriber_count() == 0
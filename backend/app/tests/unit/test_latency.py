@@ -0,0 +1,53 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app import latency
+from app.db import SessionLocal
+from app.models import LatencySketch
+
+
+def _persisted() -> dict[str, int]:
+    with SessionLocal() as db:
+        return {
+            row.stage: latency.DDSketch.from_json(row.sketch).count
+            for row in db.scalars(select(LatencySketch))
+        }
+
+
+@pytest.mark.negative
+def test_clock_skew_durations_count_as_zero() -> None:
+    """A worker clock behind the API's must not produce negative latencies."""
+    created = datetime(2024, 1, 1, 12, 0, 5)
+    started = created - timedelta(seconds=2)
+    finished = created + timedelta(seconds=1)
+
+    assert latency.stage_durations(created, started, finished) == {
+        "total": 1.0, "queue_wait": 0.0, "processing": 3.0,
+    }
+
+
+@pytest.mark.regression
+def test_commit_does_not_flush_the_flush_thread_does(app_db, monkeypatch) -> None:
+    """
+    Committing a finished job only updates the in-memory sketches; the
+    per-process flush thread merges them into latency_sketches.
+    """
+    recorder = latency.LatencyRecorder(alpha=0.01, flush_s=0.2)
+    monkeypatch.setattr(latency, "recorder", recorder)
+
+    with SessionLocal() as db:
+        latency.record_finished(db, [{"total": 1.5, "queue_wait": 0.5, "processing": 1.0}])
+        db.commit()
+
+    assert _persisted() == {}
+    assert recorder.unflushed()["total"].count == 1
+
+    deadline = time.monotonic() + 5
+    while not _persisted() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert _persisted() == {"total": 1, "queue_wait": 1, "processing": 1}
+    assert recorder.unflushed()["total"].count == 0
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, select
+
+from app import migrate
+from app.db import SessionLocal
+from app.models import Job, JobBucket
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+# Tables as created by create_all before schema_version existed
+# (no lease / lifecycle columns, no keyset pagination index, unsharded
+# time-series buckets)
+BASELINE_DDL = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL PRIMARY KEY,
+        username VARCHAR(100) NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        role VARCHAR(50) NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX ix_users_username ON users (username)",
+    """CREATE TABLE jobs (
+        id INTEGER NOT NULL PRIMARY KEY,
+        created_at DATETIME NOT NULL,
+        status VARCHAR(30) NOT NULL,
+        submitted_by VARCHAR(100) NOT NULL,
+        input_text TEXT NOT NULL
+    )""",
+    "CREATE INDEX ix_jobs_created_at ON jobs (created_at)",
+    """CREATE TABLE results (
+        id INTEGER NOT NULL PRIMARY KEY,
+        job_id INTEGER NOT NULL UNIQUE REFERENCES jobs (id),
+        label VARCHAR(50) NOT NULL,
+        confidence FLOAT NOT NULL,
+        processed_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE job_buckets (
+        resolution VARCHAR(4) NOT NULL,
+        bucket_start DATETIME NOT NULL,
+        submitted INTEGER NOT NULL,
+        done INTEGER NOT NULL,
+        failed INTEGER NOT NULL,
+        confidence_sum FLOAT NOT NULL,
+        confidence_count INTEGER NOT NULL,
+        PRIMARY KEY (resolution, bucket_start)
+    )""",
+]
+
+
+def _create_baseline(engine) -> None:
+    with engine.begin() as conn:
+        for ddl in BASELINE_DDL:
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql(
+            "INSERT INTO jobs (id, created_at, status, submitted_by, input_text) "
+            "VALUES (1, '2024-01-01 00:00:00', 'DONE', 'admin', 'old job')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO job_buckets VALUES ('1d', '2024-01-01 00:00:00', 1, 1, 0, 0.5, 1)"
+        )
+
+
+@pytest.mark.regression
+def test_migrate_upgrades_baseline_schema(sqlite_engine) -> None:
+    """
+    A database created before schema_version existed gets the columns
+    and index later steps added; existing rows survive and stay usable.
+    """
+    _create_baseline(sqlite_engine)
+
+    report = migrate.migrate(sqlite_engine)
+    assert report == {"from": 0, "to": migrate.SCHEMA_VERSION}
+    assert migrate.check(sqlite_engine) == migrate.SCHEMA_VERSION
+
+    inspector = inspect(sqlite_engine)
+    columns = {c["name"] for c in inspector.get_columns("jobs")}
+    assert {"lease_owner", "lease_expires_at", "attempts",
+            "started_at", "finished_at"} <= columns
+    indexes = {i["name"] for i in inspector.get_indexes("jobs")}
+    assert "ix_jobs_status_created_at_id" in indexes
+    bucket_key = inspector.get_pk_constraint("job_buckets")["constrained_columns"]
+    assert bucket_key == ["resolution", "bucket_start", "shard"]
+
+    with SessionLocal(bind=sqlite_engine) as db:
+        old = db.get(Job, 1)
+        assert old.input_text == "old job"
+        assert old.attempts == 0  # backfilled for attempts + 1 on claim
+        (bucket,) = db.scalars(select(JobBucket)).all()
+        assert (bucket.bucket_start, bucket.shard, bucket.done) == (datetime(2024, 1, 1), 1, 1)
+
+        db.add(Job(submitted_by="admin", input_text="new job"))
+        db.commit()
+        assert db.scalar(select(Job.status).where(Job.input_text == "new job")) == "QUEUED"
+
+    # Running again is a no-op
+    assert migrate.migrate(sqlite_engine) == {
+        "from": migrate.SCHEMA_VERSION, "to": migrate.SCHEMA_VERSION,
+    }
+
+
+@pytest.mark.negative
+def test_check_rejects_unmigrated_and_old_databases(sqlite_engine) -> None:
+    with pytest.raises(migrate.SchemaOutOfDate, match="version 0"):
+        migrate.check(sqlite_engine)
+
+    # Only the baseline step applied
+    with sqlite_engine.begin() as conn:
+        migrate.STEPS[1](conn)
+        migrate._record(conn, 1)
+    with pytest.raises(migrate.SchemaOutOfDate, match="python -m app.migrate"):
+        migrate.check(sqlite_engine)
+
+
+@pytest.mark.negative
+def test_startup_refuses_old_schema(sqlite_engine, monkeypatch) -> None:
+    """The API lifespan fails before serving when the schema is behind."""
+    from app import main
+
+    _create_baseline(sqlite_engine)
+    monkeypatch.setattr(
+        main.migrate, "check", functools.partial(migrate.check, sqlite_engine)
+    )
+
+    async def _start() -> None:
+        async with main.lifespan(main.app):
+            pass
+
+    with pytest.raises(migrate.SchemaOutOfDate):
+        asyncio.run(_start())
+
+
+def _cli(db_url: str, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "DATABASE_URL": db_url}
+    return subprocess.run(
+        [sys.executable, "-m", "app.migrate", *args],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+@pytest.mark.regression
+def test_migrate_cli(tmp_path) -> None:
+    db_url = f"sqlite:///{tmp_path / 'cli.db'}"
+
+    r = _cli(db_url, "--check")
+    assert r.returncode == 1
+    assert "run `python -m app.migrate`" in r.stderr
+
+    r = _cli(db_url)
+    assert r.returncode == 0, r.stderr
+    assert f"from version 0 to {migrate.SCHEMA_VERSION}" in r.stdout
+
+    r = _cli(db_url)
+    assert r.returncode == 0, r.stderr
+    assert "Schema is current" in r.stdout
+
+    r = _cli(db_url, "--check")
+    assert r.returncode == 0, r.stderr
+    assert f"version {migrate.SCHEMA_VERSION}" in r.stdout
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import security
+from app.db import get_db, get_session
+from app.models import User
+from app.routes import auth
+from app.security import PasswordHasher
+
+
+@pytest.fixture
+def busy_hasher(monkeypatch):
+    """
+    A one-worker hasher with no queue (PASSWORD_HASH_WORKERS=1,
+    PASSWORD_HASH_QUEUE=0) serving /auth/login, plus release() to let
+    the call holding its only slot finish.
+    """
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+
+    freed = threading.Event()
+    real_verify = security.verify_password
+
+    def verify(plain: str, hashed: str) -> bool:
+        if plain == "slow":
+            freed.wait(10)
+            return False
+        return real_verify(plain, hashed)
+
+    monkeypatch.setattr(security, "verify_password", verify)
+
+    holder = threading.Thread(target=asyncio.run, args=(hasher.verify("slow", "-"),))
+    holder.start()
+    deadline = time.monotonic() + 5
+    while hasher.snapshot()["running"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    def release() -> None:
+        # The slot is given back once the holder's call has returned
+        freed.set()
+        holder.join(10)
+
+    yield hasher, release
+    release()
+
+
+@pytest.fixture
+def client(app_db, monkeypatch) -> TestClient:
+    """
+    /auth routes only, no lifespan (no schema check or event bus). Sync
+    sessions in both DB modes: app_db binds SessionLocal only.
+    """
+    user = User(username="viewer", password_hash=security.hash_password("viewer123"), role="viewer")
+    monkeypatch.setattr(auth, "_find_user", lambda db, username: user)
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.dependency_overrides[get_session] = get_db
+    return TestClient(app)
+
+
+def _login(client: TestClient):
+    return client.post("/auth/login", data={"username": "viewer", "password": "viewer123"})
+
+
+@pytest.mark.negative
+def test_login_gets_503_with_retry_after_when_hasher_is_saturated(
+    busy_hasher, client
+) -> None:
+    hasher, release = busy_hasher
+
+    r = _login(client)
+    assert r.status_code == 503, r.text
+    assert r.headers["Retry-After"] == "1"
+    assert hasher.snapshot()["rejected"] == 1
+
+    # Once the slot is free, logins are verified again
+    release()
+    r = _login(client)
+    assert r.status_code == 200, r.text
+    assert hasher.snapshot()["completed"] == 2
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from app import queries
+from app.db import SessionLocal
+from app.models import Job, Result, User
+
+
+@pytest.fixture
+def jobs(app_db) -> list[Job]:
+    """Seven jobs; three share a created_at, so the page cursor needs the id."""
+    start = datetime(2024, 1, 1)
+    created = [start, start, start, start + timedelta(seconds=1),
+               start + timedelta(seconds=2), start + timedelta(seconds=3),
+               start + timedelta(seconds=4)]
+    with SessionLocal() as db:
+        rows = [
+            Job(submitted_by="viewer", input_text=f"job {i}", created_at=at,
+                status="DONE" if i % 2 else "QUEUED")
+            for i, at in enumerate(created)
+        ]
+        db.add_all(rows)
+        db.flush()
+        db.add(Result(job_id=rows[1].id, label="PASS", confidence=0.9))
+        db.add(User(username="viewer", password_hash="x", role="viewer"))
+        db.commit()
+        return sorted(rows, key=lambda job: (job.created_at, job.id), reverse=True)
+
+
+def _walk(db, page_size: int, status=None) -> list[int]:
+    seen, before = [], None
+    while page := queries.job_page(db, page_size, status=status, before=before):
+        seen.extend(job.id for job in page)
+        before = (page[-1].created_at, page[-1].id)
+    return seen
+
+
+@pytest.mark.regression
+@pytest.mark.parametrize("page_size", [1, 2, 3, 10])
+def test_job_pages_walk_every_job_once_newest_first(jobs, page_size) -> None:
+    with SessionLocal() as db:
+        assert _walk(db, page_size) == [job.id for job in jobs]
+        assert _walk(db, page_size, status="DONE") == [
+            job.id for job in jobs if job.status == "DONE"
+        ]
+
+
+@pytest.mark.regression
+def test_lookups(jobs) -> None:
+    done = next(job for job in jobs if job.status == "DONE" and job.input_text == "job 1")
+    with SessionLocal() as db:
+        assert queries.job_status(db, done.id) == "DONE"
+        assert queries.job_status(db, 10_000) is None
+        assert queries.result_for_job(db, done.id).label == "PASS"
+        assert queries.result_for_job(db, jobs[0].id) is None
+        assert queries.user_by_username(db, "viewer").role == "viewer"
+        assert queries.user_by_username(db, "nobody") is None
+
+
+@pytest.mark.regression
+def test_repeated_calls_reuse_the_compiled_statement(jobs, migrated_engine) -> None:
+    """Only the parameters change: every call after the first is a cache hit."""
+    hits = []
+
+    @event.listens_for(migrated_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        hits.append(context.cache_hit == CACHE_HIT)
+
+    try:
+        with SessionLocal() as db:
+            for job in jobs:
+                queries.job_status(db, job.id)
+            for cursor in (None, (jobs[2].created_at, jobs[2].id)):
+                queries.job_page(db, 2, before=cursor)
+                queries.job_page(db, 3, before=cursor)
+    finally:
+        event.remove(migrated_engine, "before_cursor_execute", record)
+
+    status_calls, page_calls = hits[:len(jobs)], hits[len(jobs):]
+    assert status_calls[1:] == [True] * (len(jobs) - 1)
+    assert page_calls[1] and page_calls[3]  # second call per page variant
@@ -0,0 +1,94 @@
+import pytest
+
+from app.db import ReplicaRouter
+
+
+@pytest.fixture
+def make_router(migrated_engine, tmp_path):
+    """ReplicaRouter over replica files in tmp_path ("missing/" ones cannot open)."""
+    routers = []
+
+    def make(*names: str, retry_s: float = 60, sticky_s: float = 60) -> ReplicaRouter:
+        router = ReplicaRouter(
+            migrated_engine,
+            [f"sqlite:///{tmp_path / name}" for name in names],
+            retry_s=retry_s,
+            sticky_s=sticky_s,
+        )
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        for replica in router.replicas:
+            replica.dispose()
+
+
+def _read_from(router: ReplicaRouter, key=None) -> str:
+    """File name of the database the next read session is bound to."""
+    with router.session(key) as db:
+        return db.get_bind().url.database.rsplit("/", 1)[-1]
+
+
+@pytest.fixture
+def primary(app_db, migrated_engine) -> str:
+    return migrated_engine.url.database.rsplit("/", 1)[-1]
+
+
+@pytest.mark.regression
+def test_reads_round_robin_over_replicas(make_router, primary) -> None:
+    router = make_router("a.db", "b.db")
+
+    reads = [_read_from(router) for _ in range(4)]
+
+    assert sorted(reads[:2]) == ["a.db", "b.db"]
+    assert reads[2:] == reads[:2]
+    assert primary not in reads
+
+
+@pytest.mark.negative
+def test_unreachable_replica_is_skipped_then_retried(make_router, monkeypatch) -> None:
+    router = make_router("a.db", "missing/down.db", retry_s=30)
+    clock = [1000.0]
+    monkeypatch.setattr("app.db.time.monotonic", lambda: clock[0])
+
+    assert [_read_from(router) for _ in range(3)] == ["a.db"] * 3
+    assert [r["healthy"] for r in router.status()] == [True, False]
+
+    attempts = []
+    real_mark_down = router.mark_down
+    monkeypatch.setattr(router, "mark_down", lambda e: (attempts.append(e), real_mark_down(e)))
+    for _ in range(3):
+        _read_from(router)
+    assert attempts == []  # skipped while down, no connection attempts
+
+    clock[0] += 31
+    assert [_read_from(router) for _ in range(2)] == ["a.db"] * 2
+    assert attempts == [router.replicas[1]]  # tried once again, still down
+
+
+@pytest.mark.negative
+def test_reads_fall_back_to_primary_when_no_replica_is_usable(make_router, primary) -> None:
+    router = make_router("missing/one.db", "missing/two.db")
+
+    assert _read_from(router) == primary
+    assert [r["healthy"] for r in router.status()] == [False, False]
+    assert _read_from(router) == primary
+
+
+@pytest.mark.regression
+def test_writers_read_from_primary_until_sticky_window_ends(
+    make_router, primary, monkeypatch
+) -> None:
+    router = make_router("a.db", sticky_s=5)
+    clock = [1000.0]
+    monkeypatch.setattr("app.db.time.monotonic", lambda: clock[0])
+
+    router.note_write("viewer")
+
+    assert _read_from(router, "viewer") == primary
+    assert _read_from(router, "admin") == "a.db"
+    assert _read_from(router) == "a.db"
+
+    clock[0] += 6
+    assert _read_from(router, "viewer") == "a.db"
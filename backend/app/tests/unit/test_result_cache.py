@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import ResultCache
+from app.worker import result_cache
+from app.worker.inference import HttpBackend, SimulatedBackend
+
+
+@pytest.mark.regression
+def test_cache_key_depends_on_endpoint_and_model_version(monkeypatch) -> None:
+    """Another model server, or an upgraded model, never reuses entries."""
+    key = lambda backend: result_cache.cache_key("same input", backend.model_id)
+
+    a = HttpBackend("http://model-a.test/predict", timeout_s=5)
+    b = HttpBackend("http://model-b.test/predict", timeout_s=5)
+    assert key(a) != key(b)
+    assert key(a) == key(HttpBackend("http://model-a.test/predict", timeout_s=1))
+
+    simulated = key(SimulatedBackend())
+    monkeypatch.setattr(settings, "INFERENCE_MODEL_VERSION", "2")
+    assert key(SimulatedBackend()) != simulated
+
+
+@pytest.mark.regression
+def test_lookups_do_not_write_hits_until_flushed(app_db, monkeypatch) -> None:
+    """Hits are batched: lookups only read, flush() writes one UPDATE."""
+    monkeypatch.setattr(result_cache, "touches", result_cache.PendingTouches())
+    monkeypatch.setattr(settings, "RESULT_CACHE_TOUCH_S", 3600)  # no background flush
+    hot, cold = "a" * 64, "b" * 64
+    with SessionLocal() as db:
+        result_cache.store(db, {hot: ("PASS", 0.9), cold: ("FAIL", 0.2)})
+        db.commit()
+
+    for _ in range(3):
+        with SessionLocal() as db:
+            assert result_cache.lookup(db, [hot]) == {hot: ("PASS", 0.9)}
+            db.commit()
+
+    def entries() -> dict[str, ResultCache]:
+        with SessionLocal() as db:
+            return {row.input_hash: row for row in db.scalars(select(ResultCache))}
+
+    assert [entry.hits for entry in entries().values()] == [0, 0]
+
+    result_cache.touches.flush()
+    after = entries()
+    assert (after[hot].hits, after[cold].hits) == (3, 0)
+    assert after[hot].last_hit_at > after[cold].last_hit_at  # cold is evicted first
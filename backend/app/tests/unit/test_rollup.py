@@ -0,0 +1,104 @@
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app import rollup
+from app.config import settings
+from app.db import SessionLocal
+from app.models import Job, JobBucket, JobStats
+from app.worker import tasks
+
+
+@pytest.fixture
+def shards(app_db, monkeypatch):
+    """Hand out shards round-robin instead of at random."""
+    order = itertools.cycle(range(1, settings.ROLLUP_SHARDS + 1))
+    monkeypatch.setattr(rollup.random, "randint", lambda a, b: next(order))
+
+
+def _submit(n: int) -> None:
+    """n jobs, one transaction each, as POST /jobs does."""
+    for i in range(n):
+        with SessionLocal() as db:
+            db.add(Job(submitted_by="viewer", input_text=f"job {i}"))
+            db.flush()
+            rollup.count_transition(db, 1, "QUEUED")
+            db.commit()
+
+
+def _shard_rows() -> dict[int, int]:
+    with SessionLocal() as db:
+        return dict(db.execute(select(JobStats.id, JobStats.queued)).tuples().all())
+
+
+@pytest.mark.regression
+def test_transitions_spread_over_shards_and_sum_on_read(shards) -> None:
+    _submit(settings.ROLLUP_SHARDS + 2)
+
+    per_shard = _shard_rows()
+    assert len(per_shard) == settings.ROLLUP_SHARDS
+    assert sum(1 for queued in per_shard.values() if queued) > 1
+
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        assert rollup.totals(db) == rollup.compute(db)
+        (point,) = rollup.series(
+            db, "1d", rollup.bucket_start(now, "1d"), now + timedelta(seconds=1)
+        )
+        bucket_rows = db.scalar(
+            select(func.count()).select_from(JobBucket).where(JobBucket.resolution == "1d")
+        )
+    assert point["submitted"] == settings.ROLLUP_SHARDS + 2
+    assert bucket_rows > 1
+
+
+@pytest.mark.regression
+def test_rebuild_collapses_shards_without_drift(shards) -> None:
+    _submit(5)
+    with SessionLocal() as db:
+        before = rollup.totals(db)
+        report = rollup.rebuild(db)
+        db.commit()
+
+    assert report["drift"] == {}
+    assert report["before"] == before
+    assert _shard_rows() == {
+        shard: (5 if shard == rollup.ROW_ID else 0)
+        for shard in range(1, settings.ROLLUP_SHARDS + 1)
+    }
+
+
+@pytest.mark.regression
+def test_added_shards_are_created_on_first_use(shards, monkeypatch) -> None:
+    """Raising ROLLUP_SHARDS: the first write to a new shard seeds it."""
+    _submit(2)
+    monkeypatch.setattr(settings, "ROLLUP_SHARDS", settings.ROLLUP_SHARDS + 2)
+    monkeypatch.setattr(rollup.random, "randint", lambda a, b: b)
+
+    _submit(1)
+
+    assert len(_shard_rows()) == settings.ROLLUP_SHARDS
+    with SessionLocal() as db:
+        assert rollup.totals(db)["queued"] == 3
+
+
+@pytest.mark.regression
+def test_prune_task_deletes_only_expired_buckets(app_db) -> None:
+    now = datetime.utcnow()
+    old = now - timedelta(seconds=settings.TIMESERIES_RETENTION_1M_S + 3600)
+    with SessionLocal() as db:
+        for resolution, at in (("1m", old), ("1m", now), ("1h", old), ("1d", old)):
+            db.add(JobBucket(
+                resolution=resolution, bucket_start=rollup.bucket_start(at, resolution),
+                shard=1, submitted=1,
+            ))
+        db.commit()
+
+    assert tasks.prune_buckets_task() == {"pruned_buckets": 1}
+
+    with SessionLocal() as db:
+        kept = db.execute(select(JobBucket.resolution, JobBucket.bucket_start)).tuples().all()
+    assert sorted(resolution for resolution, _ in kept) == ["1d", "1h", "1m"]
+    assert rollup.retained_since("1d") is None
@@ -0,0 +1,47 @@
+import pytest
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import Job
+from app.worker import runner, tasks
+
+
+@pytest.fixture(autouse=True)
+def fast_worker(app_db, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "WORKER_BATCH_MAX_WAIT_S", 0)
+    monkeypatch.setattr(settings, "WORKER_POLL_INTERVAL_S", 0.01)
+    monkeypatch.setattr(tasks, "infer_batch", lambda texts: [("PASS", 0.9)] * len(texts))
+
+
+@pytest.mark.regression
+def test_pending_count_stops_at_limit(add_jobs) -> None:
+    add_jobs(5)
+    assert runner.pending_count(2) == 2
+    assert runner.pending_count(10) == 5
+
+
+@pytest.mark.regression
+def test_runner_drains_queue_in_batches(add_jobs) -> None:
+    ids = add_jobs(3)
+    assert runner.run_batch_worker(max_batches=2) == 3
+    with SessionLocal() as db:
+        assert {db.get(Job, job_id).status for job_id in ids} == {"DONE"}
+
+
+@pytest.mark.regression
+def test_empty_claims_do_not_count_as_batches(add_jobs, monkeypatch) -> None:
+    """Work seen but taken by another runner does not use up max_batches."""
+    add_jobs(2)
+    real_process_batch = runner.process_batch
+    calls = []
+
+    def lose_first_race(**kwargs):
+        calls.append(kwargs)
+        return [] if len(calls) == 1 else real_process_batch(**kwargs)
+
+    monkeypatch.setattr(runner, "process_batch", lose_first_race)
+
+    assert runner.run_batch_worker(max_batches=1) == 2
+    assert len(calls) == 2
@@ -0,0 +1,146 @@
+import pytest
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import Job, Result
+from app.worker import tasks
+from app.worker.db_queue import worker_id
+
+
+def _job(job_id: int) -> Job:
+    with SessionLocal() as db:
+        return db.get(Job, job_id)
+
+
+def _result_count(job_id: int) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count(Result.id)).where(Result.job_id == job_id))
+
+
+@pytest.fixture(autouse=True)
+def fast_model(app_db, monkeypatch):
+    """Instant deterministic predictions; no result cache."""
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(
+        tasks, "infer_batch",
+        lambda texts: [None if "crash" in t else ("PASS", 0.9) for t in texts],
+    )
+
+
+@pytest.mark.regression
+@pytest.mark.parametrize("prediction", [("PASS", 0.9), None], ids=["done", "crash"])
+def test_process_job_lost_lease_writes_nothing(add_jobs, monkeypatch, prediction) -> None:
+    """
+    Another worker re-claims the job while the model runs: the original
+    worker reports LEASE_LOST and neither finishes (nor fails) the job nor
+    writes a Result; the new owner's lease stays intact.
+    """
+    (job_id,) = add_jobs("lost lease")
+
+    def steal_lease(texts):
+        with SessionLocal() as other:
+            other.execute(
+                update(Job).where(Job.id == job_id).values(lease_owner="other-worker")
+            )
+            other.commit()
+        return [prediction]
+
+    monkeypatch.setattr(tasks, "infer_batch", steal_lease)
+
+    assert tasks.process_job(job_id) == {"ok": False, "reason": tasks.LEASE_LOST}
+
+    job = _job(job_id)
+    assert job.status == "PROCESSING"
+    assert job.lease_owner == "other-worker"
+    assert _result_count(job_id) == 0
+
+
+@pytest.mark.regression
+def test_process_job_retries_after_inference_error(add_jobs, monkeypatch) -> None:
+    (job_id,) = add_jobs("flaky model")
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise ConnectionError("model server reset")
+        return [("PASS", 0.9)]
+
+    monkeypatch.setattr(tasks, "infer_batch", flaky)
+
+    assert tasks.process_job(job_id)["ok"] is True
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.lease_owner) == ("DONE", 2, None)
+    assert _result_count(job_id) == 1
+
+
+@pytest.mark.negative
+def test_process_job_fails_after_max_attempts(add_jobs, monkeypatch) -> None:
+    """A model that always raises FAILs the job; it never stays PROCESSING."""
+    monkeypatch.setattr(settings, "WORKER_MAX_ATTEMPTS", 2)
+    (job_id,) = add_jobs("broken model")
+
+    def broken(texts):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(tasks, "infer_batch", broken)
+
+    assert tasks.process_job(job_id) == {"ok": False, "reason": tasks.INFERENCE_ERROR}
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.lease_owner) == ("FAILED", 2, None)
+    assert _result_count(job_id) == 0
+
+
+@pytest.mark.negative
+def test_process_batch_requeues_for_polling_runner(add_jobs, monkeypatch) -> None:
+    """Without job_ids the leases are handed back for the next poll."""
+    ids = add_jobs("a", "b")
+
+    def broken(texts):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(tasks, "infer_batch", broken)
+
+    outcomes = tasks.process_batch(limit=10, owner="runner-1")
+    assert outcomes == [{"ok": False, "reason": tasks.REQUEUED}] * 2
+
+    monkeypatch.setattr(tasks, "infer_batch", lambda texts: [("PASS", 0.9)] * len(texts))
+    assert [o["ok"] for o in tasks.process_batch(limit=10, owner="runner-2")] == [True, True]
+    assert [(_job(i).status, _job(i).attempts) for i in ids] == [("DONE", 2)] * 2
+
+
+@pytest.mark.regression
+def test_process_batch_groups_jobs_into_one_model_call(add_jobs, monkeypatch) -> None:
+    """Micro-batching: one claim, one inference call, per-job outcomes."""
+    ids = add_jobs("one", "two crash", "three")
+    calls = []
+
+    def model(texts):
+        calls.append(list(texts))
+        return [None if "crash" in t else ("PASS", 0.9) for t in texts]
+
+    monkeypatch.setattr(tasks, "infer_batch", model)
+
+    outcomes = tasks.process_batch(job_ids=ids, owner=worker_id())
+
+    assert calls == [["one", "two crash", "three"]]
+    assert [o["ok"] for o in outcomes] == [True, False, True]
+    assert [_job(i).status for i in ids] == ["DONE", "FAILED", "DONE"]
+    assert [_result_count(i) for i in ids] == [1, 0, 1]
+
+
+@pytest.mark.regression
+def test_process_jobs_splits_groups_by_batch_size(add_jobs, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "WORKER_BATCH_SIZE", 2)
+    ids = add_jobs("a", "b", "c", "d", "e")
+    calls = []
+
+    def model(texts):
+        calls.append(len(texts))
+        return [("PASS", 0.9)] * len(texts)
+
+    monkeypatch.setattr(tasks, "infer_batch", model)
+
+    assert all(o["ok"] for o in tasks.process_jobs(ids))
+    assert calls == [2, 2, 1]
@@ -0,0 +1,124 @@
+"""
+Refresh tokens: new access tokens without re-checking the password.
+
+Token format (opaque to clients): "<id>.<secret>"
+- id:     primary key of the refresh_tokens row
+- secret: random; only its sha256 is stored
+
+Responsibilities:
+- Issue a refresh token at login (the first token of a new family)
+- Rotate on every refresh: the presented token is consumed and a new
+  one is issued in the same family
+- Detect reuse: presenting an already consumed token revokes the whole
+  family (a copy leaked or a client replayed it)
+- Revoke a family on logout
+- Prune a user's expired rows whenever a token is issued to them
+
+Functions stage their writes on the caller's session; the caller commits.
+
+QE/SIT relevance:
+- Test suites and the UI log in (bcrypt) once per session and refresh
+  afterwards, so parallel suites no longer saturate the API with logins
+- Rotation, reuse and logout are all observable as 200 vs 401
+"""
+
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import RefreshToken
+
+
+class InvalidRefreshToken(Exception):
+    """Unknown, malformed, expired or revoked refresh token."""
+
+
+class RefreshTokenReused(InvalidRefreshToken):
+    """An already consumed token was presented; its family was revoked."""
+
+
+def _hash(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def issue(db: Session, username: str, family_id: Optional[str] = None) -> str:
+    """Create a refresh token (a new family unless `family_id` is given)."""
+    now = datetime.utcnow()
+    db.execute(
+        delete(RefreshToken).where(
+            RefreshToken.username == username,
+            RefreshToken.expires_at <= now,
+        )
+    )
+
+    token_id = secrets.token_hex(16)
+    secret = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        id=token_id,
+        family_id=family_id or token_id,
+        username=username,
+        secret_hash=_hash(secret),
+        created_at=now,
+        expires_at=now + timedelta(minutes=settings.REFRESH_EXPIRE_MIN),
+    ))
+    return f"{token_id}.{secret}"
+
+
+def _lookup(db: Session, token: str) -> Optional[RefreshToken]:
+    token_id, _, secret = token.partition(".")
+    if not token_id or not secret:
+        return None
+    row = db.get(RefreshToken, token_id)
+    if row is None or not hmac.compare_digest(row.secret_hash, _hash(secret)):
+        return None
+    return row
+
+
+def rotate(db: Session, token: str) -> tuple[str, str]:
+    """
+    Consume `token` and return (username, new refresh token).
+
+    Raises:
+    - RefreshTokenReused if the token was already consumed (the family
+      revocation is staged: commit before responding)
+    - InvalidRefreshToken for anything else that is not a live token
+    """
+    row = _lookup(db, token)
+    now = datetime.utcnow()
+    if row is None or row.revoked_at is not None or row.expires_at <= now:
+        raise InvalidRefreshToken()
+
+    # Compare-and-set: of two concurrent refreshes, only one consumes it
+    consumed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+    ).rowcount
+    if not consumed:
+        revoke_family(db, row.family_id)
+        raise RefreshTokenReused()
+
+    return row.username, issue(db, row.username, row.family_id)
+
+
+def revoke(db: Session, token: str) -> bool:
+    """Revoke the family of `token` (logout). False if it is unknown."""
+    row = _lookup(db, token)
+    if row is None:
+        return False
+    revoke_family(db, row.family_id)
+    return True
+
+
+def revoke_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
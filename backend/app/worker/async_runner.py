@@ -0,0 +1,246 @@
+"""
+Asyncio worker runtime: hundreds of jobs in flight per process.
+
+Responsibilities:
+- Claim jobs from the DB queue (worker/db_queue.py) as slots free up;
+  a slot is held from claim until the job is written back, so cache hits
+  and finished jobs waiting for the writer count too
+- Answer repeated inputs from the result cache (worker/result_cache.py)
+- Run inference through the backend's non-blocking entry point
+- Write finished jobs back in bulk (tasks.write_predictions), storing
+  fresh predictions in the result cache
+- Renew the leases of claimed jobs until they are written back, so jobs
+  waiting for a model slot are not re-claimed by other workers
+- Stop (re-raising its error) if the result writer dies
+
+Concurrency limits (config.Settings):
+- WORKER_ASYNC_CONCURRENCY:  jobs claimed, not yet written back, per process
+- INFERENCE_MAX_CONCURRENCY: model calls in flight per process
+
+Usage:
+    python -m app.worker.async_runner
+
+QE/SIT relevance:
+- I/O-bound inference no longer pins one process per job
+- Backend errors hand the lease back (db_queue.requeue_jobs); after
+  WORKER_MAX_ATTEMPTS claims the job is FAILED
+- A failed write leaves its jobs leased; they are retried once the
+  lease expires (the claim cap applies there too)
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.engine import Row
+
+from ..config import settings
+from ..db import SessionLocal
+from ..latency import recorder
+from .db_queue import claim_jobs, renew_leases, requeue_jobs, worker_id
+from .inference import Prediction, close_backend, get_backend
+from .result_cache import cache_key, lookup, store, touches
+from .tasks import write_predictions
+
+
+logger = logging.getLogger(__name__)
+
+# Writer sentinel: no more completions will arrive
+_STOP = object()
+
+
+def _claim(
+    owner: str,
+    limit: int,
+    model: str,
+) -> tuple[list[Row], list[Optional[str]], dict[str, Prediction]]:
+    """Claim jobs; return rows, their cache keys and any cached predictions."""
+    with SessionLocal() as db:
+        rows = claim_jobs(db, owner, limit=limit)
+        keys: list[Optional[str]] = [None] * len(rows)
+        cached: dict[str, Prediction] = {}
+        if rows and settings.RESULT_CACHE_ENABLED:
+            keys = [cache_key(row.input_text, model) for row in rows]
+            cached = lookup(db, keys)
+        db.commit()
+        return rows, keys, cached
+
+
+def _write(owner: str, finished: list[tuple[int, Prediction, Optional[str]]]) -> None:
+    """Write outcomes; items carrying a cache key are stored in the cache."""
+    with SessionLocal() as db:
+        write_predictions(
+            db,
+            owner,
+            [job_id for job_id, _, _ in finished],
+            [prediction for _, prediction, _ in finished],
+        )
+        store(db, {key: prediction for _, prediction, key in finished if key})
+        db.commit()
+
+
+def _requeue(owner: str, row: Row) -> None:
+    with SessionLocal() as db:
+        requeue_jobs(db, owner, [row])
+        db.commit()
+
+
+def _renew(owner: str, job_ids: list[int]) -> None:
+    with SessionLocal() as db:
+        renew_leases(db, owner, job_ids)
+        db.commit()
+
+
+async def _write_loop(
+    done: asyncio.Queue,
+    owner: str,
+    leased: set[int],
+    slot_freed: asyncio.Event,
+) -> None:
+    """
+    Flush finished jobs in groups of up to WORKER_BATCH_SIZE.
+
+    Each flush drops its jobs from `leased` and sets `slot_freed` so the
+    claim loop can take more. A failed write is logged; its leases expire
+    and another claim retries them.
+    """
+    stopping = False
+    while not stopping:
+        item = await done.get()
+        if item is _STOP:
+            return
+        finished = [item]
+        while len(finished) < settings.WORKER_BATCH_SIZE and not done.empty():
+            item = done.get_nowait()
+            if item is _STOP:
+                stopping = True
+                break
+            finished.append(item)
+        try:
+            await asyncio.to_thread(_write, owner, finished)
+        except Exception:
+            logger.exception("Writing %d finished jobs failed", len(finished))
+        finally:
+            leased.difference_update(job_id for job_id, _, _ in finished)
+            slot_freed.set()
+
+
+async def _renew_loop(owner: str, leased: set[int]) -> None:
+    """Extend the leases of claimed, not yet written jobs every lease / 3."""
+    while True:
+        await asyncio.sleep(settings.WORKER_LEASE_S / 3)
+        if not leased:
+            continue
+        try:
+            await asyncio.to_thread(_renew, owner, list(leased))
+        except Exception:
+            logger.exception("Renewing %d leases failed", len(leased))
+
+
+async def run_async_worker(
+    max_jobs: Optional[int] = None,
+    stop: Optional[asyncio.Event] = None,
+) -> int:
+    """
+    Run the asyncio worker loop.
+
+    Args:
+        max_jobs: stop after claiming this many jobs (None = forever).
+        stop:     optional event that ends the loop when set.
+
+    Returns:
+        int: number of jobs claimed (all are finished, handed back or
+             left leased for retry by the time this returns).
+
+    Raises whatever stopped the result writer: without it finished jobs
+    would pile up in memory while their leases keep being renewed.
+    """
+    backend = get_backend()
+    owner = worker_id()
+    capacity = settings.WORKER_ASYNC_CONCURRENCY
+    model_slots = asyncio.Semaphore(settings.INFERENCE_MAX_CONCURRENCY)
+
+    done: asyncio.Queue = asyncio.Queue()
+    leased: set[int] = set()  # claimed by this worker, not yet written back
+    slot_freed = asyncio.Event()
+    writer = asyncio.create_task(_write_loop(done, owner, leased, slot_freed))
+    renewer = asyncio.create_task(_renew_loop(owner, leased))
+    # A dead writer frees no slots: wake the claim loop to re-raise its error
+    writer.add_done_callback(lambda _: slot_freed.set())
+    in_flight: set[asyncio.Task] = set()
+    claimed_total = 0
+
+    async def run_one(row: Row, key: Optional[str]) -> None:
+        try:
+            async with model_slots:
+                prediction = (await backend.apredict_batch([row.input_text]))[0]
+        except Exception:
+            # Hand the lease back for another attempt (or FAIL the job)
+            logger.exception("Inference failed for job %s", row.id)
+            try:
+                await asyncio.to_thread(_requeue, owner, row)
+            finally:
+                leased.discard(row.id)
+            return
+        await done.put((row.id, prediction, key))
+
+    def on_done(task: asyncio.Task) -> None:
+        in_flight.discard(task)
+        slot_freed.set()
+
+    try:
+        while not (stop and stop.is_set()):
+            if writer.done():
+                writer.result()  # re-raise the writer's error
+                raise RuntimeError("Result writer stopped unexpectedly")
+            if max_jobs is not None and claimed_total >= max_jobs:
+                break
+
+            # Claimed jobs hold their slot until written back (cache
+            # hits included), so `leased` cannot outgrow the writer
+            free = capacity - len(leased)
+            if free <= 0:
+                slot_freed.clear()
+                await slot_freed.wait()
+                continue
+
+            want = min(free, settings.WORKER_BATCH_SIZE)
+            if max_jobs is not None:
+                want = min(want, max_jobs - claimed_total)
+
+            rows, keys, cached = await asyncio.to_thread(
+                _claim, owner, want, backend.model_id
+            )
+            if not rows:
+                await asyncio.sleep(settings.WORKER_POLL_INTERVAL_S)
+                continue
+
+            claimed_total += len(rows)
+            leased.update(row.id for row in rows)
+            for row, key in zip(rows, keys):
+                if key in cached:
+                    # Cache hit: straight to the writer, no model call
+                    await done.put((row.id, cached[key], None))
+                    continue
+                task = asyncio.create_task(run_one(row, key))
+                in_flight.add(task)
+                task.add_done_callback(on_done)
+    finally:
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        await done.put(_STOP)
+        try:
+            await writer
+        finally:
+            renewer.cancel()
+            await backend.aclose()
+            await asyncio.to_thread(recorder.flush)
+            await asyncio.to_thread(touches.flush)
+            close_backend()
+
+    return claimed_total
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_async_worker())
@@ -0,0 +1,103 @@
+"""
+In-memory message broker used as a local stand-in for Redis/Celery.
+
+Responsibilities:
+- Accept task messages from the API without blocking the request
+- Deliver messages to a small pool of in-process consumer threads
+- Provide drain/shutdown hooks for clean exits and deterministic tests
+
+QE/SIT relevance:
+- Lets SIT exercise the real QUEUED -> PROCESSING -> DONE lifecycle
+  without Redis or a separate worker container
+- Keeps API-side dispatch identical to the Celery deployment
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Message format: (task name, positional args)
+Message = Tuple[str, Tuple[Any, ...]]
+
+
+class InMemoryBroker:
+    """
+    Minimal thread-backed broker with named task handlers.
+
+    Usage:
+        broker.register("process_job", process_job)
+        broker.publish("process_job", job_id)
+
+    Notes:
+    - Consumer threads are started lazily on first publish
+    - Handler exceptions are logged and never kill a consumer thread
+    - Messages are lost on process exit (same as an un-acked memory queue)
+    """
+
+    def __init__(self, workers: int = 4):
+        self._queue: "queue.Queue[Optional[Message]]" = queue.Queue()
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._workers = max(1, workers)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def register(self, name: str, handler: Callable[..., Any]) -> None:
+        """Register a callable that consumes messages published under `name`."""
+        self._handlers[name] = handler
+
+    def publish(self, name: str, *args: Any) -> None:
+        """Enqueue a message and return immediately."""
+        if name not in self._handlers:
+            raise KeyError(f"No handler registered for task '{name}'")
+        self._ensure_started()
+        self._queue.put((name, args))
+
+    def qsize(self) -> int:
+        """Approximate number of messages waiting to be consumed."""
+        return self._queue.qsize()
+
+    def join(self) -> None:
+        """Block until every published message has been processed."""
+        self._queue.join()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop consumer threads after they finish in-flight messages."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            for _ in threads:
+                self._queue.put(None)
+        for t in threads:
+            t.join(timeout=timeout)
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self._workers):
+                t = threading.Thread(
+                    target=self._consume,
+                    name=f"memory-broker-{i}",
+                    daemon=True,
+                )
+                t.start()
+                self._threads.append(t)
+
+    def _consume(self) -> None:
+        while True:
+            message = self._queue.get()
+            try:
+                if message is None:
+                    return
+                name, args = message
+                self._handlers[name](*args)
+            except Exception:
+                # Keep the consumer alive; the task owns its own status handling
+                logger.exception("Memory broker task failed: %s", message)
+            finally:
+                self._queue.task_done()
@@ -1,10 +1,38 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
+
 from ..config import settings
+from ..latency import recorder
+from .inference import close_backend
+from .result_cache import touches
 
 celery = Celery(
     "refinery_worker",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
+    include=["app.worker.tasks"],  # register tasks when the worker boots
 )
 
-celery.conf.task_routes = {"app.worker.tasks.*": {"queue": "refinery"}}
\ No newline at end of file
+celery.conf.task_routes = {"app.worker.tasks.*": {"queue": "refinery"}}
+# Periodic jobs (run `celery beat` alongside the worker):
+# time-series bucket retention and the columnar snapshot export
+celery.conf.beat_schedule = {}
+if settings.TIMESERIES_PRUNE_INTERVAL_S > 0:
+    celery.conf.beat_schedule["prune-buckets"] = {
+        "task": "app.worker.tasks.prune_buckets_task",
+        "schedule": settings.TIMESERIES_PRUNE_INTERVAL_S,
+    }
+if settings.EXPORT_INTERVAL_S > 0:
+    celery.conf.beat_schedule["export-snapshot"] = {
+        "task": "app.worker.tasks.export_snapshot_task",
+        "schedule": settings.EXPORT_INTERVAL_S,
+    }
+
+
+@worker_process_shutdown.connect
+def _close_inference_backend(**_kwargs) -> None:
+    # Stop process-pool children / HTTP clients with the worker process,
+    # and persist latency samples / cache hits not written yet
+    close_backend()
+    recorder.flush()
+    touches.flush()
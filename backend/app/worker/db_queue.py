@@ -0,0 +1,240 @@
+"""
+DB-backed job queue: the jobs table is the queue.
+
+Responsibilities:
+- Atomically claim QUEUED jobs for one worker (lease owner + expiry)
+- Re-claim jobs whose lease expired (crashed or stalled worker); a job
+  claimed more than WORKER_MAX_ATTEMPTS times is FAILED instead
+- Extend the leases of jobs a worker is still working on
+- Release leases when jobs reach a terminal state
+- Hand leases back for another attempt after an error, up to
+  WORKER_MAX_ATTEMPTS claims per job
+- Stage status events for every transition (published on commit)
+- Stage analytics rollup deltas for every transition (applied on commit)
+- Timestamp claims (started_at) and terminal transitions (finished_at)
+  and stage their latencies (latency.py)
+
+Concurrency model:
+- Postgres: SELECT ... FOR UPDATE SKIP LOCKED inside the claim UPDATE, so
+  concurrent workers never wait on, or double-claim, each other's rows
+- SQLite (local fallback): FOR UPDATE is not rendered; the single-statement
+  UPDATE runs under SQLite's database write lock, which serializes claims
+
+QE/SIT relevance:
+- Many worker processes can run against one database without Redis
+- Lease expiry makes worker crashes recoverable and testable
+"""
+
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..events import record_transition
+from ..latency import record_finished, stage_durations
+from ..models import Job
+from ..rollup import count_transition
+
+
+def worker_id() -> str:
+    """
+    Identity recorded as Job.lease_owner.
+
+    Uses settings.WORKER_ID when set, otherwise "<hostname>:<pid>", which is
+    unique per worker process on a host.
+    """
+    return settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claimable(now: datetime):
+    """Rows that are waiting, or whose previous lease has expired."""
+    return or_(
+        Job.status == "QUEUED",
+        and_(Job.status == "PROCESSING", Job.lease_expires_at < now),
+    )
+
+
+def claim_jobs(
+    db: Session,
+    owner: str,
+    limit: int,
+    job_ids: Optional[Sequence[int]] = None,
+    lease_s: Optional[int] = None,
+) -> list[Row]:
+    """
+    Claim up to `limit` jobs for `owner` and mark them PROCESSING.
+
+    Args:
+        db:      Session; the caller commits to publish the claim.
+        owner:   Lease owner recorded on each claimed job.
+        limit:   Max jobs to claim.
+        job_ids: Restrict the claim to these jobs (grouped dispatch).
+        lease_s: Lease duration (defaults to settings.WORKER_LEASE_S).
+
+    Returns:
+        list[Row]: (id, input_text, attempts) for each claimed job, oldest
+                   first. attempts == 1 marks a first claim (was QUEUED);
+                   higher values are re-claims of expired leases.
+
+    Re-claims beyond settings.WORKER_MAX_ATTEMPTS (a job whose workers
+    keep dying or stalling) are released as FAILED and not returned.
+    """
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=lease_s or settings.WORKER_LEASE_S)
+
+    candidates = select(Job.id).where(claimable(now))
+    if job_ids is not None:
+        candidates = candidates.where(Job.id.in_(job_ids))
+    candidates = (
+        candidates.order_by(Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    rows = db.execute(
+        update(Job)
+        .where(Job.id.in_(candidates.scalar_subquery()))
+        # Re-check the predicate on the locked row (READ COMMITTED safety)
+        .where(claimable(now))
+        .values(
+            status="PROCESSING",
+            lease_owner=owner,
+            lease_expires_at=expires,
+            started_at=now,
+            attempts=Job.attempts + 1,
+        )
+        .returning(Job.id, Job.input_text, Job.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    record_transition(db, [row.id for row in rows], "PROCESSING")
+    count_transition(
+        db, sum(1 for row in rows if row.attempts == 1), "PROCESSING", "QUEUED"
+    )
+
+    exhausted = [row.id for row in rows if row.attempts > settings.WORKER_MAX_ATTEMPTS]
+    if exhausted:
+        release_jobs(db, owner, exhausted, "FAILED")
+        rows = [row for row in rows if row.attempts <= settings.WORKER_MAX_ATTEMPTS]
+    return sorted(rows, key=lambda row: row.id)
+
+
+def renew_leases(
+    db: Session,
+    owner: str,
+    job_ids: Sequence[int],
+    lease_s: Optional[int] = None,
+) -> int:
+    """
+    Push the lease expiry of jobs `owner` still holds (caller commits).
+
+    For workers that keep claimed jobs longer than one lease, e.g. the
+    asyncio runtime while jobs wait for a model slot.
+
+    Returns:
+        int: number of leases extended.
+    """
+    if not job_ids:
+        return 0
+    expires = datetime.utcnow() + timedelta(seconds=lease_s or settings.WORKER_LEASE_S)
+    return db.execute(
+        update(Job)
+        .where(
+            Job.id.in_(job_ids),
+            Job.status == "PROCESSING",
+            Job.lease_owner == owner,
+        )
+        .values(lease_expires_at=expires)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def release_jobs(
+    db: Session,
+    owner: str,
+    job_ids: Sequence[int],
+    status: str,
+) -> list[int]:
+    """
+    Move leased jobs to a terminal status and clear their lease.
+
+    Only rows still leased by `owner` are updated, so a worker whose lease
+    expired (and was re-claimed elsewhere) cannot overwrite the new owner.
+
+    Returns:
+        list[int]: IDs actually transitioned; the caller should write
+                   Result rows only for these.
+    """
+    if not job_ids:
+        return []
+
+    now = datetime.utcnow()
+    rows = db.execute(
+        update(Job)
+        .where(
+            Job.id.in_(job_ids),
+            Job.status == "PROCESSING",
+            Job.lease_owner == owner,
+        )
+        .values(
+            status=status,
+            lease_owner=None,
+            lease_expires_at=None,
+            finished_at=now,
+        )
+        .returning(Job.id, Job.created_at, Job.started_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    released = [row.id for row in rows]
+    record_finished(
+        db, [stage_durations(row.created_at, row.started_at, now) for row in rows]
+    )
+    record_transition(db, released, status)
+    count_transition(db, len(released), status, "PROCESSING")
+    return released
+
+
+def requeue_jobs(
+    db: Session,
+    owner: str,
+    claimed: Sequence[Row],
+) -> tuple[list[int], list[int]]:
+    """
+    Give claimed jobs back after a failed attempt (e.g. inference raised).
+
+    Jobs claimed fewer than settings.WORKER_MAX_ATTEMPTS times keep their
+    PROCESSING status with the lease expired now, so the next claim_jobs
+    picks them up as a retry (attempts + 1; the rollup already counts
+    them as processing). The others are released as FAILED.
+
+    Args:
+        claimed: rows returned by claim_jobs (id, attempts).
+
+    Returns:
+        (requeued, failed): IDs actually updated; rows whose lease
+        `owner` no longer holds are in neither list.
+    """
+    retry = [row.id for row in claimed if row.attempts < settings.WORKER_MAX_ATTEMPTS]
+    exhausted = [row.id for row in claimed if row.attempts >= settings.WORKER_MAX_ATTEMPTS]
+
+    requeued: list[int] = []
+    if retry:
+        requeued = list(db.execute(
+            update(Job)
+            .where(
+                Job.id.in_(retry),
+                Job.status == "PROCESSING",
+                Job.lease_owner == owner,
+            )
+            .values(lease_owner=None, lease_expires_at=datetime.utcnow())
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+
+    return requeued, release_jobs(db, owner, exhausted, "FAILED")
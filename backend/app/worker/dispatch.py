@@ -0,0 +1,82 @@
+"""
+Job dispatch: hand newly created jobs to the worker.
+
+Responsibilities:
+- Route job IDs to the configured execution path (settings.dispatch_mode())
+- Keep the API request path non-blocking outside of "inline" mode
+- Own the process-wide in-memory broker used by "background" mode
+
+QE/SIT relevance:
+- POST /jobs returns a QUEUED job immediately; tests observe the real
+  QUEUED -> PROCESSING -> DONE/FAILED transitions
+- "inline" remains available for step-through debugging
+"""
+
+from ..config import settings
+from .broker import InMemoryBroker
+from .inference import close_backend
+from .tasks import (
+    process_job,
+    process_job_task,
+    process_jobs,
+    process_jobs_task,
+)
+
+
+# Process-wide broker for "background" mode (no Redis required).
+broker = InMemoryBroker(workers=settings.JOB_DISPATCH_WORKERS)
+broker.register("process_job", process_job)
+broker.register("process_jobs", process_jobs)
+
+
+def dispatch_job(job_id: int) -> None:
+    """
+    Hand a persisted job to the worker according to the dispatch mode.
+
+    Modes:
+    - inline:     process synchronously (request blocks for inference)
+    - celery:     enqueue process_job_task on the Celery broker
+    - background: publish to the in-memory broker (in-process workers)
+    - db:         nothing to send; the QUEUED row is the message
+    """
+    mode = settings.dispatch_mode()
+
+    if mode == "db":
+        return
+    if mode == "inline":
+        process_job(job_id)
+    elif mode == "celery":
+        process_job_task.delay(job_id)
+    else:
+        broker.publish("process_job", job_id)
+
+
+def dispatch_jobs(job_ids: list[int]) -> None:
+    """
+    Hand a group of persisted jobs to the worker as one message.
+
+    Same mode semantics as dispatch_job, but Celery and the in-memory
+    broker receive a single grouped message for the whole batch.
+    """
+    if not job_ids:
+        return
+
+    mode = settings.dispatch_mode()
+
+    if mode == "db":
+        return
+    if mode == "inline":
+        process_jobs(job_ids)
+    elif mode == "celery":
+        process_jobs_task.delay(job_ids)
+    else:
+        broker.publish("process_jobs", job_ids)
+
+
+def shutdown() -> None:
+    """
+    Stop background consumers, then release the inference backend
+    they used (called from the app lifespan).
+    """
+    broker.shutdown()
+    close_backend()
@@ -0,0 +1,391 @@
+"""
+Pluggable inference backends used by the worker.
+
+Responsibilities:
+- Define the backend interface (sync + asyncio entry points)
+- Provide the built-in backends selected by settings.INFERENCE_BACKEND:
+  * simulated: fixed latency + random label (the original demo model)
+  * http:      remote model server (see worker/inference_stub.py)
+  * cpu:       local CPU-bound hashed bag-of-words model
+- Apply failure injection ("crash") uniformly for every backend
+- Optionally fan CPU-bound models out to a process pool
+  (settings.INFERENCE_EXECUTOR = "process")
+- Reject backend answers whose prediction count does not match the
+  inputs (InferenceError) instead of mis-assigning predictions
+- Release HTTP clients / pool children at shutdown (close_backend)
+- Identify the model behind a backend (model_id) for the result cache
+
+QE/SIT relevance:
+- Backends are swappable without touching lifecycle/DB code
+- Failure injection keeps negative-path tests stable across backends
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+import random
+import time
+import weakref
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import httpx
+
+from ..config import settings
+
+
+# Possible output labels from the model
+LABELS = ["PASS", "REVIEW", "FAIL"]
+
+# (label, confidence) on success, None on a (simulated) model crash
+Prediction = Optional[Tuple[str, float]]
+
+
+def model_identity(name: str, url: Optional[str] = None) -> str:
+    """
+    Identity of a model's predictions (result cache key prefix): the
+    backend, its endpoint for http, and INFERENCE_MODEL_VERSION.
+    """
+    endpoint = f"[{url}]" if url else ""
+    return f"{name}{endpoint}@{settings.INFERENCE_MODEL_VERSION}"
+
+
+class InferenceError(RuntimeError):
+    """The backend answered, but not with one prediction per input."""
+
+
+def is_crash(text: str) -> bool:
+    """Failure injection: inputs containing "crash" always fail."""
+    return "crash" in text.lower()
+
+
+class InferenceBackend(ABC):
+    """
+    Base class for inference backends.
+
+    Subclasses implement `_predict` (sync) and may override `_apredict`
+    when they have a native non-blocking implementation; the default
+    async path runs `_predict` in a worker thread.
+
+    Callers use `predict_batch` / `apredict_batch`, which apply failure
+    injection before the model sees the inputs.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def _predict(self, input_texts: list[str]) -> list[Prediction]:
+        """Predict for inputs that passed failure injection."""
+
+    async def _apredict(self, input_texts: list[str]) -> list[Prediction]:
+        return await asyncio.to_thread(self._predict, input_texts)
+
+    def predict_batch(self, input_texts: list[str]) -> list[Prediction]:
+        """Run one (blocking) model call over a batch of inputs."""
+        healthy = [t for t in input_texts if not is_crash(t)]
+        predictions = self._predict(healthy) if healthy else []
+        return self._reassemble(input_texts, predictions)
+
+    async def apredict_batch(self, input_texts: list[str]) -> list[Prediction]:
+        """Run one non-blocking model call over a batch of inputs."""
+        healthy = [t for t in input_texts if not is_crash(t)]
+        predictions = await self._apredict(healthy) if healthy else []
+        return self._reassemble(input_texts, predictions)
+
+    @property
+    def model_id(self) -> str:
+        """Which model answers (see model_identity)."""
+        return model_identity(self.name)
+
+    def close(self) -> None:
+        """Release clients / worker processes held by the backend."""
+
+    async def aclose(self) -> None:
+        """Release resources bound to the running event loop."""
+
+    def _reassemble(
+        self,
+        input_texts: list[str],
+        predictions: list[Prediction],
+    ) -> list[Prediction]:
+        expected = sum(1 for t in input_texts if not is_crash(t))
+        if len(predictions) != expected:
+            raise InferenceError(
+                f"{self.name} backend returned {len(predictions)} predictions "
+                f"for {expected} inputs"
+            )
+        # Put crashed inputs (None) back at their original positions
+        it = iter(predictions)
+        return [None if is_crash(t) else next(it) for t in input_texts]
+
+
+class SimulatedBackend(InferenceBackend):
+    """
+    The original demo model: fixed latency per call + random output.
+
+    The async path uses asyncio.sleep, so hundreds of simulated calls can
+    be in flight on one event loop.
+    """
+
+    name = "simulated"
+
+    def __init__(self, latency_s: float = 1.5):
+        self.latency_s = latency_s
+
+    @staticmethod
+    def _outputs(n: int) -> list[Prediction]:
+        return [
+            (random.choice(LABELS), round(random.uniform(0.50, 0.99), 2))
+            for _ in range(n)
+        ]
+
+    def _predict(self, input_texts: list[str]) -> list[Prediction]:
+        time.sleep(self.latency_s)
+        return self._outputs(len(input_texts))
+
+    async def _apredict(self, input_texts: list[str]) -> list[Prediction]:
+        await asyncio.sleep(self.latency_s)
+        return self._outputs(len(input_texts))
+
+
+class HttpBackend(InferenceBackend):
+    """
+    Remote model server backend.
+
+    Contract:
+        POST {INFERENCE_HTTP_URL}  {"inputs": ["...", ...]}
+        200 -> {"predictions": [{"label": "PASS", "confidence": 0.8}, ...]}
+
+    A local stand-in server lives in worker/inference_stub.py.
+
+    httpx.AsyncClient connections belong to the event loop that opened
+    them, so async calls use one pooled client per running loop (the
+    backend itself is process-wide, see get_backend). A loop's client is
+    closed by aclose() on that loop, or dropped with the loop.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str, timeout_s: float):
+        self.url = url
+        self.timeout_s = timeout_s
+        self._client: Optional[httpx.Client] = None
+        self._aclients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def model_id(self) -> str:
+        # Different servers may run different models
+        return model_identity(self.name, self.url)
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> list[Prediction]:
+        response.raise_for_status()
+        return [
+            (p["label"], float(p["confidence"])) if p else None
+            for p in response.json()["predictions"]
+        ]
+
+    def _predict(self, input_texts: list[str]) -> list[Prediction]:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout_s)
+        return self._parse(self._client.post(self.url, json={"inputs": input_texts}))
+
+    async def _apredict(self, input_texts: list[str]) -> list[Prediction]:
+        # One pooled AsyncClient per event loop keeps connections warm
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            client = self._aclients[loop] = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(
+                    max_connections=settings.INFERENCE_MAX_CONCURRENCY,
+                ),
+            )
+        response = await client.post(self.url, json={"inputs": input_texts})
+        return self._parse(response)
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        client = self._aclients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+class CpuBackend(InferenceBackend):
+    """
+    Local CPU-bound model: hashed bag-of-words features + linear layer.
+
+    Deterministic for a given input (fixed seed weights), with no external
+    dependencies. Pure computation, so it holds the GIL while it runs.
+    """
+
+    name = "cpu"
+
+    def __init__(self, n_features: int = 4096, seed: int = 42):
+        rng = random.Random(seed)
+        self.n_features = n_features
+        self.weights = [
+            [rng.gauss(0.0, 1.0) for _ in LABELS]
+            for _ in range(n_features)
+        ]
+
+    def _predict_one(self, text: str) -> Prediction:
+        scores = [0.0] * len(LABELS)
+        for token in text.lower().split():
+            row = self.weights[zlib.crc32(token.encode("utf-8")) % self.n_features]
+            for i, w in enumerate(row):
+                scores[i] += w
+
+        # Softmax -> confidence of the winning label
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        best = scores.index(top)
+        return LABELS[best], round(exps[best] / sum(exps), 2)
+
+    def _predict(self, input_texts: list[str]) -> list[Prediction]:
+        return [self._predict_one(t) for t in input_texts]
+
+
+# -------------------------------------------------
+# Process-pool execution
+# -------------------------------------------------
+# Children load the model once (pool initializer) and exchange compact
+# batches with the parent: a list of input strings in, and two flat
+# buffers out (one label code byte + one float32 confidence per input).
+# DB access never happens in a child.
+_CRASH_CODE = 255
+_child_model: Optional[InferenceBackend] = None
+
+
+def _pack(predictions: list[Prediction]) -> tuple[bytes, bytes]:
+    codes = bytes(
+        _CRASH_CODE if p is None else LABELS.index(p[0]) for p in predictions
+    )
+    confidences = array("f", (0.0 if p is None else p[1] for p in predictions))
+    return codes, confidences.tobytes()
+
+
+def _unpack(codes: bytes, confidences: bytes) -> list[Prediction]:
+    values = array("f")
+    values.frombytes(confidences)
+    return [
+        None if code == _CRASH_CODE else (LABELS[code], round(values[i], 2))
+        for i, code in enumerate(codes)
+    ]
+
+
+def _init_child() -> None:
+    """Pool initializer: load the model once per child process."""
+    global _child_model
+    _child_model = build_model()
+
+
+def _predict_in_child(input_texts: list[str]) -> tuple[bytes, bytes]:
+    return _pack(_child_model.predict_batch(input_texts))
+
+
+class ProcessPoolBackend(InferenceBackend):
+    """
+    Runs the configured model in a pool of child processes.
+
+    - One model instance per child (loaded by the pool initializer)
+    - Batches are split into INFERENCE_CHUNK_SIZE chunks across children
+    - Uses the "spawn" start method so children never inherit the parent's
+      DB connections or broker threads
+    """
+
+    def __init__(self, processes: int, chunk_size: int):
+        self.processes = processes
+        self.chunk_size = max(1, chunk_size)
+        self.name = f"process[{settings.INFERENCE_BACKEND}]"
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_child,
+            )
+        return self._pool
+
+    def _chunks(self, input_texts: list[str]) -> list[list[str]]:
+        size = self.chunk_size
+        return [input_texts[i:i + size] for i in range(0, len(input_texts), size)]
+
+    def _predict(self, input_texts: list[str]) -> list[Prediction]:
+        predictions: list[Prediction] = []
+        for packed in self.pool.map(_predict_in_child, self._chunks(input_texts)):
+            predictions.extend(_unpack(*packed))
+        return predictions
+
+    async def _apredict(self, input_texts: list[str]) -> list[Prediction]:
+        loop = asyncio.get_running_loop()
+        packed = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, _predict_in_child, chunk)
+            for chunk in self._chunks(input_texts)
+        ))
+        return [p for chunk in packed for p in _unpack(*chunk)]
+
+    @property
+    def model_id(self) -> str:
+        # The children run the configured model: share its cache entries
+        # with the inline executor
+        model = settings.INFERENCE_BACKEND
+        return model_identity(
+            model, settings.INFERENCE_HTTP_URL if model == "http" else None
+        )
+
+    def close(self) -> None:
+        # Waits for running chunks, then stops the children
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def build_model() -> InferenceBackend:
+    """Instantiate the model selected by settings.INFERENCE_BACKEND."""
+    if settings.INFERENCE_BACKEND == "http":
+        return HttpBackend(settings.INFERENCE_HTTP_URL, settings.INFERENCE_TIMEOUT_S)
+    if settings.INFERENCE_BACKEND == "cpu":
+        return CpuBackend()
+    return SimulatedBackend(settings.INFERENCE_LATENCY_S)
+
+
+@lru_cache(maxsize=1)
+def get_backend() -> InferenceBackend:
+    """
+    Process-wide backend used by the worker.
+
+    Wraps the model in a ProcessPoolBackend when
+    settings.INFERENCE_EXECUTOR == "process".
+    """
+    if settings.INFERENCE_EXECUTOR == "process":
+        return ProcessPoolBackend(
+            processes=settings.INFERENCE_PROCESSES or os.cpu_count() or 1,
+            chunk_size=settings.INFERENCE_CHUNK_SIZE,
+        )
+    return build_model()
+
+
+def close_backend() -> None:
+    """
+    Shut down the process-wide backend, if one was created.
+
+    Called when a worker process stops (runners, dispatch.shutdown in the
+    API lifespan, Celery worker_process_shutdown): stops process-pool
+    children and closes the sync HTTP client.
+    """
+    if get_backend.cache_info().currsize:
+        get_backend().close()
+        get_backend.cache_clear()
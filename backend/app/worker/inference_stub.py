@@ -0,0 +1,39 @@
+"""
+Local HTTP stand-in for a remote model server.
+
+Serves the contract expected by inference.HttpBackend so the "http"
+backend can be exercised without a real model deployment.
+
+Usage:
+    uvicorn app.worker.inference_stub:app --port 9000
+
+QE/SIT relevance:
+- Reproduces network-bound inference (latency via asyncio.sleep)
+- Same failure injection as the worker ("crash" -> null prediction)
+"""
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from ..config import settings
+from .inference import SimulatedBackend
+
+
+app = FastAPI(title="Inference stub")
+_model = SimulatedBackend(settings.INFERENCE_LATENCY_S)
+
+
+class PredictIn(BaseModel):
+    inputs: list[str]
+
+
+@app.post("/predict")
+async def predict(data: PredictIn):
+    """Return one {"label", "confidence"} (or null) per input."""
+    predictions = await _model.apredict_batch(data.inputs)
+    return {
+        "predictions": [
+            {"label": p[0], "confidence": p[1]} if p else None
+            for p in predictions
+        ]
+    }
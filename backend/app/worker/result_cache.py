@@ -0,0 +1,268 @@
+"""
+Content-addressed result cache: memoize predictions by normalized input.
+
+Responsibilities:
+- Derive a stable cache key from the input text and the model identity
+  (backend, http endpoint, INFERENCE_MODEL_VERSION), so a different or
+  upgraded model never answers from another model's entries
+- Look up memoized predictions (honouring RESULT_CACHE_TTL_S) and record
+  hits for LRU ordering: counted in memory and written by a background
+  thread in one UPDATE per process every RESULT_CACHE_TOUCH_S, instead
+  of on every lookup
+- Upsert fresh predictions in the caller's transaction
+- Evict expired entries and trim the table to RESULT_CACHE_MAX_ENTRIES,
+  least recently hit first
+- Count hits / misses / evictions per process (GET /admin/result-cache)
+
+Normalization is deliberately conservative (Unicode NFC + collapsed
+whitespace): case and punctuation can change a model's output, so they
+are part of the key.
+
+QE/SIT relevance:
+- Duplicate inputs reach DONE without a model call
+- Crash predictions (None) are never cached, so failure injection is
+  unaffected
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db import SessionLocal, upsert_insert
+from ..models import ResultCache
+from .inference import Prediction
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    """Canonical form of an input for cache lookups."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, model_id: str) -> str:
+    """sha256 hex digest of the model identity + normalized input."""
+    payload = f"{model_id}\x00{normalize(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe per-process counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stored": self.stored,
+                "evicted": self.evicted,
+            }
+
+
+stats = CacheStats()
+
+
+class PendingTouches:
+    """
+    Cache hits not yet written to result_cache (per process).
+
+    LRU order only needs to be approximate: hits are counted here, and
+    the first add() in a process starts a daemon thread that writes them
+    every RESULT_CACHE_TOUCH_S (forked workers start their own), so hot
+    entries cost no row lock or write per lookup. Shutdown paths call
+    flush(); touches lost with a crashed process at worst evict an entry
+    a little early.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits: Counter = Counter()
+        self._flusher_pid: Optional[int] = None
+
+    def add(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._hits.update(keys)
+            if self._hits and self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(
+                    target=self._flush_loop, name="result-cache-touch", daemon=True
+                ).start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(settings.RESULT_CACHE_TOUCH_S)
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+        if not hits:
+            return
+        try:
+            with SessionLocal() as db:
+                write_touches(db, hits, datetime.utcnow())
+                db.commit()
+        except Exception:
+            # Dropped rather than retried: LRU order is approximate anyway
+            logger.exception("Result cache touch flush failed")
+
+
+touches = PendingTouches()
+
+
+def _cutoff(now: datetime) -> Optional[datetime]:
+    ttl = settings.RESULT_CACHE_TTL_S
+    return now - timedelta(seconds=ttl) if ttl > 0 else None
+
+
+def lookup(db: Session, keys: list[str]) -> dict[str, Prediction]:
+    """
+    Return {key: (label, confidence)} for live entries among `keys`.
+
+    Read-only: hits are queued in `touches` and written in the
+    background (hits / last_hit_at trail by up to RESULT_CACHE_TOUCH_S).
+    """
+    if not keys:
+        return {}
+    now = datetime.utcnow()
+    stmt = select(
+        ResultCache.input_hash, ResultCache.label, ResultCache.confidence
+    ).where(ResultCache.input_hash.in_(set(keys)))
+    cutoff = _cutoff(now)
+    if cutoff is not None:
+        stmt = stmt.where(ResultCache.created_at >= cutoff)
+
+    found = {row.input_hash: (row.label, row.confidence) for row in db.execute(stmt)}
+    touches.add(list(found))
+
+    hits = sum(1 for key in keys if key in found)
+    stats.add(hits=hits, misses=len(keys) - hits)
+    return found
+
+
+def write_touches(db: Session, hits: Counter, now: datetime) -> None:
+    """Bump hits / last_hit_at for batched cache hits (one UPDATE)."""
+    if not hits:
+        return
+    db.execute(
+        update(ResultCache)
+        .where(ResultCache.input_hash.in_(sorted(hits)))
+        .values(
+            last_hit_at=now,
+            hits=ResultCache.hits + case(hits, value=ResultCache.input_hash, else_=0),
+        )
+    )
+
+
+def store(db: Session, entries: dict[str, Prediction]) -> None:
+    """
+    Upsert predictions keyed by cache_key (caller commits).
+
+    None predictions are skipped. Every RESULT_CACHE_EVICT_EVERY stored
+    entries, eviction runs in the same transaction.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "input_hash": key,
+            "label": prediction[0],
+            "confidence": prediction[1],
+            "created_at": now,
+            "last_hit_at": now,
+            "hits": 0,
+        }
+        for key, prediction in sorted(entries.items())
+        if prediction is not None
+    ]
+    if not rows:
+        return
+
+    stmt = upsert_insert(db)(ResultCache)
+    # A concurrent worker may have stored the same input: refresh it
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ResultCache.input_hash],
+        set_={
+            "label": stmt.excluded.label,
+            "confidence": stmt.excluded.confidence,
+            "created_at": stmt.excluded.created_at,
+        },
+    )
+    db.execute(stmt, rows)
+
+    every = max(1, settings.RESULT_CACHE_EVICT_EVERY)
+    before = stats.stored
+    stats.add(stored=len(rows))
+    if before // every != (before + len(rows)) // every:
+        evict(db)
+
+
+def evict(db: Session) -> int:
+    """
+    Delete expired entries, then the least recently hit entries beyond
+    RESULT_CACHE_MAX_ENTRIES (caller commits). Returns rows deleted.
+    """
+    removed = 0
+    cutoff = _cutoff(datetime.utcnow())
+    if cutoff is not None:
+        removed += db.execute(
+            delete(ResultCache).where(ResultCache.created_at < cutoff)
+        ).rowcount
+
+    size = db.scalar(select(func.count()).select_from(ResultCache)) or 0
+    excess = size - settings.RESULT_CACHE_MAX_ENTRIES
+    if excess > 0:
+        victims = (
+            select(ResultCache.input_hash)
+            .order_by(ResultCache.last_hit_at, ResultCache.input_hash)
+            .limit(excess)
+        )
+        removed += db.execute(
+            delete(ResultCache).where(ResultCache.input_hash.in_(victims))
+        ).rowcount
+
+    stats.add(evicted=removed)
+    return removed
+
+
+def summary(db: Session) -> dict:
+    """
+    Per-process counters plus table-wide size and lifetime hits (the
+    latter trail lookups by up to RESULT_CACHE_TOUCH_S per process).
+    """
+    size, total_hits = db.execute(
+        select(func.count(), func.coalesce(func.sum(ResultCache.hits), 0))
+        .select_from(ResultCache)
+    ).one()
+    return {
+        "enabled": settings.RESULT_CACHE_ENABLED,
+        "entries": size,
+        "max_entries": settings.RESULT_CACHE_MAX_ENTRIES,
+        "ttl_s": settings.RESULT_CACHE_TTL_S,
+        "total_hits": total_hits,
+        "process": stats.snapshot(),
+    }
@@ -0,0 +1,111 @@
+"""
+Standalone micro-batching worker loop.
+
+Responsibilities:
+- Poll the jobs table for claimable work (QUEUED or expired leases)
+- Wait up to WORKER_BATCH_MAX_WAIT_S for a batch to fill to WORKER_BATCH_SIZE
+- Hand each batch to tasks.process_batch (one transaction per batch)
+
+Usage:
+    python -m app.worker.runner
+
+Run as many runner processes as needed: claims go through
+db_queue.claim_jobs (FOR UPDATE SKIP LOCKED), so workers never
+process the same job twice.
+
+QE/SIT relevance:
+- Bounded wait keeps single-job latency predictable at low traffic
+- Full batches amortize DB round trips and inference calls under load
+"""
+
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from ..config import settings
+from ..db import SessionLocal
+from ..latency import recorder
+from ..models import Job
+from .db_queue import claimable, worker_id
+from .inference import close_backend
+from .result_cache import touches
+from .tasks import process_batch
+
+
+logger = logging.getLogger(__name__)
+
+
+def pending_count(limit: int) -> int:
+    """
+    Number of jobs a worker could claim right now, counted up to `limit`.
+
+    The LIMIT keeps each poll to at most `limit` index rows however deep
+    the backlog is; the loop only needs to know whether a batch is full.
+    """
+    with SessionLocal() as db:
+        candidates = select(Job.id).where(claimable(datetime.utcnow())).limit(limit)
+        return db.scalar(select(func.count()).select_from(candidates.subquery())) or 0
+
+
+def run_batch_worker(max_batches: int | None = None) -> int:
+    """
+    Run the micro-batching loop.
+
+    Args:
+        max_batches: stop after this many non-empty batches (None = forever).
+                     Useful for tests and one-shot drains.
+
+    Returns:
+        int: number of jobs processed.
+
+    A batch is released when either:
+    - WORKER_BATCH_SIZE jobs are queued, or
+    - WORKER_BATCH_MAX_WAIT_S has elapsed since work was first seen
+    """
+    size = settings.WORKER_BATCH_SIZE
+    max_wait = settings.WORKER_BATCH_MAX_WAIT_S
+    idle = settings.WORKER_POLL_INTERVAL_S
+
+    owner = worker_id()
+    processed = 0
+    batches = 0
+    first_seen: float | None = None
+
+    try:
+        while max_batches is None or batches < max_batches:
+            pending = pending_count(size)
+
+            if pending == 0:
+                first_seen = None
+                time.sleep(idle)
+                continue
+
+            now = time.monotonic()
+            if first_seen is None:
+                first_seen = now
+
+            # Wait for the batch to fill, but never longer than max_wait
+            if pending < size and now - first_seen < max_wait:
+                time.sleep(min(idle, max_wait - (now - first_seen)))
+                continue
+
+            outcomes = process_batch(limit=size, owner=owner)
+            first_seen = None
+            if not outcomes:
+                continue  # another runner claimed them first
+            processed += len(outcomes)
+            batches += 1
+            logger.info("Processed batch of %d jobs", len(outcomes))
+    finally:
+        recorder.flush()
+        touches.flush()
+        close_backend()
+
+    return processed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_batch_worker()
@@ -2,9 +2,12 @@
 Worker task logic to process a submitted Job and produce a Result.
 
 Responsibilities:
-- Update job status through lifecycle states
+- Update job status through lifecycle states (guarded UPDATE ... RETURNING
+  transitions from db_queue; no ORM loads)
 - Simulate AI inference latency
 - Generate deterministic failure conditions for negative-path testing
+- Retry jobs whose inference raised (up to WORKER_MAX_ATTEMPTS claims),
+  then mark them FAILED instead of leaving them PROCESSING
 - Persist results to the database
 
 QE/SIT relevance:
@@ -13,16 +16,79 @@ QE/SIT relevance:
 - Supports regression testing for status transitions and data integrity
 """
 
-import random
-import time
+import logging
+from typing import Optional
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from ..config import settings
 from ..db import SessionLocal
-from ..models import Job, Result
+from ..export import export_snapshot
+from ..models import Result
+from ..rollup import count_results, prune_buckets, rebuild
+from .celery_app import celery
+from .db_queue import claim_jobs, release_jobs, requeue_jobs, worker_id
+from .inference import Prediction, get_backend
+from . import result_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Outcome reason when a job's lease was re-claimed by another worker
+# before this one finished it (nothing is written)
+LEASE_LOST = "Lease lost to another worker"
+
+# Outcome reasons when inference raised: the job was handed back for
+# another attempt, or FAILED after WORKER_MAX_ATTEMPTS claims
+REQUEUED = "Inference error; job re-queued"
+INFERENCE_ERROR = "Inference error; retry limit reached"
+
 
+def infer_batch(input_texts: list[str]) -> list[Prediction]:
+    """
+    Run inference over a batch of inputs in one model call.
+
+    Returns one prediction per input, in input order:
+    - (label, confidence) for successful inputs
+    - None for inputs containing "crash" (failure injection)
+
+    QE notes:
+    - The backend is selected by settings.INFERENCE_BACKEND
+    - Failure injection is per input, so one crash never fails the batch
+    """
+    return get_backend().predict_batch(input_texts)
 
-# Possible output labels from the simulated model
-LABELS = ["PASS", "REVIEW", "FAIL"]
+
+def infer_batch_cached(db: Session, input_texts: list[str]) -> list[Prediction]:
+    """
+    infer_batch with content-hash memoization (worker/result_cache.py).
+
+    - Cached inputs are answered from the result_cache table
+    - Remaining inputs are de-duplicated and sent to the model in one call
+    - Fresh predictions are staged for upsert in `db` (caller commits)
+
+    Commits `db` after the lookup so no transaction stays open while the
+    model runs. Falls back to infer_batch when RESULT_CACHE_ENABLED is off.
+    """
+    if not settings.RESULT_CACHE_ENABLED:
+        return infer_batch(input_texts)
+
+    model = get_backend().model_id
+    keys = [result_cache.cache_key(t, model) for t in input_texts]
+    known = result_cache.lookup(db, keys)
+    db.commit()
+
+    misses: dict[str, str] = {}
+    for key, text in zip(keys, input_texts):
+        if key not in known:
+            misses.setdefault(key, text)
+    if misses:
+        fresh = dict(zip(misses, infer_batch(list(misses.values()))))
+        result_cache.store(db, fresh)
+        known.update(fresh)
+
+    return [known[key] for key in keys]
 
 
 def process_job(job_id: int) -> dict:
@@ -40,11 +106,20 @@ def process_job(job_id: int) -> dict:
               {"ok": False, "reason": "Simulated model crash"}
 
     Flow:
-    1) Fetch job by ID
-    2) Mark job PROCESSING
-    3) Simulate AI latency
-    4) If input contains "crash" -> mark FAILED and exit
-    5) Else generate label/confidence, store Result, mark DONE
+    1) Claim the job (QUEUED -> PROCESSING with a lease for this worker);
+       the claim UPDATE ... RETURNING also fetches input_text
+    2) Run inference (skipped when the input is in the result cache)
+    3) If input contains "crash" -> mark FAILED and exit
+    4) Else mark DONE and store the Result, in one transaction
+
+    If inference raises, the lease is handed back (db_queue.requeue_jobs)
+    and the job is claimed again, up to WORKER_MAX_ATTEMPTS claims; then
+    it is marked FAILED. It never stays PROCESSING behind an exception.
+
+    Every transition is a guarded UPDATE ... WHERE status = ... RETURNING
+    (db_queue.claim_jobs / release_jobs): a compare-and-set that fetches
+    only the columns it needs. No Job object is loaded, and a worker
+    whose lease was taken over cannot overwrite the new owner's outcome.
 
     QE notes:
     - Status transitions are testable checkpoints for SIT automation.
@@ -53,40 +128,56 @@ def process_job(job_id: int) -> dict:
 
     # Create a new DB session for this worker execution.
     # This is separate from API request sessions and prevents session-sharing bugs.
+    owner = worker_id()
     db: Session = SessionLocal()
 
     try:
-        # Retrieve the Job record
-        job = db.get(Job, job_id)
-        if not job:
-            # Controlled failure response (helps troubleshooting / automation diagnostics)
-            return {"ok": False, "reason": "Job not found"}
-
-        # Mark job as processing early so UI/tests can observe lifecycle transition
-        job.status = "PROCESSING"
-        db.commit()
+        # Claim the job and mark it PROCESSING early so UI/tests can observe
+        # the lifecycle transition. A job that is missing, finished, or leased
+        # by another worker is not claimable (duplicate deliveries are no-ops).
+        while True:
+            claimed = claim_jobs(db, owner, limit=1, job_ids=[job_id])
+            db.commit()
+            if not claimed:
+                # Controlled failure response (helps troubleshooting / automation diagnostics)
+                return {"ok": False, "reason": "Job not found or not claimable"}
 
-        # Simulated "AI inference" latency
-        # In real systems, this might be a call to an ML model or external service.
-        time.sleep(1.5)
+            # Simulated "AI inference" (latency + output), memoized by input.
+            # In real systems, this might be a call to an ML model or external service.
+            try:
+                prediction = infer_batch_cached(db, [claimed[0].input_text])[0]
+                break
+            except Exception:
+                logger.exception(
+                    "Inference failed for job %d (attempt %d)", job_id, claimed[0].attempts
+                )
+                db.rollback()
+                requeued, failed = requeue_jobs(db, owner, claimed)
+                db.commit()
+                if not requeued:
+                    return {"ok": False, "reason": INFERENCE_ERROR if failed else LEASE_LOST}
 
         # Failure injection mechanism for negative testing.
         # This lets QE validate FAILED status, defect flows, and resilience.
-        if "crash" in job.input_text.lower():
-            job.status = "FAILED"
+        if prediction is None:
+            released = release_jobs(db, owner, [job_id], "FAILED")
             db.commit()
+            if not released:
+                return {"ok": False, "reason": LEASE_LOST}
             return {"ok": False, "reason": "Simulated model crash"}
 
-        # Simulated model output
-        label = random.choice(LABELS)
-        confidence = round(random.uniform(0.50, 0.99), 2)
+        label, confidence = prediction
 
-        # Create and persist the Result row
-        res = Result(job_id=job_id, label=label, confidence=confidence)
-        db.add(res)
+        # PROCESSING -> DONE only while this worker still holds the lease;
+        # the Result row is written in the same transaction
+        if not release_jobs(db, owner, [job_id], "DONE"):
+            db.commit()  # keep the result_cache entry
+            return {"ok": False, "reason": LEASE_LOST}
 
-        # Mark job as completed only after result is persisted successfully
-        job.status = "DONE"
+        db.execute(
+            insert(Result).values(job_id=job_id, label=label, confidence=confidence)
+        )
+        count_results(db, [confidence])
         db.commit()
 
         return {"ok": True, "label": label, "confidence": confidence}
@@ -94,3 +185,206 @@ def process_job(job_id: int) -> dict:
     finally:
         # Always close DB session to prevent connection leaks
         db.close()
+
+
+def write_predictions(
+    db: Session,
+    owner: str,
+    job_ids: list[int],
+    predictions: list[Prediction],
+) -> list[dict]:
+    """
+    Persist terminal outcomes for leased jobs (caller commits).
+
+    - One UPDATE per terminal status (DONE / FAILED) that releases the lease
+    - One bulk INSERT for the Result rows of jobs still leased by `owner`
+
+    Returns one status payload per job (same shape as process_job);
+    jobs whose lease was lost report LEASE_LOST.
+    Shared by process_batch and the asyncio runtime (worker/async_runner.py).
+    """
+    results, done_ids, failed_ids, outcomes = [], [], [], []
+    for job_id, prediction in zip(job_ids, predictions):
+        if prediction is None:
+            failed_ids.append(job_id)
+            outcomes.append({"ok": False, "reason": "Simulated model crash"})
+            continue
+        label, confidence = prediction
+        results.append({"job_id": job_id, "label": label, "confidence": confidence})
+        done_ids.append(job_id)
+        outcomes.append({"ok": True, "label": label, "confidence": confidence})
+
+    confirmed = set(release_jobs(db, owner, failed_ids, "FAILED"))
+    confirmed.update(release_jobs(db, owner, done_ids, "DONE"))
+    results = [r for r in results if r["job_id"] in confirmed]
+    if results:
+        db.execute(insert(Result), results)
+        count_results(db, (r["confidence"] for r in results))
+
+    return [
+        outcome if job_id in confirmed else {"ok": False, "reason": LEASE_LOST}
+        for job_id, outcome in zip(job_ids, outcomes)
+    ]
+
+
+def process_batch(
+    job_ids: Optional[list[int]] = None,
+    limit: Optional[int] = None,
+    owner: Optional[str] = None,
+) -> list[dict]:
+    """
+    Micro-batched processing: N jobs per DB transaction and inference call.
+
+    Args:
+        job_ids: Restrict the claim to these jobs (grouped dispatch).
+                 When omitted, the oldest QUEUED jobs are claimed.
+        limit:   Max jobs to claim (defaults to settings.WORKER_BATCH_SIZE).
+        owner:   Lease owner recorded on claimed jobs (defaults to worker_id()).
+
+    Returns:
+        list[dict]: one status payload per claimed job (same shape as
+                    process_job), in claim order.
+
+    Flow:
+    1) Claim up to `limit` jobs with one UPDATE ... RETURNING
+       (db_queue.claim_jobs: PROCESSING + lease, id + input_text only)
+    2) Answer cached inputs from result_cache, run inference on the
+       rest of the batch in one call
+    3) In one transaction: one UPDATE per terminal status (DONE / FAILED)
+       that also releases the lease, then bulk INSERT the Result rows
+
+    If inference raises, the batch's leases are handed back
+    (db_queue.requeue_jobs); jobs out of attempts are marked FAILED.
+    With job_ids the remaining jobs are claimed again right away;
+    otherwise they report REQUEUED and the next poll retries them.
+
+    QE notes:
+    - Only claimable rows are taken, so re-delivered messages are no-ops
+    - Jobs whose lease was lost to another worker are not written twice
+    - Crash injection still fails only the affected jobs
+    """
+
+    limit = limit or settings.WORKER_BATCH_SIZE
+    owner = owner or worker_id()
+    db: Session = SessionLocal()
+
+    outcomes: list[dict] = []
+    try:
+        while True:
+            # 1) Claim: one UPDATE marks the whole batch PROCESSING
+            claimed = claim_jobs(db, owner, limit=limit, job_ids=job_ids)
+            db.commit()
+
+            if not claimed:
+                return outcomes
+
+            # 2) One inference call for the cache misses of the whole batch
+            try:
+                predictions = infer_batch_cached(db, [row.input_text for row in claimed])
+            except Exception:
+                logger.exception("Inference failed for a batch of %d jobs", len(claimed))
+                db.rollback()
+                requeued, failed = requeue_jobs(db, owner, claimed)
+                db.commit()
+                outcomes.extend({"ok": False, "reason": INFERENCE_ERROR} for _ in failed)
+                if job_ids is None or not requeued:
+                    # Polling callers (runner) re-claim the requeued jobs
+                    outcomes.extend({"ok": False, "reason": REQUEUED} for _ in requeued)
+                    return outcomes
+                # Grouped dispatch: nobody else is told about these jobs
+                job_ids = requeued
+                continue
+
+            # 3) Bulk write results + final statuses in a single transaction
+            outcomes.extend(
+                write_predictions(db, owner, [row.id for row in claimed], predictions)
+            )
+            db.commit()
+
+            return outcomes
+
+    finally:
+        # Always close DB session to prevent connection leaks
+        db.close()
+
+
+def process_jobs(job_ids: list[int]) -> list[dict]:
+    """
+    Process a group of jobs delivered as a single broker message.
+
+    Used by:
+    - POST /jobs/batch (one grouped message instead of N task messages)
+
+    The group is split into WORKER_BATCH_SIZE chunks, each handled by
+    process_batch. A crash in one job marks only that job FAILED.
+    """
+    size = settings.WORKER_BATCH_SIZE
+    outcomes: list[dict] = []
+    for start in range(0, len(job_ids), size):
+        outcomes.extend(process_batch(job_ids[start:start + size]))
+    return outcomes
+
+
+@celery.task(name="app.worker.tasks.process_job_task")
+def process_job_task(job_id: int) -> dict:
+    """
+    Celery entry point for process_job.
+
+    Enqueued by worker.dispatch when JOB_DISPATCH_MODE resolves to "celery";
+    executed by the `celery -A app.worker.celery_app.celery worker` process.
+    """
+    return process_job(job_id)
+
+
+@celery.task(name="app.worker.tasks.process_jobs_task")
+def process_jobs_task(job_ids: list[int]) -> list[dict]:
+    """Celery entry point for process_jobs (grouped batch dispatch)."""
+    return process_jobs(job_ids)
+
+
+@celery.task(name="app.worker.tasks.process_batch_task")
+def process_batch_task(limit: Optional[int] = None) -> list[dict]:
+    """Celery entry point for process_batch (claim oldest QUEUED jobs)."""
+    return process_batch(limit=limit)
+
+
+@celery.task(name="app.worker.tasks.rebuild_rollup_task")
+def rebuild_rollup_task() -> dict:
+    """
+    Reconciliation job: rebuild the analytics rollup from jobs/results
+    and apply time-series bucket retention.
+
+    Schedule periodically (e.g. celery beat) to bound drift after manual
+    DB edits; also available as `python -m app.rollup`.
+    """
+    with SessionLocal() as db:
+        report = rebuild(db)
+        pruned = prune_buckets(db)
+        db.commit()
+    return {"drift": report["drift"], "pruned_buckets": pruned}
+
+
+@celery.task(name="app.worker.tasks.prune_buckets_task")
+def prune_buckets_task() -> dict:
+    """
+    Retention job: delete time-series buckets past TIMESERIES_RETENTION_*.
+
+    Scheduled by celery beat when TIMESERIES_PRUNE_INTERVAL_S > 0. Cheap
+    (one indexed DELETE per resolution), unlike rebuild_rollup_task.
+    """
+    with SessionLocal() as db:
+        pruned = prune_buckets(db)
+        db.commit()
+    return {"pruned_buckets": pruned}
+
+
+@celery.task(name="app.worker.tasks.export_snapshot_task")
+def export_snapshot_task() -> dict:
+    """
+    Incremental Parquet snapshot of finished jobs (see app/export.py).
+
+    Scheduled by celery beat when EXPORT_INTERVAL_S > 0; also available
+    as `python -m app.export` and POST /admin/export.
+    """
+    report = export_snapshot()
+    return {k: report[k] for k in ("run_id", "rows", "watermark")}
@@ -17,16 +17,82 @@ export async function login(username, password) {
   });
 
   if (!r.ok) throw new Error("Login failed");
-  return r.json(); // { access_token, token_type }
+  return r.json(); // { access_token, token_type, refresh_token }
+}
+
+// Exchange a refresh token for new tokens (no password, no bcrypt).
+// Refresh tokens are single-use: store the returned refresh_token.
+export async function refresh(refreshToken) {
+  const r = await fetch(`${API_BASE}/auth/refresh`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  });
+
+  if (!r.ok) throw new Error("Refresh failed");
+  return r.json(); // { access_token, token_type, refresh_token }
+}
+
+function storedRefreshToken() {
+  return typeof localStorage !== "undefined" ? localStorage.getItem("refresh_token") : null;
+}
+
+// Pages keep the token they read at mount; remember its replacement so
+// later calls do not hit 401 (and refresh) again.
+let renewed = null; // { from, to }
+
+// In-flight refresh shared by every caller. Refresh tokens are
+// single-use: a second exchange of the same token is treated as reuse
+// and revokes the session, so concurrent 401s must wait for one refresh.
+let refreshing = null; // Promise<tokens | null>
+
+function renewTokens(refreshToken) {
+  if (!refreshing) {
+    refreshing = refresh(refreshToken)
+      .then((data) => {
+        localStorage.setItem("token", data.access_token);
+        localStorage.setItem("refresh_token", data.refresh_token);
+        return data;
+      })
+      .catch(() => null)
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+}
+
+// fetch with a Bearer token. On 401 (e.g. the access token expired),
+// mint a new one from the stored refresh token and retry once, instead
+// of sending the user back to the login form.
+async function authFetch(token, url, opts = {}) {
+  const call = (t) => fetch(url, {
+    ...opts,
+    headers: { ...(opts.headers || {}), "Authorization": `Bearer ${t}` },
+  });
+
+  const original = token;
+  if (renewed && renewed.from === token) token = renewed.to;
+
+  const r = await call(token);
+  const refreshToken = storedRefreshToken();
+  if (r.status !== 401 || !refreshToken) return r;
+
+  // Renewed by another call while this request was in flight
+  if (renewed && renewed.from === original && renewed.to !== token) {
+    return call(renewed.to);
+  }
+
+  const data = await renewTokens(refreshToken);
+  if (!data) return r;
+  renewed = { from: original, to: data.access_token };
+  return call(data.access_token);
 }
 
 export async function createJob(token, input_text) {
-  const r = await fetch(`${API_BASE}/jobs`, {
+  const r = await authFetch(token, `${API_BASE}/jobs`, {
     method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-      "Authorization": `Bearer ${token}`
-    },
+    headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ input_text })
   });
   if (!r.ok) throw new Error("Create job failed");
@@ -34,33 +100,88 @@ export async function createJob(token, input_text) {
 }
 
 export async function listJobs(token) {
-  const r = await fetch(`${API_BASE}/jobs`, {
-    headers: { "Authorization": `Bearer ${token}` }
-  });
+  const r = await authFetch(token, `${API_BASE}/jobs`);
   if (!r.ok) throw new Error("List jobs failed");
   return r.json();
 }
 
 export async function getJob(token, jobId) {
-  const r = await fetch(`${API_BASE}/jobs/${jobId}`, {
-    headers: { "Authorization": `Bearer ${token}` }
-  });
+  const r = await authFetch(token, `${API_BASE}/jobs/${jobId}`);
   if (!r.ok) throw new Error("Get job failed");
   return r.json();
 }
 
+const EVENTSOURCE_CLOSED = 2; // EventSource.CLOSED
+
+// Subscribe to pushed job status transitions (GET /jobs/stream, SSE).
+// EventSource cannot send headers, so the token goes in the query string
+// (the API redacts it from its access log; proxies may still log URLs).
+// The token is only checked when the stream opens. If the server rejects
+// a (re)connect, e.g. with 401 once the access token expired, the browser
+// stops retrying: reconnect with a renewed token, and if that fails too,
+// call onClosed so the caller can fall back to polling.
+// Returns an unsubscribe function, or null when EventSource is unavailable
+// (callers should fall back to polling listJobs).
+export function subscribeJobEvents(token, onEvent, onOpen, onClosed) {
+  if (typeof EventSource === "undefined") return null;
+
+  let es = null;
+  let stopped = false;
+  let renewedSinceOpen = false;
+
+  function connect(t) {
+    es = new EventSource(`${API_BASE}/jobs/stream?access_token=${encodeURIComponent(t)}`);
+
+    es.onmessage = (e) => onEvent(JSON.parse(e.data));
+    // Fires on first connect and after every automatic reconnect
+    es.onopen = () => {
+      renewedSinceOpen = false;
+      if (onOpen) onOpen();
+    };
+    es.onerror = async () => {
+      // CONNECTING: the browser retries by itself
+      if (stopped || es.readyState !== EVENTSOURCE_CLOSED) return;
+      const next = renewedSinceOpen ? null : await replacementToken(t);
+      if (stopped) return;
+      if (next) {
+        renewedSinceOpen = true;
+        connect(next);
+      } else if (onClosed) {
+        onClosed();
+      }
+    };
+  }
+
+  connect(renewed && renewed.from === token ? renewed.to : token);
+
+  return () => {
+    stopped = true;
+    es.close();
+  };
+}
+
+// A token to use instead of `used`: one renewed meanwhile (by any call or
+// tab), else a fresh one minted from the stored refresh token.
+async function replacementToken(used) {
+  const stored = typeof localStorage !== "undefined" ? localStorage.getItem("token") : null;
+  if (stored && stored !== used) return stored;
+
+  const refreshToken = storedRefreshToken();
+  if (!refreshToken) return null;
+  const data = await renewTokens(refreshToken);
+  if (!data) return null;
+  renewed = { from: used, to: data.access_token };
+  return data.access_token;
+}
+
 export async function getResult(token, jobId) {
-  const r = await fetch(`${API_BASE}/jobs/${jobId}/result`, {
-    headers: { "Authorization": `Bearer ${token}` }
-  });
+  const r = await authFetch(token, `${API_BASE}/jobs/${jobId}/result`);
   if (!r.ok) throw new Error("Result not ready");
   return r.json();
 }
 
 export async function getAnalytics(token) {
-  const r = await fetch(`${API_BASE}/analytics/summary`, {
-    headers: { "Authorization": `Bearer ${token}` }
-  });
+  const r = await authFetch(token, `${API_BASE}/analytics/summary`);
   if (!r.ok) throw new Error("Analytics failed");
   return r.json();
 }
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { createJob, listJobs, getResult, getJob } from "../lib/api";
+import { createJob, listJobs, getResult, getJob, subscribeJobEvents } from "../lib/api";
 import { goTo } from "../lib/nav";
 
 export default function Jobs() {
@@ -24,10 +24,39 @@ export default function Jobs() {
       return; 
     }
     refresh();
-    const t = setInterval(refresh, 2000);
-    return () => clearInterval(t);
+
+    // Polling fallback: no EventSource, or the stream was closed for good
+    // (rejected even after renewing the token)
+    let poll = null;
+    const startPolling = () => {
+      if (!poll) poll = setInterval(refresh, 2000);
+    };
+
+    // Push updates from the SSE stream; resync the list on (re)connect
+    const unsubscribe = subscribeJobEvents(token, applyEvent, refresh, startPolling);
+    if (!unsubscribe) startPolling();
+
+    return () => {
+      if (unsubscribe) unsubscribe();
+      clearInterval(poll);
+    };
   }, []);
 
+  function applyEvent(evt) {
+    // New jobs (from any user/tab): the event carries the list row
+    if (evt.status === "QUEUED" && evt.submitted_by) {
+      const row = {
+        id: evt.job_id,
+        status: evt.status,
+        submitted_by: evt.submitted_by,
+        created_at: evt.created_at,
+      };
+      setJobs(prev => (prev.some(j => j.id === row.id) ? prev : [row, ...prev]));
+      return;
+    }
+    setJobs(prev => prev.map(j => (j.id === evt.job_id ? { ...j, status: evt.status } : j)));
+  }
+
   async function submit() {
     setMsg("");
     try {
@@ -12,6 +12,8 @@ export default function Login() {
     try {
       const data = await login(username, password);
       localStorage.setItem("token", data.access_token);
+      // Lets lib/api renew the access token without asking for the password
+      if (data.refresh_token) localStorage.setItem("refresh_token", data.refresh_token);
       goTo("/jobs");
     } catch {
       setErr("Login failed");
@@ -4,7 +4,7 @@ import { render, screen, fireEvent, waitFor, within } from "@testing-library/rea
 import "@testing-library/jest-dom";
 
 import Jobs from "@/pages/jobs";
-import { createJob, listJobs, getResult, getJob } from "@/lib/api";
+import { createJob, listJobs, getResult, getJob, subscribeJobEvents } from "@/lib/api";
 import { goTo } from "@/lib/nav";
 
 jest.mock("@/lib/api", () => ({
@@ -12,6 +12,7 @@ jest.mock("@/lib/api", () => ({
     listJobs: jest.fn(),
     getResult: jest.fn(),
     getJob: jest.fn(),
+    subscribeJobEvents: jest.fn(),
 }));
 
 jest.mock("@/lib/nav", () => ({
@@ -69,7 +70,7 @@ describe("Jobs page", () => {
         expect(rows).toHaveLength(3); // header + 2 rows
     });
 
-    test("polls refresh every 2 seconds and stops on unmount", async () => {
+    test("polls refresh every 2 seconds when event streaming is unavailable", async () => {
         mockToken("tkn");
         listJobs.mockResolvedValue([]); // stable response
 
@@ -103,6 +104,84 @@ describe("Jobs page", () => {
         expect(listJobs).toHaveBeenCalledTimes(3);
     });
 
+    test("subscribes to job events instead of polling and applies status updates", async () => {
+        mockToken("tkn");
+        const unsubscribe = jest.fn();
+        let push;
+        subscribeJobEvents.mockImplementation((token, onEvent) => {
+            push = onEvent;
+            return unsubscribe;
+        });
+        listJobs.mockResolvedValue([
+            { id: 3, status: "PROCESSING", submitted_by: "viewer", created_at: "now" },
+        ]);
+
+        const { unmount } = render(<Jobs />);
+
+        expect(await screen.findByText("PROCESSING")).toBeInTheDocument();
+        expect(subscribeJobEvents).toHaveBeenCalledWith(
+            "tkn", expect.any(Function), expect.any(Function), expect.any(Function),
+        );
+
+        // pushed transition updates the row in place (no refetch)
+        await act(async () => {
+            push({ job_id: 3, status: "DONE" });
+        });
+        expect(await screen.findByText("DONE")).toBeInTheDocument();
+
+        // no interval polling while subscribed
+        await act(async () => {
+            await jest.advanceTimersByTimeAsync(6000);
+        });
+        expect(listJobs).toHaveBeenCalledTimes(1);
+
+        // new jobs arrive with their row: shown without reloading the list
+        await act(async () => {
+            push({ job_id: 4, status: "QUEUED", submitted_by: "admin", created_at: "t4" });
+            push({ job_id: 5, status: "QUEUED", submitted_by: "admin", created_at: "t5" });
+            push({ job_id: 5, status: "QUEUED", submitted_by: "admin", created_at: "t5" });
+            await jest.advanceTimersByTimeAsync(1000);
+        });
+        const rows = within(screen.getByTestId("jobs-table")).getAllByRole("row");
+        expect(rows.map(r => r.cells[0].textContent)).toEqual(["ID", "5", "4", "3"]);
+        expect(listJobs).toHaveBeenCalledTimes(1);
+
+        await act(async () => {
+            unmount();
+        });
+        expect(unsubscribe).toHaveBeenCalledTimes(1);
+    });
+
+    test("falls back to polling when the event stream closes for good", async () => {
+        mockToken("tkn");
+        let closed;
+        subscribeJobEvents.mockImplementation((token, onEvent, onOpen, onClosed) => {
+            closed = onClosed;
+            return jest.fn();
+        });
+        listJobs.mockResolvedValue([]);
+
+        const { unmount } = render(<Jobs />);
+        await waitFor(() => expect(listJobs).toHaveBeenCalledTimes(1));
+
+        await act(async () => {
+            await jest.advanceTimersByTimeAsync(4000);
+        });
+        expect(listJobs).toHaveBeenCalledTimes(1);
+
+        await act(async () => {
+            closed();
+            await jest.advanceTimersByTimeAsync(2000);
+        });
+        expect(listJobs).toHaveBeenCalledTimes(2);
+
+        await act(async () => {
+            unmount();
+            await jest.advanceTimersByTimeAsync(4000);
+        });
+        expect(listJobs).toHaveBeenCalledTimes(2);
+    });
+
     test("submit success: calls createJob, clears input, and refreshes jobs", async () => {
         mockToken("tkn");
 
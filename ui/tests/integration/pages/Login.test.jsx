@@ -61,6 +61,20 @@ describe("Login page", () => {
         expect(goTo).toHaveBeenCalledWith("/jobs");
     });
 
+    test("successful login also stores the refresh token", async () => {
+        login.mockResolvedValueOnce({ access_token: "abc123", refresh_token: "r1" });
+
+        render(<Login />);
+
+        fireEvent.click(screen.getByTestId("login-btn"));
+
+        await waitFor(() => {
+            expect(goTo).toHaveBeenCalledWith("/jobs");
+        });
+
+        expect(Storage.prototype.setItem).toHaveBeenCalledWith("refresh_token", "r1");
+    });
+
     test("failed login shows error and does not navigate or store token", async () => {
         login.mockRejectedValueOnce(new Error("bad creds"));
 
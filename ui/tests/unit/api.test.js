@@ -62,6 +62,87 @@ describe("lib/api", () => {
     await expect(login("viewer", "bad")).rejects.toThrow("Login failed");
   });
 
+  test("refresh(): posts the refresh token as json and returns new tokens", async () => {
+    const { refresh } = await loadApiWithBase("http://example.com");
+    mockFetchOk({ access_token: "a2", token_type: "bearer", refresh_token: "r2" });
+
+    const data = await refresh("r1");
+
+    const [url, opts] = fetch.mock.calls[0];
+    expect(url).toBe("http://example.com/auth/refresh");
+    expect(opts.method).toBe("POST");
+    expect(opts.headers).toEqual({ "Content-Type": "application/json" });
+    expect(opts.body).toBe(JSON.stringify({ refresh_token: "r1" }));
+    expect(data).toEqual({ access_token: "a2", token_type: "bearer", refresh_token: "r2" });
+  });
+
+  test("refresh(): throws on non-ok response", async () => {
+    const { refresh } = await loadApiWithBase("http://example.com");
+    mockFetchFail(401);
+
+    await expect(refresh("r1")).rejects.toThrow("Refresh failed");
+  });
+
+  test("authenticated calls refresh once on 401 and retry with the new token", async () => {
+    const { listJobs } = await loadApiWithBase("http://example.com");
+    localStorage.setItem("refresh_token", "r1");
+    mockFetchFail(401);
+    mockFetchOk({ access_token: "a2", token_type: "bearer", refresh_token: "r2" });
+    mockFetchOk([{ id: 1 }]);
+
+    const data = await listJobs("expired");
+
+    expect(fetch).toHaveBeenCalledTimes(3);
+    expect(fetch.mock.calls[1][0]).toBe("http://example.com/auth/refresh");
+    expect(fetch.mock.calls[2][1].headers).toEqual({ Authorization: "Bearer a2" });
+    expect(localStorage.getItem("token")).toBe("a2");
+    expect(localStorage.getItem("refresh_token")).toBe("r2");
+    expect(data).toEqual([{ id: 1 }]);
+
+    // The stale token passed by the page is swapped for the renewed one
+    mockFetchOk([]);
+    await listJobs("expired");
+    expect(fetch.mock.calls[3][1].headers).toEqual({ Authorization: "Bearer a2" });
+
+    localStorage.clear();
+  });
+
+  test("concurrent 401s share a single refresh (refresh tokens are single-use)", async () => {
+    const { listJobs, getAnalytics } = await loadApiWithBase("http://example.com");
+    localStorage.setItem("refresh_token", "r1");
+
+    let release;
+    const refreshGate = new Promise((resolve) => { release = resolve; });
+    fetch.mockImplementation(async (url, opts) => {
+      if (url.endsWith("/auth/refresh")) {
+        await refreshGate;
+        return {
+          ok: true,
+          json: async () => ({ access_token: "a2", token_type: "bearer", refresh_token: "r2" }),
+        };
+      }
+      const ok = opts.headers.Authorization === "Bearer a2";
+      return { ok, status: ok ? 200 : 401, json: async () => (ok ? [] : { detail: "expired" }) };
+    });
+
+    const calls = Promise.all([
+      listJobs("expired"),
+      getAnalytics("expired"),
+      listJobs("expired"),
+    ]);
+    // Let all three requests see their 401 before the refresh answers
+    await new Promise((resolve) => setTimeout(resolve, 0));
+    release();
+    await calls;
+
+    const refreshCalls = fetch.mock.calls.filter(([url]) => url.endsWith("/auth/refresh"));
+    expect(refreshCalls).toHaveLength(1);
+    expect(localStorage.getItem("token")).toBe("a2");
+    expect(localStorage.getItem("refresh_token")).toBe("r2");
+
+    localStorage.clear();
+  });
+
   test("createJob(): posts json with Bearer token", async () => {
     const { createJob } = await loadApiWithBase("http://example.com");
     mockFetchOk({ id: 123 });
@@ -143,6 +224,125 @@ describe("lib/api", () => {
     await expect(getResult("tok", 7)).rejects.toThrow("Result not ready");
   });
 
+  test("subscribeJobEvents(): opens EventSource with token and forwards parsed events", async () => {
+    const { subscribeJobEvents } = await loadApiWithBase("http://example.com");
+
+    const instances = [];
+    global.EventSource = jest.fn(function (url) {
+      this.url = url;
+      this.close = jest.fn();
+      instances.push(this);
+    });
+
+    const onEvent = jest.fn();
+    const onOpen = jest.fn();
+    const unsubscribe = subscribeJobEvents("a b", onEvent, onOpen);
+
+    expect(instances).toHaveLength(1);
+    const es = instances[0];
+    expect(es.url).toBe("http://example.com/jobs/stream?access_token=a%20b");
+
+    es.onopen();
+    es.onmessage({ data: JSON.stringify({ job_id: 1, status: "DONE" }) });
+    expect(onOpen).toHaveBeenCalledTimes(1);
+    expect(onEvent).toHaveBeenCalledWith({ job_id: 1, status: "DONE" });
+
+    unsubscribe();
+    expect(es.close).toHaveBeenCalledTimes(1);
+
+    delete global.EventSource;
+  });
+
+  function mockEventSource() {
+    const instances = [];
+    global.EventSource = jest.fn(function (url) {
+      this.url = url;
+      this.readyState = 0;
+      this.close = jest.fn();
+      instances.push(this);
+    });
+    return instances;
+  }
+
+  // The server refused the (re)connect: the browser gives up (CLOSED)
+  async function reject(es) {
+    es.readyState = 2;
+    await es.onerror();
+  }
+
+  test("subscribeJobEvents(): reconnects with a renewed token when the stream is rejected", async () => {
+    const { subscribeJobEvents } = await loadApiWithBase("http://example.com");
+    const instances = mockEventSource();
+    localStorage.setItem("token", "old");
+    localStorage.setItem("refresh_token", "r1");
+    mockFetchOk({ access_token: "a2", token_type: "bearer", refresh_token: "r2" });
+
+    const onClosed = jest.fn();
+    subscribeJobEvents("old", jest.fn(), jest.fn(), onClosed);
+
+    // Transient errors (browser still reconnecting) are left alone
+    await instances[0].onerror();
+    expect(fetch).not.toHaveBeenCalled();
+
+    await reject(instances[0]);
+    expect(fetch.mock.calls[0][0]).toBe("http://example.com/auth/refresh");
+    expect(instances).toHaveLength(2);
+    expect(instances[1].url).toBe("http://example.com/jobs/stream?access_token=a2");
+    expect(onClosed).not.toHaveBeenCalled();
+
+    // Rejected again before ever opening: give up, caller falls back to polling
+    await reject(instances[1]);
+    expect(instances).toHaveLength(2);
+    expect(fetch).toHaveBeenCalledTimes(1);
+    expect(onClosed).toHaveBeenCalledTimes(1);
+
+    localStorage.clear();
+    delete global.EventSource;
+  });
+
+  test("subscribeJobEvents(): reuses a token renewed elsewhere, without refreshing", async () => {
+    const { subscribeJobEvents } = await loadApiWithBase("http://example.com");
+    const instances = mockEventSource();
+    localStorage.setItem("token", "renewed-by-another-tab");
+
+    subscribeJobEvents("old", jest.fn(), jest.fn(), jest.fn());
+    await reject(instances[0]);
+
+    expect(fetch).not.toHaveBeenCalled();
+    expect(instances[1].url).toBe(
+      "http://example.com/jobs/stream?access_token=renewed-by-another-tab"
+    );
+
+    localStorage.clear();
+    delete global.EventSource;
+  });
+
+  test("subscribeJobEvents(): calls onClosed when the token cannot be renewed", async () => {
+    const { subscribeJobEvents } = await loadApiWithBase("http://example.com");
+    const instances = mockEventSource();
+    const onClosed = jest.fn();
+
+    const unsubscribe = subscribeJobEvents("tok", jest.fn(), jest.fn(), onClosed);
+    await reject(instances[0]);
+
+    expect(onClosed).toHaveBeenCalledTimes(1);
+    expect(instances).toHaveLength(1);
+
+    // Closing after unsubscribe is not reported
+    unsubscribe();
+    await reject(instances[0]);
+    expect(onClosed).toHaveBeenCalledTimes(1);
+
+    delete global.EventSource;
+  });
+
+  test("subscribeJobEvents(): returns null when EventSource is unavailable", async () => {
+    const { subscribeJobEvents } = await loadApiWithBase("http://example.com");
+    delete global.EventSource;
+
+    expect(subscribeJobEvents("tok", jest.fn())).toBeNull();
+  });
+
   test("getAnalytics(): fetches /analytics/summary and returns json", async () => {
     const { getAnalytics } = await loadApiWithBase("http://example.com");
     mockFetchOk({ totals: { jobs: 1 } });